@@ -0,0 +1,496 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# Directory holding the resume scripts, so benchmarks work from any cwd
+RESUME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must stay cheap to import
+IMPORT_MODULES = [
+    "resume_editor",
+    "timeline_generator",
+    "skills_generator",
+    "project_generator",
+    "section_loader",
+    "cli",
+    "renderers",
+    "compact_loader",
+    "snapshot_cache",
+    "compressed_io",
+    "resume_server",
+    "link_checker",
+    "feed_generator",
+    "skill_rules",
+    "preview_server",
+]
+
+# Heavy modules that may only be imported on first use
+DEFERRED_IMPORTS = ["yaml", "curses", "_curses"]
+
+
+# Run `python -X importtime` for a module and return {module: cumulative_us}
+def measure_import_time(module):
+    # Bytecode is always written, so only the first run compiles modules edited since the last one;
+    # with PYTHONDONTWRITEBYTECODE set every run would time the compiler instead of the import
+    env = {name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=RESUME_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise Exception(f"Importing {module} failed:\n{result.stderr}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+# Check every resume module against the deferred-import list and a time budget
+def run_import_time(args):
+    failures = []
+    for module in IMPORT_MODULES:
+        # Keep the fastest of several runs to filter out scheduling noise
+        runs = [measure_import_time(module) for _ in range(args.repeat)]
+        timings = min(runs, key=lambda run: run.get(module, 0))
+        leaked = [name for name in DEFERRED_IMPORTS if name in timings]
+        cumulative_ms = timings.get(module, 0) / 1000
+        print(f"{module:<20} {cumulative_ms:8.2f} ms")
+
+        if leaked:
+            failures.append(f"{module} imports {', '.join(leaked)} at import time")
+        if cumulative_ms > args.budget_ms:
+            failures.append(f"{module} took {cumulative_ms:.2f} ms (budget {args.budget_ms} ms)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+# Current resident set size of this process, in bytes
+def current_rss():
+    try:
+        with open("/proc/self/statm", 'r') as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (FileNotFoundError, ValueError):
+        import resource
+        # ru_maxrss is the peak, in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+# Yield synthetic resumes based on resume.json, with realistic repetition.
+# The same document is mutated between yields, so consume each one before the next.
+def synthetic_resumes(resumes):
+    with open(os.path.join(RESUME_DIR, "resume.json"), 'r') as file:
+        template = json.load(file)
+    organizations = [f"Organization {index}" for index in range(200)]
+    locations = [f"City {index}, Country" for index in range(50)]
+    generator = random.Random(0)
+    for _ in range(resumes):
+        for section in template["sections"]:
+            for entry in section["items"]:
+                if "organization" in entry:
+                    entry["organization"] = generator.choice(organizations)
+                    entry["location"] = generator.choice(locations)
+                if "percentage" in entry:
+                    entry["percentage"] = generator.randint(0, 100)
+        yield template
+
+
+# Write a synthetic corpus of resumes to a directory
+def write_synthetic_corpus(directory, resumes):
+    for index, resume in enumerate(synthetic_resumes(resumes)):
+        with open(os.path.join(directory, f"resume-{index}.json"), 'w') as file:
+            json.dump(resume, file)
+
+
+# Load every resume in a directory with one representation and report the RSS growth
+def run_memory_child(args):
+    sys.path.insert(0, RESUME_DIR)
+    if args.mode == "compact":
+        from compact_loader import load_compact_resume as load
+    else:
+        from timeline_generator import load_resume as load
+    # Loading through snapshot_cache leaves .snapshot files next to the resumes
+    files = sorted(name for name in os.listdir(args.directory) if name.endswith(".json"))
+    before = current_rss()
+    loaded = [load(os.path.join(args.directory, name)) for name in files]
+    print(json.dumps({"mode": args.mode, "resumes": len(loaded), "rss_bytes": current_rss() - before}))
+    return 0
+
+
+# Compare the RSS of the dict and compact representations in separate processes
+def run_memory(args):
+    with tempfile.TemporaryDirectory() as directory:
+        write_synthetic_corpus(directory, args.resumes)
+        results = {}
+        for mode in ("dict", "compact"):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "memory-child", mode, directory],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            results[mode] = json.loads(output)["rss_bytes"]
+            print(f"{mode:<8} {results[mode] / (1 << 20):8.1f} MiB for {args.resumes} resumes")
+    if results["dict"]:
+        print(f"RSS reduction: {100 * (1 - results['compact'] / results['dict']):.1f}%")
+    return 0
+
+
+# Compare plain and compressed resume storage: size on disk, CPU time, and the total time
+# on a volume limited to --bandwidth MB/s (CPU time plus the bytes moved at that rate)
+def run_io(args):
+    sys.path.insert(0, RESUME_DIR)
+    from compressed_io import CODECS, read_json, write_json
+
+    unknown = [suffix for suffix in args.codecs if suffix not in CODECS]
+    if unknown:
+        raise Exception(f"Unsupported codecs: {', '.join(unknown)} (available: {', '.join(CODECS)})")
+    suffixes = [".json"] + [f".json{suffix}" for suffix in args.codecs]
+    bandwidth = args.bandwidth * 1_000_000
+    results = {}
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        resumes = [json.loads(json.dumps(resume)) for resume in synthetic_resumes(args.resumes)]
+        for suffix in suffixes:
+            paths = [os.path.join(directory, f"resume-{index}{suffix}") for index in range(len(resumes))]
+            started = time.perf_counter()
+            size = sum(write_json(path, resume, indent=4) for path, resume in zip(paths, resumes))
+            write_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            for path in paths:
+                read_json(path)
+            read_seconds = time.perf_counter() - started
+            results[suffix] = {
+                "bytes": size,
+                "write_seconds": write_seconds,
+                "read_seconds": read_seconds,
+                "slow_read_seconds": read_seconds + size / bandwidth,
+                "slow_write_seconds": write_seconds + size / bandwidth,
+            }
+
+    plain = results[".json"]
+    print(f"{'format':<10} {'size':>10} {'ratio':>7} {'write':>9} {'read':>9} "
+          f"{'slow write':>11} {'slow read':>10}")
+    for suffix, result in results.items():
+        print(f"{suffix:<10} {result['bytes'] / (1 << 20):8.2f}MB {plain['bytes'] / result['bytes']:6.2f}x "
+              f"{result['write_seconds']:8.3f}s {result['read_seconds']:8.3f}s "
+              f"{result['slow_write_seconds']:10.3f}s {result['slow_read_seconds']:9.3f}s")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({"bandwidth_mb_s": args.bandwidth, "resumes": args.resumes, "results": results}, file, indent=2)
+    return 0
+
+
+# Send one HTTP/1.1 request on a keep-alive connection and return (status, body)
+async def http_request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+# One client connection: a mix of inserts, reads and replacements; returns request latencies
+async def server_client(host, port, client, requests):
+    import asyncio
+    reader, writer = await asyncio.open_connection(host, port)
+    latencies = []
+    for index in range(requests):
+        started = time.perf_counter()
+        kind = index % 4
+        if kind == 3:
+            status, _ = await http_request(reader, writer, "PUT", "/sections/Extracurriculars/entries/0",
+                                           {"title": f"client {client} request {index}", "description": []})
+        elif kind == 2:
+            status, _ = await http_request(reader, writer, "GET", "/sections/Interests/entries/0")
+        else:
+            status, _ = await http_request(reader, writer, "POST", "/sections/Interests/entries",
+                                           {"title": f"client {client} request {index}", "description": []})
+        if status >= 400:
+            raise Exception(f"Request {index} of client {client} failed with status {status}")
+        latencies.append(time.perf_counter() - started)
+    writer.close()
+    return latencies
+
+
+# Run a local server on a copy of resume.json, drive it with concurrent clients, and check that
+# every acknowledged insert reached the file once the server has saved and stopped
+def run_server_benchmark(args):
+    import asyncio
+    import shutil
+    import signal
+
+    with tempfile.TemporaryDirectory() as directory:
+        resume_file = os.path.join(directory, "resume.json")
+        shutil.copy(os.path.join(RESUME_DIR, "resume.json"), resume_file)
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(RESUME_DIR, "cli.py"), "serve", "--resume", resume_file, "--port", "0",
+             "--flush-interval", str(args.flush_interval)],
+            stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            banner = server.stdout.readline()
+            if not banner.startswith("Serving"):
+                raise Exception(f"Server failed to start: {banner.strip()}")
+            host, port = banner.rsplit("//", 1)[1].strip().rsplit(":", 1)
+
+            # Seed the entry the PUT requests replace
+            async def seed_and_run():
+                reader, writer = await asyncio.open_connection(host, int(port))
+                await http_request(reader, writer, "POST", "/sections/Extracurriculars/entries",
+                                   {"title": "seed", "description": []})
+                writer.close()
+                started = time.perf_counter()
+                results = await asyncio.gather(*(
+                    server_client(host, int(port), client, args.requests // args.connections)
+                    for client in range(args.connections)
+                ))
+                return time.perf_counter() - started, sorted(latency for result in results for latency in result)
+
+            elapsed, latencies = asyncio.run(seed_and_run())
+        finally:
+            server.send_signal(signal.SIGINT)
+            server.communicate(timeout=60)
+
+        with open(resume_file, 'r') as file:
+            saved = json.load(file)
+    interests = next(section for section in saved["sections"] if section["title"] == "Interests")
+    expected = args.connections * sum(1 for index in range(args.requests // args.connections) if index % 4 in (0, 1))
+
+    print(f"{len(latencies)} requests over {args.connections} connections in {elapsed:.2f}s: "
+          f"{len(latencies) / elapsed:.0f} requests/s")
+    print(f"latency p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+    print(f"saved version {saved.get('version')}, {len(interests['items'])} of {expected} inserts persisted")
+    if len(interests["items"]) != expected:
+        print("FAIL: inserted entries were lost")
+        return 1
+    if len(latencies) / elapsed < args.min_rate:
+        print(f"FAIL: below {args.min_rate} requests/s")
+        return 1
+    return 0
+
+
+# Make saves fail by moving the resume's directory away, and check that the server keeps the
+# unsaved edits and its flush loop, then saves everything once the directory is back
+def run_server_save_failure(args):
+    import asyncio
+    import shutil
+    sys.path.insert(0, RESUME_DIR)
+    from resume_server import ResumeService
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_dir = os.path.join(directory, "data")
+        os.mkdir(data_dir)
+        resume_file = os.path.join(data_dir, "resume.json")
+        shutil.copy(os.path.join(RESUME_DIR, "resume.json"), resume_file)
+
+        async def exercise():
+            service = ResumeService(resume_file)
+            before = len(service.section("Interests")["items"])
+            flusher = asyncio.create_task(service.flush_periodically(args.flush_interval))
+            os.rename(data_dir, data_dir + ".away")
+            for index in range(args.entries):
+                service.handle("POST", "/sections/Interests/entries",
+                               json.dumps({"title": f"unsaved {index}", "description": []}).encode("utf-8"))
+            await asyncio.sleep(args.flush_interval * 3)
+            failures = []
+            if len(service.pending) != args.entries:
+                failures.append(f"{len(service.pending)} of {args.entries} edits pending after failed saves")
+            if flusher.done():
+                failures.append("the flush loop stopped after a failed save")
+            os.rename(data_dir + ".away", data_dir)
+            await asyncio.sleep(args.flush_interval * 3)
+            if service.pending:
+                failures.append(f"{len(service.pending)} edits still pending after the directory came back")
+            flusher.cancel()
+            return before, failures
+
+        before, failures = asyncio.run(exercise())
+        with open(resume_file, 'r') as file:
+            saved = json.load(file)
+    interests = next(section for section in saved["sections"] if section["title"] == "Interests")
+    saved_titles = [entry["title"] for entry in interests["items"][before:]]
+    print(f"{len(saved_titles)} of {args.entries} edits saved after the failed saves")
+    if saved_titles != [f"unsaved {index}" for index in range(args.entries)]:
+        failures.append("edits made during the failed saves were lost or reordered")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+# Local stand-in for the remote hosts of the link checker: answers HEAD and GET with an ETag
+# (304 when it is sent back), 404 below /missing, and records connections and concurrency
+def start_link_server(delay):
+    import http.server
+    import threading
+    stats = {"requests": [], "connections": set(), "active": 0, "max_active": 0, "not_modified": 0}
+    lock = threading.Lock()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_HEAD(self):
+            with lock:
+                stats["requests"].append(time.perf_counter())
+                stats["connections"].add(self.client_address)
+                stats["active"] += 1
+                stats["max_active"] = max(stats["max_active"], stats["active"])
+            try:
+                time.sleep(delay)
+                if self.path.startswith("/missing"):
+                    self.send_response(404)
+                elif self.headers.get("If-None-Match") == '"v1"':
+                    with lock:
+                        stats["not_modified"] += 1
+                    self.send_response(304)
+                else:
+                    self.send_response(200)
+                    self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            finally:
+                with lock:
+                    stats["active"] -= 1
+
+        do_GET = do_HEAD
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+# Check links against a local server: at most --connections connections per host, reused
+# across requests; no more than --rate requests per second; unchanged links revalidated with
+# 304 through their cached ETag; and broken links never cached
+def run_links(args):
+    sys.path.insert(0, RESUME_DIR)
+    from link_checker import check_links, load_cache
+
+    server, stats = start_link_server(args.delay)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/ok/{index}" for index in range(args.links)] + [f"{base}/missing/{index}" for index in range(2)]
+    failures = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            contacts_file = os.path.join(directory, "contacts.json")
+            with open(contacts_file, 'w') as file:
+                json.dump({"websites": [{"label": f"link {index}", "url": url} for index, url in enumerate(urls)]}, file)
+            cache_file = os.path.join(directory, "cache.json")
+
+            # ttl=0 revalidates everything on the second run
+            def run():
+                return check_links(directory, os.path.join(directory, "resume.json"),
+                                   os.path.join(directory, "social-media.yml"), contacts_file,
+                                   os.path.join(directory, "_posts"), cache_file, None, 0, args.connections,
+                                   args.rate, 5.0)
+
+            results = run()
+            requests = sorted(stats["requests"])
+            span = requests[-1] - requests[0]
+            minimum_span = (len(requests) - 1) / args.rate
+            print(f"first run: {len(requests)} requests over {len(stats['connections'])} connections in "
+                  f"{span:.2f}s, at most {stats['max_active']} at once")
+            if stats["max_active"] > args.connections or len(stats["connections"]) > args.connections:
+                failures.append(f"more than {args.connections} connections were used")
+            if span < minimum_span * 0.9:
+                failures.append(f"requests took {span:.2f}s, faster than {args.rate}/s allows ({minimum_span:.2f}s)")
+            broken = sorted(url for url, result in results.items() if not result["ok"])
+            if broken != sorted(urls[args.links:]):
+                failures.append(f"unexpected broken links: {broken}")
+            cached = load_cache(cache_file)
+            if any(not result["ok"] for result in cached.values()) or len(cached) != args.links:
+                failures.append("the cache holds failed results or misses successful ones")
+
+            results = run()
+            print(f"second run: {stats['not_modified']} of {args.links} links revalidated with 304")
+            if stats["not_modified"] != args.links or not all(results[url]["ok"] for url in urls[:args.links]):
+                failures.append("unchanged links were not revalidated with their ETag")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+# Parse arguments and run the selected benchmark
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the resume scripts.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    importtime_parser = subparsers.add_parser("importtime", help="Guard module import time.")
+    importtime_parser.add_argument("--budget-ms", type=float, default=30.0,
+                                   help="Maximum cumulative import time per module.")
+    importtime_parser.add_argument("--repeat", type=int, default=5,
+                                   help="Number of runs per module; the fastest is kept.")
+    importtime_parser.set_defaults(func=run_import_time)
+
+    memory_parser = subparsers.add_parser("memory", help="Compare RSS of dict and compact resume loading.")
+    memory_parser.add_argument("--resumes", type=int, default=20000, help="Number of synthetic resumes to load.")
+    memory_parser.set_defaults(func=run_memory)
+
+    memory_child_parser = subparsers.add_parser("memory-child")
+    memory_child_parser.add_argument("mode", choices=["dict", "compact"])
+    memory_child_parser.add_argument("directory")
+    memory_child_parser.set_defaults(func=run_memory_child)
+
+    io_parser = subparsers.add_parser("io", help="Compare plain and compressed resume storage.")
+    io_parser.add_argument("--resumes", type=int, default=500, help="Number of synthetic resumes to write and read.")
+    io_parser.add_argument("--codecs", nargs="+", default=[".gz", ".bz2", ".xz"],
+                           help="Compressed suffixes to compare with plain JSON.")
+    io_parser.add_argument("--bandwidth", type=float, default=20.0,
+                           help="Throughput of the simulated slow volume, in MB/s.")
+    io_parser.add_argument("--directory", help="Write the files on this volume instead of the temp directory.")
+    io_parser.add_argument("--output", help="Also write the results as JSON.")
+    io_parser.set_defaults(func=run_io)
+
+    server_parser = subparsers.add_parser("server", help="Load-test the HTTP/JSON server mode.")
+    server_parser.add_argument("--requests", type=int, default=20000, help="Total number of requests.")
+    server_parser.add_argument("--connections", type=int, default=32, help="Concurrent keep-alive connections.")
+    server_parser.add_argument("--flush-interval", type=float, default=0.5, help="Server save interval in seconds.")
+    server_parser.add_argument("--min-rate", type=float, default=1000.0,
+                               help="Fail when fewer requests per second are sustained.")
+    server_parser.set_defaults(func=run_server_benchmark)
+
+    save_failure_parser = subparsers.add_parser("server-save-failure",
+                                                help="Check that the server keeps edits when a save fails.")
+    save_failure_parser.add_argument("--entries", type=int, default=20, help="Edits made while saves fail.")
+    save_failure_parser.add_argument("--flush-interval", type=float, default=0.1, help="Save interval in seconds.")
+    save_failure_parser.set_defaults(func=run_server_save_failure)
+
+    links_parser = subparsers.add_parser("links", help="Check the link checker against a local server.")
+    links_parser.add_argument("--links", type=int, default=20, help="Working links served by the local host.")
+    links_parser.add_argument("--connections", type=int, default=2, help="Connections allowed per host.")
+    links_parser.add_argument("--rate", type=float, default=20.0, help="Requests per second allowed per host.")
+    links_parser.add_argument("--delay", type=float, default=0.08, help="Seconds the server takes per request.")
+    links_parser.set_defaults(func=run_links)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
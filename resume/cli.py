@@ -0,0 +1,347 @@
+import argparse
+import json
+import os
+import sys
+
+import instrumentation
+
+# Repository root, so default paths work from any working directory
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Default input and output locations, relative to the repository root
+DEFAULT_RESUME_FILE = os.path.join(REPO_ROOT, "resume", "resume.json")
+DEFAULT_DATA_DIR = os.path.join(REPO_ROOT, "_data")
+DEFAULT_PROJECTS_DIR = os.path.join(REPO_ROOT, "_projects")
+DEFAULT_POSTS_DIR = os.path.join(REPO_ROOT, "_posts")
+DEFAULT_POST_CACHE = os.path.join(REPO_ROOT, ".post-index-cache.json")
+DEFAULT_RELATED_CACHE = os.path.join(REPO_ROOT, ".related-cache.json")
+DEFAULT_RENDER_DIR = os.path.join(REPO_ROOT, "_rendered")
+DEFAULT_SITE_DIR = os.path.join(REPO_ROOT, "_site")
+DEFAULT_PRECOMPRESS_CACHE = os.path.join(REPO_ROOT, ".precompress-cache")
+DEFAULT_FEED_CACHE = os.path.join(REPO_ROOT, ".feed-cache.json")
+DEFAULT_PAGES_DIR = os.path.join(REPO_ROOT, "pages")
+DEFAULT_CONFIG_FILE = os.path.join(REPO_ROOT, "_config.yml")
+DEFAULT_LINK_CACHE = os.path.join(REPO_ROOT, ".link-check-cache.json")
+DEFAULT_SOCIAL_MEDIA_FILE = os.path.join(REPO_ROOT, "_data", "social-media.yml")
+DEFAULT_CONTACTS_FILE = os.path.join(REPO_ROOT, "info", "contacts.json")
+
+
+# Open the curses resume editor
+def run_edit(args):
+    import curses
+    import resume_editor
+    curses.wrapper(resume_editor.main, args.resume)
+
+
+# Serve the resume over a local HTTP/JSON API
+def run_serve(args):
+    import resume_server
+    resume_server.run_server(args.resume, args.host, args.port, args.flush_interval)
+
+
+# Preview the timeline, skills and projects views from the resume without a Jekyll build
+def run_preview(args):
+    import preview_server
+    preview_server.run_preview(args.resume, args.host, args.port)
+
+
+# Generate the timeline data file
+def run_timeline(args):
+    import timeline_generator
+    os.makedirs(args.data_dir, exist_ok=True)
+    timeline_generator.generate_timeline(
+        args.resume,
+        os.path.join(args.data_dir, "timeline.yml"),
+        interactive=not args.all,
+        sharded=getattr(args, "sharded", False),
+        shard_dir=os.path.join(args.data_dir, "timeline_shards"),
+        locales=args.locale,
+    )
+
+
+# Generate the Tech and Other skills data files
+def run_skills(args):
+    import skills_generator
+    os.makedirs(args.data_dir, exist_ok=True)
+    skills_generator.generate_skills(
+        args.resume,
+        os.path.join(args.data_dir, "tech-skills.yml"),
+        os.path.join(args.data_dir, "other-skills.yml"),
+        interactive=not args.all,
+        locales=args.locale,
+        rules_file=args.skill_rules,
+    )
+
+
+# Export projects to Markdown files
+def run_projects(args):
+    import project_generator
+    project_generator.generate_projects(
+        args.resume,
+        args.projects_dir,
+        interactive=not args.all,
+        site_root=REPO_ROOT if args.image_derivatives else None,
+    )
+
+
+# Generate the tag and category index data files
+def run_tags(args):
+    import tag_index_generator
+    os.makedirs(args.data_dir, exist_ok=True)
+    tag_index_generator.generate_tag_indexes(
+        args.posts_dir,
+        os.path.join(args.data_dir, "tags.yml"),
+        os.path.join(args.data_dir, "categories.yml"),
+        DEFAULT_POST_CACHE,
+    )
+
+
+# Generate related posts, projects and entries
+def run_related(args):
+    import related_generator
+    os.makedirs(args.data_dir, exist_ok=True)
+    related_generator.generate_related(
+        args.posts_dir,
+        args.projects_dir,
+        args.resume,
+        os.path.join(args.data_dir, "related.yml"),
+        DEFAULT_RELATED_CACHE,
+        DEFAULT_POST_CACHE,
+        getattr(args, "top_k", None) or related_generator.TOP_K,
+    )
+
+
+# Generate sitemap.xml and feed.xml
+def run_feed(args):
+    import feed_generator
+    output_dir = getattr(args, "output_dir", None) or REPO_ROOT
+    feed_generator.generate_feed(
+        args.posts_dir,
+        args.projects_dir,
+        getattr(args, "pages_dir", None) or DEFAULT_PAGES_DIR,
+        DEFAULT_CONFIG_FILE,
+        os.path.join(output_dir, "sitemap.xml"),
+        os.path.join(output_dir, "feed.xml"),
+        DEFAULT_FEED_CACHE,
+    )
+
+
+# Compile resumes into a columnar corpus file
+def run_corpus_compile(args):
+    import corpus_query
+    corpus = corpus_query.compile_corpus(args.paths)
+    corpus.save(args.output)
+    print(f"Compiled {len(corpus.files)} resumes into {args.output}.")
+
+
+# List experience entries matching the filters across the corpus
+def run_corpus_experience(args):
+    import corpus_query
+    corpus = corpus_query.ColumnarCorpus.load(args.corpus)
+    indices = corpus_query.filter_experience(corpus, args.section, args.organization, args.date_from, args.date_to)
+    for row in corpus_query.experience_rows(corpus, indices):
+        print(json.dumps(row, ensure_ascii=False))
+
+
+# Print the average skill percentage per group across the corpus
+def run_corpus_skills(args):
+    import corpus_query
+    corpus = corpus_query.ColumnarCorpus.load(args.corpus)
+    averages = corpus_query.average_skill_percentage(corpus, args.group_by)
+    print(json.dumps(averages, indent=4, ensure_ascii=False))
+
+
+# Run every generator headlessly in this process
+def run_build(args):
+    args.all = True
+    run_timeline(args)
+    run_skills(args)
+    run_projects(args)
+    run_tags(args)
+    run_related(args)
+    run_feed(args)
+
+
+# Render the resume into every requested format in one pass
+def run_render(args):
+    import renderers
+    import timeline_generator
+    renderers.load_plugins(args.plugin)
+    outputs = renderers.render_all(timeline_generator.load_resume(args.resume), args.format)
+    renderers.write_outputs(outputs, args.output_dir)
+
+
+# Check every link and local asset referenced by the site sources
+def run_links(args):
+    import link_checker
+    results = link_checker.check_links(
+        REPO_ROOT, args.resume, DEFAULT_SOCIAL_MEDIA_FILE, DEFAULT_CONTACTS_FILE, args.posts_dir,
+        args.cache_file, DEFAULT_POST_CACHE, args.ttl, args.connections, args.rate, args.timeout,
+        remote=not args.offline,
+    )
+    broken = link_checker.report_links(results)
+    if broken:
+        raise Exception(f"{broken} broken links or missing assets.")
+
+
+# Minify and precompress the generated site
+def run_precompress(args):
+    import precompress
+    summary = precompress.precompress_site(args.site_dir, args.cache_dir, args.workers)
+    print(f"Processed {summary['files']} files ({summary['skipped']} unchanged).")
+    print(f"Bytes saved: {summary['bytes_saved_minify']} by minifying, "
+          f"{summary['bytes_saved_gzip']} with gzip, {summary['bytes_saved_brotli']} with brotli.")
+
+
+# Build the argument parser with one subcommand per script
+def build_parser():
+    paths = argparse.ArgumentParser(add_help=False)
+    paths.add_argument("--resume", default=DEFAULT_RESUME_FILE, help="Path to the resume JSON file.")
+    paths.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Directory for generated data files.")
+    paths.add_argument("--projects-dir", default=DEFAULT_PROJECTS_DIR,
+                       help="Directory for generated project pages.")
+    paths.add_argument("--posts-dir", default=DEFAULT_POSTS_DIR, help="Directory holding the blog posts.")
+
+    instrument = argparse.ArgumentParser(add_help=False)
+    instrument.add_argument("--report", metavar="FILE",
+                            help="Write a JSON timing report at the end of the run ('-' for stdout).")
+    instrument.add_argument("--profile", metavar="FILE", help="Capture a cProfile dump into FILE.")
+    instrument.add_argument("--tracemalloc", action="store_true",
+                            help="Include peak memory and top allocations in the report.")
+
+    images = argparse.ArgumentParser(add_help=False)
+    images.add_argument("--image-derivatives", action="store_true",
+                        help="Build resized WebP/JPEG copies of project images and list them in the pages.")
+
+    select = argparse.ArgumentParser(add_help=False)
+    select.add_argument("--all", action="store_true",
+                        help="Export every entry instead of selecting them interactively.")
+
+    localize = argparse.ArgumentParser(add_help=False)
+    localize.add_argument("--locale", action="append",
+                          help="Locale to generate data files for (repeatable; default: en). "
+                               "Locales other than en are written to <data-dir>/<locale>/.")
+
+    rules = argparse.ArgumentParser(add_help=False)
+    rules.add_argument("--skill-rules", metavar="FILE",
+                       help="Skill color/category rules (default: skill-rules.json next to the resume).")
+
+    parser = argparse.ArgumentParser(prog="resume", description="Manage the resume and generate site data.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("edit", parents=[paths, instrument], help="Edit the resume.").set_defaults(func=run_edit)
+    serve_parser = subparsers.add_parser("serve", parents=[paths, instrument],
+                                         help="Serve the resume over a local HTTP/JSON API.")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port to listen on (0 picks a free one).")
+    serve_parser.add_argument("--flush-interval", type=float, default=1.0,
+                              help="Seconds between saves of the accumulated edits.")
+    serve_parser.set_defaults(func=run_serve)
+    preview_parser = subparsers.add_parser("preview", parents=[paths, instrument],
+                                           help="Preview the timeline, skills and projects views in a browser.")
+    preview_parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    preview_parser.add_argument("--port", type=int, default=4001, help="Port to listen on (0 picks a free one).")
+    preview_parser.set_defaults(func=run_preview)
+    timeline_parser = subparsers.add_parser("timeline", parents=[paths, instrument, select, localize],
+                                            help="Generate _data/timeline.yml.")
+    timeline_parser.add_argument("--sharded", action="store_true",
+                                 help="Write per-section/per-year files to _data/timeline_shards/ plus an index.")
+    timeline_parser.set_defaults(func=run_timeline)
+    subparsers.add_parser("skills", parents=[paths, instrument, select, localize, rules],
+                          help="Generate the skills data files.").set_defaults(func=run_skills)
+    subparsers.add_parser("projects", parents=[paths, instrument, select, images],
+                          help="Generate the project pages.").set_defaults(func=run_projects)
+    subparsers.add_parser("tags", parents=[paths, instrument],
+                          help="Generate _data/tags.yml and _data/categories.yml.").set_defaults(func=run_tags)
+    related_parser = subparsers.add_parser("related", parents=[paths, instrument],
+                                           help="Generate _data/related.yml with TF-IDF neighbours.")
+    related_parser.add_argument("--top-k", type=int, help="Neighbours kept per document (default: 3).")
+    related_parser.set_defaults(func=run_related)
+    feed_parser = subparsers.add_parser("feed", parents=[paths, instrument],
+                                        help="Generate sitemap.xml and feed.xml from posts, projects and pages.")
+    feed_parser.add_argument("--pages-dir", default=DEFAULT_PAGES_DIR, help="Directory holding the site pages.")
+    feed_parser.add_argument("--output-dir", default=REPO_ROOT, help="Directory for sitemap.xml and feed.xml.")
+    feed_parser.set_defaults(func=run_feed)
+    corpus_parser = subparsers.add_parser("corpus", help="Query many resumes through a columnar corpus file.")
+    corpus_commands = corpus_parser.add_subparsers(dest="corpus_command", required=True)
+    compile_parser = corpus_commands.add_parser("compile", parents=[instrument],
+                                                help="Compile resume files into a corpus.")
+    compile_parser.add_argument("paths", nargs="+", help="Resume files, directories or glob patterns.")
+    compile_parser.add_argument("--output", required=True, help="Corpus file to write.")
+    compile_parser.set_defaults(func=run_corpus_compile)
+    experience_parser = corpus_commands.add_parser("experience", parents=[instrument],
+                                                   help="Filter experience entries.")
+    experience_parser.add_argument("--corpus", required=True, help="Compiled corpus file.")
+    experience_parser.add_argument("--section", help="Section title, e.g. 'Work Experience'.")
+    experience_parser.add_argument("--organization", help="Exact organization name.")
+    experience_parser.add_argument("--from", dest="date_from", help="Start of the date range (YYYY-MM).")
+    experience_parser.add_argument("--to", dest="date_to", help="End of the date range (YYYY-MM).")
+    experience_parser.set_defaults(func=run_corpus_experience)
+    skills_parser = corpus_commands.add_parser("skills", parents=[instrument],
+                                               help="Average skill percentage per group.")
+    skills_parser.add_argument("--corpus", required=True, help="Compiled corpus file.")
+    skills_parser.add_argument("--group-by", default="name", choices=["name", "category", "color"])
+    skills_parser.set_defaults(func=run_corpus_skills)
+    subparsers.add_parser("build", parents=[paths, instrument, images, localize, rules],
+                          help="Generate all site data without prompting.").set_defaults(func=run_build)
+    render_parser = subparsers.add_parser("render", parents=[paths, instrument],
+                                          help="Render the resume into other formats in a single pass.")
+    render_parser.add_argument("--format", action="append",
+                               help="Output format to render (repeatable; default: all registered formats).")
+    render_parser.add_argument("--plugin", action="append", default=[],
+                               help="Module to import for extra renderers (repeatable).")
+    render_parser.add_argument("--output-dir", default=DEFAULT_RENDER_DIR, help="Directory for rendered files.")
+    render_parser.set_defaults(func=run_render)
+
+    links_parser = subparsers.add_parser("links", parents=[paths, instrument],
+                                         help="Check project, social, contact and post links and assets.")
+    links_parser.add_argument("--cache-file", default=DEFAULT_LINK_CACHE, help="File caching earlier results.")
+    links_parser.add_argument("--ttl", type=float, default=24 * 60 * 60,
+                              help="Seconds a successful result is reused without any request.")
+    links_parser.add_argument("--connections", type=int, default=2, help="Simultaneous connections per host.")
+    links_parser.add_argument("--rate", type=float, default=5.0, help="Requests per second per host.")
+    links_parser.add_argument("--timeout", type=float, default=10.0, help="Seconds before a request fails.")
+    links_parser.add_argument("--offline", action="store_true", help="Only check local asset paths.")
+    links_parser.set_defaults(func=run_links)
+
+    precompress_parser = subparsers.add_parser("precompress", parents=[instrument],
+                                               help="Minify _site and write .gz/.br siblings.")
+    precompress_parser.add_argument("--site-dir", default=DEFAULT_SITE_DIR, help="Generated site directory.")
+    precompress_parser.add_argument("--cache-dir", default=DEFAULT_PRECOMPRESS_CACHE,
+                                    help="Directory for the manifest and cached outputs.")
+    precompress_parser.add_argument("--workers", type=int, help="Number of worker processes.")
+    precompress_parser.set_defaults(func=run_precompress)
+    return parser
+
+
+# Write the report asked for on the command line; returns False if it could not be written
+def write_requested_report(args):
+    if not (args.report or args.profile or args.tracemalloc):
+        return True
+    try:
+        instrumentation.write_report(args.report or "-", args.profile)
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+    return True
+
+
+# Entry point for the `resume` command
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    instrumentation.start_profiling(cprofile=bool(args.profile), trace_memory=args.tracemalloc)
+    status = 0
+    try:
+        args.func(args)
+    except Exception as e:
+        print(f"Error: {e}")
+        status = 1
+    finally:
+        # Also written when the command failed or was interrupted
+        if not write_requested_report(args):
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
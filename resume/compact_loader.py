@@ -0,0 +1,133 @@
+import json
+import sys
+from instrumentation import timed
+
+# Fields whose values repeat across entries and resumes, and are worth interning
+INTERNED_FIELDS = {
+    "title", "organization", "location", "start_date", "end_date", "category", "color",
+    "language", "proficiency", "name", "image",
+}
+
+
+# Base for compact entry records: fixed __slots__ instead of a per-entry dict.
+# Records answer get/[]/in like the dicts they replace, so the convert_* functions accept them.
+class CompactRecord:
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+
+    def get(self, key, default=None):
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key, default)
+
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    # Convert back to the plain dict representation used in resume.json
+    def to_dict(self):
+        result = {}
+        for key in self.keys():
+            value = getattr(self, key)
+            result[key] = list(value) if isinstance(value, tuple) else value
+        return result
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class TimelineEntry(CompactRecord):
+    __slots__ = ("title", "organization", "location", "start_date", "end_date", "description")
+
+
+class Skill(CompactRecord):
+    __slots__ = ("name", "percentage", "color", "category")
+
+
+class Project(CompactRecord):
+    __slots__ = ("name", "tools", "image", "description", "external_url")
+
+
+class Language(CompactRecord):
+    __slots__ = ("language", "proficiency")
+
+
+class GenericEntry(CompactRecord):
+    __slots__ = ("title", "description")
+
+
+# Record type used for each section title
+SECTION_RECORDS = {
+    "Education": TimelineEntry,
+    "Work Experience": TimelineEntry,
+    "Leadership Experience": TimelineEntry,
+    "Skills": Skill,
+    "Projects": Project,
+    "Languages": Language,
+}
+
+
+# A section of compact records; items is a tuple so it carries no spare capacity
+class CompactSection:
+    __slots__ = ("title", "items")
+
+    def __init__(self, title, items):
+        self.title = title
+        self.items = items
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+
+# Intern a field value when it is a string from a repeating field
+def compact_value(key, value):
+    if isinstance(value, str):
+        return sys.intern(value) if key in INTERNED_FIELDS else value
+    if isinstance(value, list):
+        if key == "tools":
+            # Kept as a list: project pages print its repr
+            return [sys.intern(tool) if isinstance(tool, str) else tool for tool in value]
+        return tuple(value)
+    return value
+
+
+# Build a compact record from an entry dict; unknown keys fall back to the dict itself
+def compact_entry(record_type, entry):
+    if not set(entry) <= set(record_type.__slots__):
+        return entry
+    record = record_type()
+    for key, value in entry.items():
+        setattr(record, key, compact_value(key, value))
+    return record
+
+
+# Convert a loaded resume into compact sections
+def compact_resume(data):
+    sections = []
+    for section in data.get("sections", []):
+        record_type = SECTION_RECORDS.get(section["title"], GenericEntry)
+        items = tuple(compact_entry(record_type, entry) for entry in section.get("items", []))
+        sections.append(CompactSection(sys.intern(section["title"]), items))
+    return {"sections": sections}
+
+
+# Load a resume with interned strings and __slots__ records instead of dicts
+@timed("compact.load_resume")
+def load_compact_resume(file_path):
+    from snapshot_cache import load_json_with_snapshot
+    try:
+        return compact_resume(load_json_with_snapshot(file_path))
+    except FileNotFoundError:
+        raise Exception("Resume JSON file not found.")
+    except json.JSONDecodeError:
+        raise Exception("Invalid JSON format in the resume file.")
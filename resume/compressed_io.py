@@ -0,0 +1,101 @@
+import importlib
+import json
+import os
+
+# Compressed resume suffixes and the stdlib module handling each
+CODECS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "lzma",
+    ".lzma": "lzma",
+}
+# Compression level per module; gzip's default of 9 costs a lot for little gain on JSON
+COMPRESS_OPTIONS = {
+    "gzip": {"compresslevel": 6},
+    "bz2": {"compresslevel": 9},
+    "lzma": {},
+}
+
+
+# Name of the codec module for a path, or None for plain JSON
+def codec_for(file_path):
+    return CODECS.get(os.path.splitext(file_path)[1].lower())
+
+
+# Errors raised by the codecs for corrupt or truncated data
+def codec_errors():
+    import lzma
+    import zlib
+    return (OSError, EOFError, lzma.LZMAError, zlib.error)
+
+
+# Open a resume file as text, decompressing or compressing on the fly for compressed suffixes
+def open_text(file_path, mode='r'):
+    codec = codec_for(file_path)
+    if codec is None:
+        return open(file_path, mode, encoding="utf-8")
+    module = importlib.import_module(codec)
+    options = COMPRESS_OPTIONS[codec] if mode.startswith(('w', 'a', 'x')) else {}
+    return module.open(file_path, mode + 't', encoding="utf-8", **options)
+
+
+# Error for compressed data that cannot be decompressed. It is a JSONDecodeError, so callers
+# treat a corrupt archive like a plain file with invalid JSON.
+def corrupt_file_error(file_path):
+    return json.JSONDecodeError(f"Corrupt compressed resume file {file_path}", "", 0)
+
+
+# Load JSON from a plain or compressed file. Like json.load, the whole (decompressed) text
+# is read before it is parsed; only the decompression itself works in chunks.
+def read_json(file_path):
+    if codec_for(file_path) is None:
+        with open(file_path, 'r', encoding="utf-8") as file:
+            return json.load(file)
+    try:
+        with open_text(file_path) as file:
+            return json.load(file)
+    except (FileNotFoundError, PermissionError, json.JSONDecodeError):
+        raise
+    except codec_errors():
+        raise corrupt_file_error(file_path)
+
+
+# Decompress a compressed file in chunks into an anonymous temporary file, returned open at
+# its start, so the content can be mapped like a plain file instead of held in memory
+def decompressed_file(file_path):
+    import shutil
+    import tempfile
+    temporary = tempfile.TemporaryFile()
+    try:
+        with importlib.import_module(codec_for(file_path)).open(file_path, 'rb') as file:
+            shutil.copyfileobj(file, temporary, 1 << 20)
+    except (FileNotFoundError, PermissionError):
+        temporary.close()
+        raise
+    except codec_errors():
+        temporary.close()
+        raise corrupt_file_error(file_path)
+    temporary.seek(0)
+    return temporary
+
+
+# Temporary sibling of a file; it keeps the file's suffix so the same codec applies
+def temporary_path(file_path):
+    directory, name = os.path.split(file_path)
+    return os.path.join(directory, f".{os.getpid()}.{name}")
+
+
+# Dump JSON to a plain or compressed file; json.dump writes chunks, so compression is incremental.
+# The file is replaced atomically, so readers never see a partly written document.
+def write_json(file_path, data, indent=None):
+    temp_path = temporary_path(file_path)
+    try:
+        with open_text(temp_path, 'w') as file:
+            json.dump(data, file, indent=indent)
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return size
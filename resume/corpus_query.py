@@ -0,0 +1,300 @@
+import glob
+import json
+import os
+import struct
+from array import array
+from compressed_io import CODECS, read_json
+from instrumentation import count, timed
+from locales import parse_month
+
+# Sections stored in the experience table
+EXPERIENCE_SECTIONS = ["Education", "Work Experience", "Leadership Experience", "Volunteering Opportunities"]
+# File signature of compiled corpora
+MAGIC = b"RCOL1\n"
+# Encoded value for an "end_date" of "Present"
+PRESENT = 999912
+# Encoded value for missing or invalid dates
+NO_DATE = 0
+
+# Columns of each table and their array typecodes; string columns hold pool codes
+EXPERIENCE_COLUMNS = {
+    "resume": "i", "section": "i", "title": "i", "organization": "i", "location": "i",
+    "start": "i", "end": "i",
+}
+SKILL_COLUMNS = {"resume": "i", "name": "i", "category": "i", "color": "i", "percentage": "f"}
+# Columns whose values are codes into the shared string pool
+STRING_COLUMNS = {"section", "title", "organization", "location", "name", "category", "color"}
+
+
+# Interned strings: each distinct value is stored once and referenced by its code
+class StringPool:
+    def __init__(self, strings=None):
+        self.strings = list(strings or [])
+        self.codes = {string: code for code, string in enumerate(self.strings)}
+
+    def intern(self, string):
+        code = self.codes.get(string)
+        if code is None:
+            code = self.codes[string] = len(self.strings)
+            self.strings.append(string)
+        return code
+
+    def lookup(self, string):
+        return self.codes.get(string, -1)
+
+
+# Encode YYYY-MM as an integer YYYYMM so date ranges compare as plain numbers
+def encode_date(date_str):
+    parsed = parse_month(date_str)
+    if parsed == "present":
+        return PRESENT
+    if parsed is None:
+        return NO_DATE
+    year, month = parsed
+    return year * 100 + month
+
+
+# Encode a --from/--to filter value; unlike resume entries, a bad filter date is an error
+def encode_filter_date(date_str):
+    encoded = encode_date(date_str)
+    if encoded == NO_DATE:
+        raise Exception(f"Invalid date '{date_str}': expected YYYY-MM.")
+    return encoded
+
+
+# Parse a skill percentage such as 90, "90" or "90%"; returns None for anything else
+def parse_percentage(value):
+    if isinstance(value, str):
+        value = value.strip().removesuffix("%")
+    try:
+        percentage = float(value)
+    except (TypeError, ValueError):
+        return None
+    return percentage if 0 <= percentage <= 100 else None
+
+
+# Whether a parsed JSON document has the shape of a resume
+def is_resume(data):
+    return isinstance(data, dict) and isinstance(data.get("sections"), list)
+
+
+# Turn an encoded date back into YYYY-MM
+def decode_date(value):
+    if value == PRESENT:
+        return "Present"
+    if value == NO_DATE:
+        return ""
+    return f"{value // 100:04d}-{value % 100:02d}"
+
+
+# A corpus of resumes compiled into columnar arrays
+class ColumnarCorpus:
+    def __init__(self, files=None, pool=None, experience=None, skills=None):
+        self.files = files or []
+        self.pool = pool or StringPool()
+        self.experience = experience or {name: array(code) for name, code in EXPERIENCE_COLUMNS.items()}
+        self.skills = skills or {name: array(code) for name, code in SKILL_COLUMNS.items()}
+
+    # Append one resume document to the columns
+    def add_resume(self, file_path, data):
+        resume_id = len(self.files)
+        self.files.append(file_path)
+        intern = self.pool.intern
+        for section in data.get("sections", []):
+            title = section.get("title")
+            if title in EXPERIENCE_SECTIONS:
+                section_code = intern(title)
+                for entry in section.get("items", []):
+                    row = self.experience
+                    row["resume"].append(resume_id)
+                    row["section"].append(section_code)
+                    row["title"].append(intern(entry.get("title", "")))
+                    row["organization"].append(intern(entry.get("organization", "")))
+                    row["location"].append(intern(entry.get("location", "")))
+                    row["start"].append(encode_date(entry.get("start_date")))
+                    row["end"].append(encode_date(entry.get("end_date")))
+            elif title == "Skills":
+                for skill in section.get("items", []):
+                    percentage = parse_percentage(skill.get("percentage", 0))
+                    if percentage is None:
+                        print(f"Skipping skill '{skill.get('name', '')}' in {file_path}: "
+                              f"invalid percentage {skill.get('percentage')!r}.")
+                        count("corpus.skills_skipped")
+                        continue
+                    row = self.skills
+                    row["resume"].append(resume_id)
+                    row["name"].append(intern(skill.get("name", "")))
+                    row["category"].append(intern(skill.get("category", "Unknown")))
+                    row["color"].append(intern(skill.get("color", "primary")))
+                    row["percentage"].append(percentage)
+
+    # Write the corpus as a JSON header followed by the raw column bytes
+    def save(self, output_file):
+        tables = {"experience": self.experience, "skills": self.skills}
+        header = {
+            "files": self.files,
+            "strings": self.pool.strings,
+            "tables": {
+                table: {name: [column.typecode, len(column)] for name, column in columns.items()}
+                for table, columns in tables.items()
+            },
+        }
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        try:
+            with open(output_file, 'wb') as file:
+                file.write(MAGIC)
+                file.write(struct.pack("<Q", len(header_bytes)))
+                file.write(header_bytes)
+                for columns in tables.values():
+                    for column in columns.values():
+                        column.tofile(file)
+                count("bytes_written", file.tell())
+        except PermissionError:
+            raise Exception(f"Permission denied: Unable to write to {output_file}")
+
+    # Read a corpus written by save()
+    @classmethod
+    def load(cls, input_file):
+        try:
+            with open(input_file, 'rb') as file:
+                if file.read(len(MAGIC)) != MAGIC:
+                    raise Exception(f"{input_file} is not a compiled resume corpus.")
+                (header_length,) = struct.unpack("<Q", file.read(8))
+                header = json.loads(file.read(header_length))
+                tables = {}
+                for table, columns in header["tables"].items():
+                    tables[table] = {}
+                    for name, (typecode, length) in columns.items():
+                        column = array(typecode)
+                        column.fromfile(file, length)
+                        tables[table][name] = column
+        except FileNotFoundError:
+            raise Exception(f"Corpus file not found: {input_file}")
+        except (EOFError, struct.error, json.JSONDecodeError):
+            raise Exception(f"Corpus file is truncated or corrupt: {input_file}")
+        return cls(header["files"], StringPool(header["strings"]), tables["experience"], tables["skills"])
+
+
+# Compile every resume matched by the given files, directories or glob patterns. JSON files
+# found in directories that are not resumes (no "sections" list) are skipped.
+@timed("corpus.compile")
+def compile_corpus(paths):
+    corpus = ColumnarCorpus()
+    for path in paths:
+        searched = os.path.isdir(path)
+        if searched:
+            matches = sorted(
+                match
+                for suffix in [""] + list(CODECS)
+                for match in glob.glob(os.path.join(path, "**", "*.json" + suffix), recursive=True)
+            )
+        else:
+            matches = sorted(glob.glob(path)) or [path]
+        for file_path in matches:
+            try:
+                data = read_json(file_path)
+            except FileNotFoundError:
+                raise Exception(f"Resume JSON file not found: {file_path}")
+            except json.JSONDecodeError:
+                raise Exception(f"Invalid JSON format in {file_path}")
+            if not is_resume(data):
+                if not searched:
+                    raise Exception(f"{file_path} is not a resume: it has no 'sections' list.")
+                print(f"Skipping {file_path}: not a resume.")
+                count("corpus.files_skipped")
+                continue
+            corpus.add_resume(file_path, data)
+    count("corpus.resumes", len(corpus.files))
+    return corpus
+
+
+# View an array as a NumPy vector without copying, when NumPy is installed
+def as_vector(column):
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy.frombuffer(column, dtype=numpy.dtype(column.typecode))
+
+
+# Indices of experience rows matching the filters (section, organization, overlap with a date range)
+@timed("corpus.filter_experience")
+def filter_experience(corpus, section=None, organization=None, date_from=None, date_to=None):
+    columns = corpus.experience
+    conditions = []
+    if section is not None:
+        conditions.append(("section", "==", corpus.pool.lookup(section)))
+    if organization is not None:
+        conditions.append(("organization", "==", corpus.pool.lookup(organization)))
+    # An entry overlaps [from, to] when it starts before `to` and ends after `from`
+    if date_to is not None:
+        conditions.append(("start", "<=", encode_filter_date(date_to)))
+    if date_from is not None:
+        conditions.append(("end", ">=", encode_filter_date(date_from)))
+
+    size = len(columns["resume"])
+    vectors = {name: as_vector(columns[name]) for name, _, _ in conditions}
+    if conditions and all(vector is not None for vector in vectors.values()):
+        import numpy
+        mask = numpy.ones(size, dtype=bool)
+        for name, operator, value in conditions:
+            vector = vectors[name]
+            mask &= (vector == value) if operator == "==" else (vector <= value) if operator == "<=" else (vector >= value)
+        return numpy.flatnonzero(mask).tolist()
+
+    # Pure-Python fallback: still a scan over compact integer columns, never over dicts
+    indices = range(size)
+    for name, operator, value in conditions:
+        column = columns[name]
+        if operator == "==":
+            indices = [index for index in indices if column[index] == value]
+        elif operator == "<=":
+            indices = [index for index in indices if column[index] <= value]
+        else:
+            indices = [index for index in indices if column[index] >= value]
+    return list(indices)
+
+
+# Materialize experience rows as dicts for display
+def experience_rows(corpus, indices):
+    columns = corpus.experience
+    strings = corpus.pool.strings
+    return [
+        {
+            "resume": corpus.files[columns["resume"][index]],
+            "section": strings[columns["section"][index]],
+            "title": strings[columns["title"][index]],
+            "organization": strings[columns["organization"][index]],
+            "location": strings[columns["location"][index]],
+            "start_date": decode_date(columns["start"][index]),
+            "end_date": decode_date(columns["end"][index]),
+        }
+        for index in indices
+    ]
+
+
+# Average skill percentage grouped by a string column ("name", "category" or "color")
+@timed("corpus.average_skill_percentage")
+def average_skill_percentage(corpus, group_by="name"):
+    if group_by not in SKILL_COLUMNS or group_by not in STRING_COLUMNS:
+        raise Exception(f"Cannot group skills by '{group_by}'.")
+    keys = corpus.skills[group_by]
+    values = corpus.skills["percentage"]
+    strings = corpus.pool.strings
+
+    key_vector, value_vector = as_vector(keys), as_vector(values)
+    if key_vector is not None and len(key_vector):
+        import numpy
+        codes, inverse = numpy.unique(key_vector, return_inverse=True)
+        totals = numpy.bincount(inverse, weights=value_vector)
+        counts = numpy.bincount(inverse)
+        averages = zip(codes.tolist(), (totals / counts).tolist())
+    else:
+        totals = {}
+        counts = {}
+        for code, value in zip(keys, values):
+            totals[code] = totals.get(code, 0) + value
+            counts[code] = counts.get(code, 0) + 1
+        averages = ((code, totals[code] / counts[code]) for code in totals)
+
+    return {strings[code]: round(average, 2) for code, average in sorted(averages, key=lambda item: strings[item[0]])}
@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+
+# Keystrokes read past the end of the previous prompt of a form, such as the rest of a pasted block
+_queued = []
+# Whether the prompts being read belong to a multi-field form
+_in_form = False
+
+
+# Scope of a multi-field form: keys typed past one of its prompts feed its next prompts, and
+# whatever is left when the form ends is dropped instead of reaching menus or later sessions
+@contextmanager
+def input_form():
+    global _in_form
+    outer = _in_form
+    _in_form = True
+    try:
+        yield
+    finally:
+        _in_form = outer
+        if not outer:
+            del _queued[:]
+
+
+# Wait for one keystroke, then drain every keystroke already waiting without blocking.
+# A paste arrives as one batch, so it is applied and redrawn once instead of per character.
+def read_batch(stdscr):
+    import curses
+    if _queued:
+        keys = list(_queued)
+        del _queued[:]
+        return keys
+    keys = [stdscr.get_wch()]
+    stdscr.nodelay(True)
+    try:
+        while True:
+            try:
+                keys.append(stdscr.get_wch())
+            except curses.error:
+                break
+    finally:
+        stdscr.nodelay(False)
+    return keys
+
+
+# Apply a batch of keystrokes (str for characters, int for special keys) to the lines being typed.
+# Enter finishes the input unless more keys follow it in the same batch and multiline is set,
+# in which case it is a line break inside a paste. Returns (finished, keys left after Enter).
+def apply_keys(lines, keys, multiline=False):
+    import curses
+    for position, key in enumerate(keys):
+        if key in ("\n", "\r", curses.KEY_ENTER):
+            if multiline and position + 1 < len(keys):
+                lines.append("")
+                continue
+            return True, keys[position + 1:]
+        if key in ("\x7f", "\b", curses.KEY_BACKSPACE):
+            if lines[-1]:
+                lines[-1] = lines[-1][:-1]
+            elif len(lines) > 1:
+                lines.pop()
+        elif key == "\t":
+            lines[-1] += " "
+        elif isinstance(key, str) and key.isprintable():
+            lines[-1] += key
+    return False, []
+
+
+# Redraw the typed text from the position after the prompt
+def draw_lines(stdscr, origin, lines, separator):
+    import curses
+    stdscr.move(*origin)
+    stdscr.clrtobot()
+    try:
+        stdscr.addstr(separator.join(lines))
+    except curses.error:
+        # Text past the bottom of the window is kept, just not shown
+        pass
+    stdscr.refresh()
+
+
+# Read input after a prompt; with multiline, each pasted line becomes its own stripped entry
+def read_lines(stdscr, prompt, multiline=False, separator="\n"):
+    stdscr.addstr(prompt)
+    stdscr.refresh()
+    origin = stdscr.getyx()
+    lines = [""]
+    while True:
+        finished, rest = apply_keys(lines, read_batch(stdscr), multiline)
+        draw_lines(stdscr, origin, lines, separator)
+        if finished:
+            # Outside a form, keys past Enter belong to nothing and are dropped
+            if _in_form:
+                _queued.extend(rest)
+            return [line.strip() for line in lines]
+
+
+# Read a single line of input; inside a form, lines pasted beyond the first feed its following prompts
+def read_line(stdscr, prompt):
+    return read_lines(stdscr, prompt)[0]
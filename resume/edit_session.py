@@ -0,0 +1,163 @@
+import os
+from collections import deque
+from contextlib import contextmanager
+
+# Top-level key holding the document version, bumped on every save
+VERSION_KEY = "version"
+# Number of operations kept for undo
+HISTORY_LIMIT = 1000
+
+
+# Version of a loaded resume; documents saved before versioning count as version 0
+def document_version(data):
+    return data.get(VERSION_KEY, 0)
+
+
+# Path of the advisory lock file belonging to a resume file
+def lock_path(file_path):
+    directory, name = os.path.split(file_path)
+    return os.path.join(directory, f".{name}.lock")
+
+
+# Hold an exclusive advisory lock on a resume file for the duration of the block.
+# The lock lives on a sidecar file so atomically replacing the resume does not drop it.
+@contextmanager
+def locked(file_path):
+    try:
+        import fcntl
+    except ImportError:
+        # No advisory locks on this platform; versioning still detects conflicting saves
+        yield
+        return
+    with open(lock_path(file_path), 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+# Find a section by title, optionally creating it when missing
+def find_section(data, section_title, create=False):
+    for section in data.setdefault("sections", []):
+        if section["title"] == section_title:
+            return section
+    if not create:
+        return None
+    section = {"title": section_title, "items": []}
+    data["sections"].append(section)
+    return section
+
+
+# Insert an entry into a section (at the end by default) and return the operation that was performed
+def insert_entry(data, section_title, entry, entry_index=None):
+    items = find_section(data, section_title, create=True)["items"]
+    entry_index = len(items) if entry_index is None else min(entry_index, len(items))
+    items.insert(entry_index, entry)
+    return {"op": "insert", "section": section_title, "index": entry_index, "entry": entry}
+
+
+# Replace the entry at an index and return the operation; raises IndexError for a bad index
+def replace_entry(data, section_title, entry_index, entry):
+    items = find_section(data, section_title)["items"]
+    if not 0 <= entry_index < len(items):
+        raise IndexError(entry_index)
+    previous = items[entry_index]
+    items[entry_index] = entry
+    return {"op": "replace", "section": section_title, "index": entry_index, "previous": previous, "entry": entry}
+
+
+# Remove the entry at an index and return the operation; raises IndexError for a bad index
+def remove_entry(data, section_title, entry_index):
+    items = find_section(data, section_title)["items"]
+    if not 0 <= entry_index < len(items):
+        raise IndexError(entry_index)
+    previous = items.pop(entry_index)
+    return {"op": "remove", "section": section_title, "index": entry_index, "previous": previous}
+
+
+# Locate the entry an operation was made against: at its old index if still there, else anywhere
+def locate_entry(items, operation):
+    index = operation["index"]
+    if index < len(items) and items[index] == operation["previous"]:
+        return index
+    for candidate, item in enumerate(items):
+        if item == operation["previous"]:
+            return candidate
+    return None
+
+
+# Replay an operation on another version of the document.
+# Entries are never changed in place (edits swap in a new entry), so the document shares
+# the operation's entry objects instead of copying them.
+# Returns False when the entry it changes was modified or removed there (a conflict).
+def apply_operation(data, operation):
+    if operation["op"] == "insert":
+        items = find_section(data, operation["section"], create=True)["items"]
+        items.insert(min(operation.get("index", len(items)), len(items)), operation["entry"])
+        return True
+
+    section = find_section(data, operation["section"])
+    index = None if section is None else locate_entry(section["items"], operation)
+    if index is None:
+        return False
+    if operation["op"] == "replace":
+        section["items"][index] = operation["entry"]
+    else:
+        del section["items"][index]
+    return True
+
+
+# Operation that reverts another one on the document it produced
+def invert_operation(operation):
+    section, index = operation["section"], operation["index"]
+    if operation["op"] == "insert":
+        return {"op": "remove", "section": section, "index": index, "previous": operation["entry"]}
+    if operation["op"] == "remove":
+        return {"op": "insert", "section": section, "index": index, "entry": operation["previous"]}
+    return {"op": "replace", "section": section, "index": index, "previous": operation["entry"],
+            "entry": operation["previous"]}
+
+
+# Undo/redo stacks of operations. Each step holds only the entries it changed, shared with the
+# document rather than copied, so history costs O(changed entry) per step whatever the resume size.
+class EditHistory:
+    def __init__(self, limit=HISTORY_LIMIT):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+
+    # Remember a new operation; it invalidates anything that could be redone
+    def record(self, operation):
+        if operation:
+            self.undo_stack.append(operation)
+            self.redo_stack.clear()
+
+    # Revert the latest operation. Returns the operation applied to the document, to be saved
+    # like any other edit, or None when there is nothing to undo or the entry changed since.
+    def undo(self, data):
+        if not self.undo_stack:
+            return None
+        # Left on the stack when it cannot be applied, so it can still be undone later
+        operation = self.undo_stack[-1]
+        inverse = invert_operation(operation)
+        if not apply_operation(data, inverse):
+            return None
+        self.redo_stack.append(self.undo_stack.pop())
+        return inverse
+
+    # Apply the latest undone operation again; returns it, or None like undo()
+    def redo(self, data):
+        if not self.redo_stack:
+            return None
+        operation = self.redo_stack[-1]
+        if not apply_operation(data, operation):
+            return None
+        self.undo_stack.append(self.redo_stack.pop())
+        return operation
+
+
+# Short description of an operation for messages
+def describe_operation(operation):
+    entry = operation.get("previous") or operation["entry"]
+    name = entry.get("title") or entry.get("name") or entry.get("language") or "entry"
+    return f"{operation['op']} of '{name}' in {operation['section']}"
@@ -0,0 +1,132 @@
+import textwrap
+from instrumentation import count
+
+# Keys understood by the browser, besides the arrow and page keys
+NEXT_PAGE_KEYS = (" ", "n")
+PREVIOUS_PAGE_KEYS = ("b", "p")
+CLOSE_KEYS = ("q", "\n", "\r")
+# Keys that delete the last typed digit of an entry number
+BACKSPACE_KEYS = ("\b", "\x7f")
+
+
+# Short one-line label for an entry
+def entry_label(entry):
+    label = entry.get("title") or entry.get("name") or entry.get("language") or "Untitled Entry"
+    details = entry.get("organization") or entry.get("category") or entry.get("proficiency")
+    return f"{label} ({details})" if details else label
+
+
+# Format an entry into display lines of at most width characters, without its number
+def format_entry(entry, width):
+    lines = textwrap.wrap(entry_label(entry), width - 6) or [""]
+    for key, value in entry.items():
+        values = value if isinstance(value, list) else [value]
+        prefix = f"    {key}: "
+        for item in values:
+            text = f"- {item}" if isinstance(value, list) else str(item)
+            lines.extend(textwrap.wrap(text, width, initial_indent=prefix, subsequent_indent="        ") or [prefix])
+            prefix = "      "
+    return lines
+
+
+# Formatted lines per entry and width. Entries are keyed by identity and edits replace entries
+# with new objects, so a changed entry simply misses the cache; apply() drops the replaced one.
+class DisplayCache:
+    def __init__(self):
+        # entry id -> (entry, width, lines); the entry is kept so its id cannot be reused
+        self.lines = {}
+
+    # Display lines of an entry, formatting it only if it is new or the width changed
+    def get(self, entry, width):
+        cached = self.lines.get(id(entry))
+        if cached is not None and cached[0] is entry and cached[1] == width:
+            return cached[2]
+        count("browser.entries_formatted")
+        lines = format_entry(entry, width)
+        self.lines[id(entry)] = (entry, width, lines)
+        return lines
+
+    # Forget entries an edit replaced or removed
+    def apply(self, operation):
+        previous = operation.get("previous")
+        if previous is not None:
+            self.lines.pop(id(previous), None)
+
+
+# Index of the first entry of the page ending just before `top`, walking backwards
+def previous_page_start(items, top, cache, width, rows):
+    used = 0
+    while top > 0:
+        height = len(cache.get(items[top - 1], width))
+        if used and used + height > rows:
+            break
+        used += height + 1
+        top -= 1
+    return top
+
+
+# Draw the page starting at entry `top`; returns the index after the last entry shown.
+# `prompt`, if given, replaces the key help in the status line.
+def draw_page(stdscr, section, top, cache, width, rows, prompt=None):
+    items = section["items"]
+    stdscr.erase()
+    row = 0
+    index = top
+    while index < len(items):
+        lines = cache.get(items[index], width)
+        # Entries are never split across pages, unless one alone is taller than the window
+        if row and row + len(lines) > rows:
+            break
+        for offset, line in enumerate(lines[:rows - row]):
+            stdscr.addnstr(row + offset, 0, f"{index + 1}: {line}" if offset == 0 else line, width)
+        row += len(lines) + 1
+        index += 1
+    status = (f"'{section['title']}': entries {top + 1}-{index} of {len(items)}   "
+              + (prompt or "PgDn/Space next, PgUp/b previous, arrows scroll, q close"))
+    if not items:
+        status = f"'{section['title']}' has no entries. Press q to close."
+    stdscr.addnstr(rows, 0, status, width)
+    stdscr.refresh()
+    return index
+
+
+# Page through the entries of a section, formatting only the entries that are shown.
+# With a prompt, digits typed while browsing form an entry number, which is returned when
+# Enter is pressed ("" when closed with q), so the entries stay visible while choosing one.
+def browse_entries(stdscr, section, cache, prompt=None):
+    import curses
+    items = section["items"]
+    top = 0
+    typed = ""
+    while True:
+        height, width = stdscr.getmaxyx()
+        # Keep the last column free: writing to the bottom-right cell is an error in curses
+        rows, width = max(height - 1, 1), max(width - 1, 10)
+        footer = f"{prompt}{typed}  (Enter to confirm, q to cancel)" if prompt else None
+        end = draw_page(stdscr, section, top, cache, width, rows, footer)
+
+        key = stdscr.get_wch()
+        if prompt and isinstance(key, str) and key.isdigit():
+            typed += key
+        elif prompt and key in (curses.KEY_BACKSPACE,) + BACKSPACE_KEYS:
+            typed = typed[:-1]
+        elif key == curses.KEY_RESIZE:
+            curses.update_lines_cols()
+        elif key in (curses.KEY_NPAGE,) + NEXT_PAGE_KEYS:
+            top = end if end < len(items) else top
+        elif key in (curses.KEY_PPAGE,) + PREVIOUS_PAGE_KEYS:
+            top = previous_page_start(items, top, cache, width, rows)
+        elif key == curses.KEY_DOWN:
+            top = min(top + 1, max(len(items) - 1, 0))
+        elif key == curses.KEY_UP:
+            top = max(top - 1, 0)
+        elif key == curses.KEY_HOME:
+            top = 0
+        elif key == curses.KEY_END:
+            top = previous_page_start(items, len(items), cache, width, rows)
+        elif key in CLOSE_KEYS:
+            if key == "q":
+                typed = ""
+            break
+    stdscr.erase()
+    return typed
@@ -0,0 +1,308 @@
+import hashlib
+import html
+import json
+import os
+import re
+from compressed_io import temporary_path
+from instrumentation import count, stage, timed
+from posts import POST_FILE_NAME, POST_URL_PREFIX, parse_post, split_front_matter
+
+# Paths relative to the repository root
+POSTS_DIR = "_posts"
+PROJECTS_DIR = "_projects"
+PAGES_DIR = "pages"
+CONFIG_FILE = "_config.yml"
+SITEMAP_FILE = "sitemap.xml"
+FEED_FILE = "feed.xml"
+CACHE_FILE = ".feed-cache.json"
+# Bumped when the cached records change shape, so older caches are rebuilt
+CACHE_VERSION = 2
+
+# Site address used when _config.yml sets no `url`
+SITE_URL = "https://alhussni-aa.github.io"
+# Permalink prefix for projects, matching `permalink: /projects/:name` in _config.yml
+PROJECT_URL_PREFIX = "/projects/"
+# Newest posts listed in the feed, like jekyll-feed
+FEED_LIMIT = 10
+# Longest summary taken from the start of a post without a description
+SUMMARY_LENGTH = 300
+# Extensions Jekyll renders to HTML pages
+PAGE_EXTENSIONS = (".md", ".markdown", ".html")
+# Page URLs never listed in the sitemap
+SITEMAP_EXCLUDE = ("/404.html",)
+
+
+# Escape text for XML content and attributes
+def xml_escape(text):
+    return html.escape(str(text), quote=True)
+
+
+# Read the site settings the outputs need from _config.yml
+def load_site_config(config_file):
+    import yaml
+    try:
+        with open(config_file, 'r', encoding="utf-8") as file:
+            config = yaml.safe_load(file) or {}
+    except FileNotFoundError:
+        config = {}
+    author = config.get("author") or {}
+    return {
+        "url": str(config.get("url") or SITE_URL).rstrip("/") + str(config.get("baseurl") or "").rstrip("/"),
+        "title": str(config.get("title") or ""),
+        "description": " ".join(str(config.get("description") or "").split()),
+        "author": str(author.get("name") or "") if isinstance(author, dict) else str(author),
+    }
+
+
+# URL of a page: its permalink, or its path with the extension Jekyll gives it
+def page_url(relative_path, front_matter):
+    if front_matter.get("permalink"):
+        return str(front_matter["permalink"])
+    stem, _ = os.path.splitext(relative_path.replace(os.sep, "/"))
+    return "/" + (stem[:-len("index")] if os.path.basename(stem) == "index" else stem + ".html")
+
+
+# Whether a page URL is an HTML page that belongs in the sitemap
+def is_sitemap_page(url, front_matter):
+    if front_matter.get("sitemap") is False or url in SITEMAP_EXCLUDE:
+        return False
+    extension = os.path.splitext(url.rstrip("/"))[1]
+    return url.endswith("/") or extension in ("", ".html", ".htm")
+
+
+# Format a front matter date (date, datetime or string) as an ISO 8601 timestamp
+def iso_timestamp(value):
+    if not value:
+        return None
+    text = str(value).strip()
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", text):
+        return f"{text}T00:00:00+00:00"
+    return text.replace(" ", "T", 1)
+
+
+# First paragraph of a Markdown body as plain text, for posts without a description
+def first_paragraph(body):
+    for paragraph in re.split(r"\n\s*\n", body):
+        text = " ".join(paragraph.split())
+        if text and not text.startswith(("#", "{%", "<", "!")):
+            text = re.sub(r"!?\[([^\]]*)\]\([^)]*\)", r"\1", text)
+            return text[:SUMMARY_LENGTH] + ("…" if len(text) > SUMMARY_LENGTH else "")
+    return ""
+
+
+# Sitemap <url> element for a URL
+def sitemap_fragment(site_url, url, lastmod):
+    lines = [f"  <url>\n    <loc>{xml_escape(site_url + url)}</loc>\n"]
+    if lastmod:
+        lines.append(f"    <lastmod>{xml_escape(lastmod)}</lastmod>\n")
+    lines.append("  </url>\n")
+    return "".join(lines)
+
+
+# Atom <entry> element for a post
+def feed_fragment(site_url, post, permalink):
+    link = post["url"] if post["url"].startswith(("http://", "https://")) else site_url + post["url"]
+    published = iso_timestamp(post["date"])
+    lines = [
+        "  <entry>\n",
+        f"    <title type=\"html\">{xml_escape(post['title'])}</title>\n",
+        f"    <link href=\"{xml_escape(link)}\" rel=\"alternate\" type=\"text/html\" "
+        f"title=\"{xml_escape(post['title'])}\" />\n",
+        f"    <published>{published}</published>\n",
+        f"    <updated>{published}</updated>\n",
+        f"    <id>{xml_escape(site_url + permalink)}</id>\n",
+    ]
+    summary = post["description"] or first_paragraph(post["body"])
+    if summary:
+        lines.append(f"    <summary type=\"html\">{xml_escape(summary)}</summary>\n")
+    for category in post["categories"] + post["tags"]:
+        lines.append(f"    <category term=\"{xml_escape(category)}\" />\n")
+    lines.append("  </entry>\n")
+    return "".join(lines)
+
+
+# Parse one source file into its cached record: what the outputs are ordered by, plus its
+# ready-made sitemap and feed fragments (None when it is not listed there)
+def parse_source(kind, directory, name, text, site_url):
+    if kind == "post":
+        post = parse_post(os.path.join(directory, name), text)
+        permalink = POST_URL_PREFIX + post["slug"]
+        # Unpublished posts are left out of both outputs, as they are from the tag index
+        if not post["published"]:
+            return {"kind": kind, "url": permalink, "date": post["date"], "sitemap": None, "feed": None}
+        return {
+            "kind": kind, "url": permalink, "date": post["date"],
+            "sitemap": sitemap_fragment(site_url, permalink, post["date"]),
+            "feed": feed_fragment(site_url, post, permalink),
+        }
+
+    front_matter, _ = split_front_matter(text)
+    if kind == "project":
+        url = str(front_matter.get("permalink") or PROJECT_URL_PREFIX + os.path.splitext(name)[0])
+        listed = front_matter.get("sitemap") is not False
+    else:
+        url = page_url(os.path.join(os.path.basename(directory), name), front_matter)
+        listed = is_sitemap_page(url, front_matter)
+    lastmod = front_matter.get("last_modified_at")
+    return {
+        "kind": kind, "url": url, "date": None,
+        "sitemap": sitemap_fragment(site_url, url, str(lastmod) if lastmod else None) if listed else None,
+        "feed": None,
+    }
+
+
+# Names of the source files of one kind in a directory
+def source_names(kind, directory):
+    if not os.path.isdir(directory):
+        return []
+    names = []
+    for name in sorted(os.listdir(directory)):
+        if not os.path.isfile(os.path.join(directory, name)):
+            continue
+        if kind == "post" and not POST_FILE_NAME.match(name):
+            continue
+        if kind != "post" and not name.endswith(PAGE_EXTENSIONS):
+            continue
+        names.append(name)
+    return names
+
+
+# Load the feed cache, starting fresh if it is missing or corrupt
+def load_cache(cache_file):
+    try:
+        with open(cache_file, 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"version": CACHE_VERSION, "site_url": None, "files": {}}
+
+
+# Save the feed cache
+def save_cache(cache_file, cache):
+    try:
+        with open(cache_file, 'w') as file:
+            json.dump(cache, file)
+    except PermissionError:
+        raise Exception(f"Permission denied: Unable to write to {cache_file}")
+
+
+# Records of every source file. A file is read only when its size or mtime changed, and
+# re-parsed only when its content hash changed; everything else comes from the cache.
+def collect_records(sources, cache, site_url):
+    files = {}
+    for kind, directory in sources:
+        for name in source_names(kind, directory):
+            key = f"{kind}:{name}"
+            file_path = os.path.join(directory, name)
+            stat = os.stat(file_path)
+            cached = cache["files"].get(key)
+            if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                files[key] = cached
+                continue
+
+            with open(file_path, 'rb') as file:
+                content = file.read()
+            file_hash = hashlib.sha256(content).hexdigest()
+            if cached and cached["hash"] == file_hash:
+                record = cached["record"]
+            else:
+                count("feed.files_parsed")
+                record = parse_source(kind, directory, name, content.decode("utf-8"), site_url)
+            files[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "hash": file_hash, "record": record}
+    count("feed.files", len(files))
+    cache["files"] = files
+    return [entry["record"] for entry in files.values()]
+
+
+# Stream the sitemap: pages and projects by URL, then posts newest first
+def sitemap_chunks(records):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for record in records:
+        if record["sitemap"]:
+            yield record["sitemap"]
+    yield "</urlset>\n"
+
+
+# Stream the Atom feed of the newest posts
+def feed_chunks(posts, config, feed_url):
+    updated = iso_timestamp(posts[0]["date"]) if posts else "1970-01-01T00:00:00+00:00"
+    yield '<?xml version="1.0" encoding="utf-8"?>\n'
+    yield '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+    yield f'  <link href="{xml_escape(feed_url)}" rel="self" type="application/atom+xml" />\n'
+    yield f'  <link href="{xml_escape(config["url"])}/" rel="alternate" type="text/html" />\n'
+    yield f"  <updated>{updated}</updated>\n"
+    yield f"  <id>{xml_escape(feed_url)}</id>\n"
+    yield f'  <title type="html">{xml_escape(config["title"])}</title>\n'
+    if config["description"]:
+        yield f"  <subtitle>{xml_escape(config['description'])}</subtitle>\n"
+    if config["author"]:
+        yield f"  <author>\n    <name>{xml_escape(config['author'])}</name>\n  </author>\n"
+    for post in posts:
+        yield post["feed"]
+    yield "</feed>\n"
+
+
+# Stream chunks to a temporary file and move it into place only if the content changed,
+# so Jekyll sees no spurious updates; returns True if the file was replaced
+def stream_to_file(chunks, output_file):
+    digest = hashlib.sha256()
+    temporary_file = temporary_path(output_file)
+    try:
+        with open(temporary_file, 'w', encoding="utf-8") as file:
+            for chunk in chunks:
+                file.write(chunk)
+                digest.update(chunk.encode("utf-8"))
+            count("bytes_written", file.tell())
+
+        previous = hashlib.sha256()
+        try:
+            with open(output_file, 'rb') as file:
+                for block in iter(lambda: file.read(1 << 16), b""):
+                    previous.update(block)
+        except FileNotFoundError:
+            previous = None
+        if previous is not None and previous.digest() == digest.digest():
+            os.remove(temporary_file)
+            return False
+        os.replace(temporary_file, output_file)
+    except BaseException as e:
+        # Never leave a partly written temporary file behind, whatever interrupted the write
+        if os.path.exists(temporary_file):
+            os.remove(temporary_file)
+        if isinstance(e, PermissionError):
+            raise Exception(f"Permission denied: Unable to write to {output_file}")
+        raise
+    return True
+
+
+# Generate sitemap.xml and feed.xml from the posts, projects and pages
+@timed("feed.generate")
+def generate_feed(posts_dir=POSTS_DIR, projects_dir=PROJECTS_DIR, pages_dir=PAGES_DIR, config_file=CONFIG_FILE,
+                  sitemap_file=SITEMAP_FILE, feed_file=FEED_FILE, cache_file=CACHE_FILE):
+    config = load_site_config(config_file)
+    cache = load_cache(cache_file)
+    # Fragments embed absolute URLs, so a new site address (or cache format) invalidates all of them
+    if cache.get("version") != CACHE_VERSION or cache.get("site_url") != config["url"]:
+        cache = {"version": CACHE_VERSION, "site_url": config["url"], "files": {}}
+
+    with stage("feed.collect"):
+        records = collect_records([("page", pages_dir), ("project", projects_dir), ("post", posts_dir)],
+                                  cache, config["url"])
+    save_cache(cache_file, cache)
+
+    pages = sorted((record for record in records if record["kind"] != "post"), key=lambda record: record["url"])
+    posts = sorted((record for record in records if record["kind"] == "post" and record["feed"]),
+                   key=lambda record: (record["date"], record["url"]), reverse=True)
+    feed_url = f"{config['url']}/{os.path.basename(feed_file)}"
+
+    with stage("feed.write"):
+        written = stream_to_file(sitemap_chunks(pages + posts), sitemap_file)
+        written += stream_to_file(feed_chunks(posts[:FEED_LIMIT], config, feed_url), feed_file)
+    print(f"Sitemap and feed saved to {sitemap_file} and {feed_file} ({written} files updated).")
+
+
+if __name__ == "__main__":
+    try:
+        generate_feed()
+    except Exception as e:
+        print(f"Error: {e}")
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from instrumentation import count, stage, timed
+
+# Widths (in pixels) of the generated derivatives
+DERIVATIVE_WIDTHS = [320, 640, 1280]
+# Output formats and the Pillow save options for each
+DERIVATIVE_FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 6},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+# Cache directory for derivatives, relative to the site root
+CACHE_DIR = "info/media/derived"
+# Manifest recording the derivatives built for each source hash
+MANIFEST_FILE = "manifest.json"
+
+
+# Hash a source image so derivatives are keyed by its content
+def hash_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Resolve a project image URL to a file below the site root; remote images are skipped
+def resolve_image_path(image, site_root):
+    if not image or "://" in image or image.startswith("//"):
+        return None
+    file_path = os.path.join(site_root, image.lstrip("/"))
+    return file_path if os.path.isfile(file_path) else None
+
+
+# Load the derivative manifest, starting fresh if it is missing or corrupt
+def load_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE), 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+# Save the derivative manifest
+def save_manifest(cache_dir, manifest):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE), 'w') as file:
+            json.dump(manifest, file, indent=4, sort_keys=True)
+    except PermissionError:
+        raise Exception("Permission denied: Unable to write the image derivative manifest.")
+
+
+# Build every derivative of one source image (runs in a worker process)
+def build_derivatives(source_path, source_hash, cache_dir, widths, formats):
+    try:
+        from PIL import Image
+    except ImportError:
+        raise Exception("Pillow is required to build image derivatives (pip install Pillow).")
+
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    derivatives = []
+    with Image.open(source_path) as image:
+        image = image.convert("RGB")
+        # Never upscale: widths beyond the source collapse to the source width
+        target_widths = sorted({min(width, image.width) for width in widths})
+        for width in target_widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for extension in formats:
+                file_name = f"{stem}-{source_hash[:16]}-{width}w.{extension}"
+                output_path = os.path.join(cache_dir, file_name)
+                if not os.path.exists(output_path):
+                    resized.save(output_path, **DERIVATIVE_FORMATS[extension])
+                derivatives.append({
+                    "file": file_name,
+                    "width": width,
+                    "height": height,
+                    "format": extension,
+                    "bytes": os.path.getsize(output_path),
+                })
+    return derivatives
+
+
+# Check whether every derivative recorded for a source still exists on disk
+def derivatives_current(entry, cache_dir, widths, formats):
+    return (
+        entry is not None
+        and entry.get("widths") == widths
+        and entry.get("formats") == formats
+        and all(os.path.exists(os.path.join(cache_dir, item["file"])) for item in entry["derivatives"])
+    )
+
+
+# Build derivatives for all project images in parallel, skipping current ones.
+# Returns {image URL: [derivative, ...]} with site-absolute paths.
+@timed("images.build_project_derivatives")
+def build_project_derivatives(projects, site_root, cache_dir=CACHE_DIR, widths=None,
+                              formats=None, max_workers=None):
+    widths = sorted(widths or DERIVATIVE_WIDTHS)
+    formats = list(formats or DERIVATIVE_FORMATS)
+    cache_path = os.path.join(site_root, cache_dir)
+    os.makedirs(cache_path, exist_ok=True)
+    manifest = load_manifest(cache_path)
+
+    # Group projects by source image so shared images are processed once
+    sources = {}
+    for project in projects:
+        image = project.get("image", "")
+        source_path = resolve_image_path(image, site_root)
+        if source_path:
+            sources.setdefault(source_path, []).append(image)
+
+    pending = {}
+    source_hashes = {}
+    with stage("images.hash_sources"):
+        for source_path in sources:
+            source_hash = source_hashes[source_path] = hash_file(source_path)
+            if derivatives_current(manifest.get(source_hash), cache_path, widths, formats):
+                count("images.skipped")
+            else:
+                pending[source_path] = source_hash
+
+    if pending:
+        failures = []
+        with stage("images.resize"), ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                source_path: executor.submit(build_derivatives, source_path, source_hash,
+                                             cache_path, widths, formats)
+                for source_path, source_hash in pending.items()
+            }
+            for source_path, future in futures.items():
+                try:
+                    derivatives = future.result()
+                except Exception as e:
+                    failures.append(f"{os.path.relpath(source_path, site_root)}: {e}")
+                    count("images.failed")
+                    continue
+                manifest[pending[source_path]] = {
+                    "source": os.path.relpath(source_path, site_root),
+                    "widths": widths,
+                    "formats": formats,
+                    "derivatives": derivatives,
+                }
+                count("images.built")
+        # Keep the images that did build, so the next run only retries the failed ones
+        save_manifest(cache_path, manifest)
+        if failures:
+            raise Exception(f"Failed to build derivatives for {len(failures)} image(s):\n" + "\n".join(failures))
+
+    url_prefix = "/" + cache_dir.strip("/")
+    results = {}
+    for source_path, images in sources.items():
+        derivatives = [
+            {"path": f"{url_prefix}/{item['file']}", "width": item["width"], "format": item["format"]}
+            for item in manifest[source_hashes[source_path]]["derivatives"]
+        ]
+        for image in images:
+            results[image] = derivatives
+    return results
@@ -0,0 +1,111 @@
+import functools
+import json
+import time
+from contextlib import contextmanager
+
+# Accumulated {stage: {"calls": n, "seconds": total}} timings for this run
+_stages = {}
+# Accumulated {counter: value} totals for this run
+_counters = {}
+# Active optional profilers
+_profiler = None
+_tracemalloc_enabled = False
+
+
+# Time a block of code and add it to the named stage
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        totals = _stages.get(name)
+        if totals is None:
+            totals = _stages[name] = {"calls": 0, "seconds": 0.0}
+        totals["calls"] += 1
+        totals["seconds"] += elapsed
+
+
+# Decorator that times every call of a function under the named stage
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Add to a named counter, e.g. entries processed or bytes written
+def count(name, amount=1):
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+# Start the optional cProfile and tracemalloc captures
+def start_profiling(cprofile=False, trace_memory=False):
+    global _profiler, _tracemalloc_enabled
+    if cprofile:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+        _tracemalloc_enabled = True
+
+
+# Stop profiling and build the machine-readable report
+def build_report(profile_file=None, top_allocations=10):
+    global _profiler, _tracemalloc_enabled
+    report = {
+        "stages": {
+            name: {"calls": totals["calls"], "seconds": round(totals["seconds"], 6)}
+            for name, totals in sorted(_stages.items(), key=lambda item: -item[1]["seconds"])
+        },
+        "counters": dict(sorted(_counters.items())),
+    }
+
+    if _profiler is not None:
+        _profiler.disable()
+        if profile_file:
+            _profiler.dump_stats(profile_file)
+            report["profile_file"] = profile_file
+        _profiler = None
+
+    if _tracemalloc_enabled:
+        import tracemalloc
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        _tracemalloc_enabled = False
+        report["memory"] = {
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top_allocations": [
+                {"location": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:top_allocations]
+            ],
+        }
+
+    return report
+
+
+# Write the report as JSON to a file, or print it when the path is "-"
+def write_report(output_file, profile_file=None):
+    report_json = json.dumps(build_report(profile_file), indent=4)
+    if output_file == "-":
+        print(report_json)
+        return
+    try:
+        with open(output_file, 'w') as file:
+            file.write(report_json)
+    except PermissionError:
+        raise Exception(f"Permission denied: Unable to write to {output_file}")
+
+
+# Clear all collected timings and counters
+def reset():
+    _stages.clear()
+    _counters.clear()
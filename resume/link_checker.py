@@ -0,0 +1,322 @@
+import json
+import os
+import re
+import time
+from urllib.parse import urljoin, urlsplit
+from compressed_io import read_json
+from instrumentation import count, stage, timed
+from posts import read_posts
+
+# Paths relative to the repository root
+RESUME_FILE = "resume/resume.json"
+SOCIAL_MEDIA_FILE = "_data/social-media.yml"
+CONTACTS_FILE = "info/contacts.json"
+POSTS_DIR = "_posts"
+CACHE_FILE = ".link-check-cache.json"
+POST_CACHE_FILE = ".post-index-cache.json"
+
+# Seconds a successful check stays valid before it is revalidated
+TTL = 24 * 60 * 60
+# Simultaneous connections and requests per second allowed for each host
+CONNECTIONS_PER_HOST = 2
+REQUESTS_PER_SECOND = 5.0
+# Seconds before a request is abandoned
+TIMEOUT = 10.0
+# Redirects followed before a link counts as broken
+MAX_REDIRECTS = 5
+USER_AGENT = "Mozilla/5.0 (compatible; resume-link-checker)"
+
+# Links in Markdown and HTML bodies
+_MARKDOWN_LINK = re.compile(r"\]\(\s*<?([^)\s>]+)")
+_HTML_LINK = re.compile(r"""(?:href|src)\s*=\s*["']([^"']+)["']""")
+
+
+# Record a URL and where it was found
+def add_link(links, url, source):
+    url = str(url or "").strip()
+    if url and "{{" not in url and "{%" not in url:
+        links.setdefault(url, [])
+        if source not in links[url]:
+            links[url].append(source)
+
+
+# Gather every URL and asset path from the resume projects, social links, contacts and posts.
+# Returns {url or path: [sources]}.
+def collect_links(resume_file=RESUME_FILE, social_media_file=SOCIAL_MEDIA_FILE, contacts_file=CONTACTS_FILE,
+                  posts_dir=POSTS_DIR, post_cache_file=POST_CACHE_FILE):
+    import yaml
+    links = {}
+
+    try:
+        resume = read_json(resume_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        resume = {}
+    for section in resume.get("sections", []):
+        if section["title"] == "Projects":
+            for project in section["items"]:
+                for field in ("external_url", "image"):
+                    add_link(links, project.get(field), f"{resume_file}: {project.get('name', 'project')} {field}")
+
+    try:
+        with open(social_media_file, 'r') as file:
+            social_media = yaml.safe_load(file) or {}
+    except FileNotFoundError:
+        social_media = {}
+    for name, network in social_media.items():
+        if isinstance(network, dict):
+            add_link(links, network.get("url"), f"{social_media_file}: {name}")
+
+    try:
+        with open(contacts_file, 'r') as file:
+            contacts = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        contacts = {}
+    for group in ("websites", "accounts"):
+        for contact in contacts.get(group, []):
+            add_link(links, contact.get("url"), f"{contacts_file}: {contact.get('label') or contact.get('platform')}")
+
+    if os.path.isdir(posts_dir):
+        posts, _ = read_posts(posts_dir, post_cache_file)
+        for post in posts:
+            source = os.path.join(posts_dir, post["file"])
+            if post["url"].startswith(("http://", "https://")):
+                add_link(links, post["url"], f"{source}: external_url")
+            for pattern in (_MARKDOWN_LINK, _HTML_LINK):
+                for url in pattern.findall(post["body"]):
+                    add_link(links, url, source)
+    return links
+
+
+# Whether a link is a remote URL, a local asset, or something not checked (anchors, mail, pages)
+def link_kind(url):
+    parts = urlsplit(url)
+    if parts.scheme in ("http", "https"):
+        return "remote"
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    # Only paths to files can be checked without building the site; permalinks are skipped
+    return "local" if os.path.splitext(parts.path)[1] else None
+
+
+# Check a local asset path against the site sources
+def check_local(url, site_root):
+    path = urlsplit(url).path
+    found = os.path.isfile(os.path.join(site_root, path.lstrip("/")))
+    return {"ok": found, "status": None if found else "missing file"}
+
+
+# Connections to one host: a bounded pool of keep-alive http.client connections and a request
+# rate limit. Requests run in worker threads, so slow hosts never block the others.
+class HostPool:
+    def __init__(self, scheme, host, connections, rate, timeout):
+        import asyncio
+        self.scheme = scheme
+        self.host = host
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(connections)
+        self.idle = []
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_start = 0.0
+
+    # Wait until the rate limit allows another request to this host
+    async def throttle(self):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        start = max(loop.time(), self.next_start)
+        self.next_start = start + self.interval
+        await asyncio.sleep(start - loop.time())
+
+    # Send one request on a pooled connection; returns (status, headers)
+    def request(self, connection, method, path, headers):
+        connection.request(method, path, headers=headers)
+        response = connection.getresponse()
+        # Read the body so the connection can be reused
+        response.read()
+        return response.status, {name.lower(): value for name, value in response.getheaders()}
+
+    # Run a request within the connection and rate limits of this host
+    async def send(self, method, path, headers):
+        import asyncio
+        import http.client
+        async with self.slots:
+            await self.throttle()
+            while True:
+                reused = bool(self.idle)
+                if reused:
+                    connection = self.idle.pop()
+                else:
+                    connection_type = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+                    connection = connection_type(self.host, timeout=self.timeout)
+                    count("links.connections_opened")
+                try:
+                    result = await asyncio.to_thread(self.request, connection, method, path, headers)
+                except Exception as e:
+                    connection.close()
+                    # The server may have dropped an idle keep-alive connection; retry on a new one
+                    if reused and isinstance(e, (ConnectionError, http.client.BadStatusLine)):
+                        continue
+                    raise
+                self.idle.append(connection)
+                return result
+
+    # Close every idle connection
+    def close(self):
+        for connection in self.idle:
+            connection.close()
+        self.idle = []
+
+
+# Check links concurrently, reusing fresh cached results and revalidating stale ones
+class LinkChecker:
+    def __init__(self, cache, connections=CONNECTIONS_PER_HOST, rate=REQUESTS_PER_SECOND, timeout=TIMEOUT):
+        self.cache = cache
+        self.connections = connections
+        self.rate = rate
+        self.timeout = timeout
+        self.pools = {}
+
+    # Pool for the scheme and host of a URL
+    def pool(self, url):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        if key not in self.pools:
+            self.pools[key] = HostPool(parts.scheme, parts.netloc, self.connections, self.rate, self.timeout)
+        return self.pools[key]
+
+    # Check one remote URL, following redirects. Sends the cached ETag and Last-Modified so an
+    # unchanged resource answers 304 without a body; HEAD falls back to GET where it is refused.
+    async def check_remote(self, url):
+        cached = self.cache.get(url) or {}
+        headers = {"User-Agent": USER_AGENT}
+        if cached.get("ok"):
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        target = url
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                parts = urlsplit(target)
+                path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+                pool = self.pool(target)
+                status, response_headers = await pool.send("HEAD", path, headers)
+                if status in (405, 501, 403):
+                    status, response_headers = await pool.send("GET", path, headers)
+                count("links.requests")
+                if 300 <= status < 400 and status != 304 and "location" in response_headers:
+                    target = urljoin(target, response_headers["location"])
+                    continue
+                break
+            else:
+                return {"ok": False, "status": "too many redirects"}
+        except Exception as e:
+            return {"ok": False, "status": f"{type(e).__name__}: {e}"}
+
+        if status == 304:
+            count("links.not_modified")
+            return dict(cached, checked_at=time.time())
+        return {
+            "ok": status < 400,
+            "status": status,
+            "final_url": target if target != url else None,
+            "etag": response_headers.get("etag"),
+            "last_modified": response_headers.get("last-modified"),
+        }
+
+    # Check every remote URL concurrently; returns {url: result}
+    async def check_all(self, urls):
+        import asyncio
+
+        async def check(url):
+            result = await self.check_remote(url)
+            result["checked_at"] = result.get("checked_at") or time.time()
+            return url, result
+
+        try:
+            return dict(await asyncio.gather(*(check(url) for url in urls)))
+        finally:
+            for pool in self.pools.values():
+                pool.close()
+
+
+# Load the link cache, starting fresh if it is missing or corrupt
+def load_cache(cache_file):
+    try:
+        with open(cache_file, 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+# Save the link cache
+def save_cache(cache_file, cache):
+    try:
+        with open(cache_file, 'w') as file:
+            json.dump(cache, file, indent=1, sort_keys=True)
+    except PermissionError:
+        raise Exception(f"Permission denied: Unable to write to {cache_file}")
+
+
+# Check every link and asset; returns {url: result with its sources}.
+# Successful results younger than ttl are reused without any request.
+@timed("links.check")
+def check_links(site_root=".", resume_file=RESUME_FILE, social_media_file=SOCIAL_MEDIA_FILE,
+                contacts_file=CONTACTS_FILE, posts_dir=POSTS_DIR, cache_file=CACHE_FILE,
+                post_cache_file=POST_CACHE_FILE, ttl=TTL, connections=CONNECTIONS_PER_HOST,
+                rate=REQUESTS_PER_SECOND, timeout=TIMEOUT, remote=True):
+    import asyncio
+    with stage("links.collect"):
+        links = collect_links(resume_file, social_media_file, contacts_file, posts_dir, post_cache_file)
+    cache = load_cache(cache_file)
+    now = time.time()
+
+    results = {}
+    stale = []
+    for url in links:
+        kind = link_kind(url)
+        if kind == "local":
+            results[url] = check_local(url, site_root)
+        elif kind == "remote" and remote:
+            cached = cache.get(url)
+            if cached and cached.get("ok") and now - cached.get("checked_at", 0) < ttl:
+                results[url] = cached
+                count("links.cache_hits")
+            else:
+                stale.append(url)
+
+    with stage("links.remote"):
+        checked = asyncio.run(LinkChecker(cache, connections, rate, timeout).check_all(stale)) if stale else {}
+    # Only successful results are cached: a broken link is checked again on every run, and a
+    # link that stopped working loses the validators of the version that worked
+    for url, result in checked.items():
+        if result["ok"]:
+            cache[url] = result
+        else:
+            cache.pop(url, None)
+    results.update(checked)
+    # Forget URLs that no longer appear anywhere
+    for url in [url for url in cache if url not in links]:
+        del cache[url]
+    save_cache(cache_file, cache)
+    count("links.checked", len(checked))
+
+    return {url: dict(result, sources=links[url]) for url, result in results.items()}
+
+
+# Print the broken links with where they were found; returns the number broken
+def report_links(results):
+    broken = {url: result for url, result in results.items() if not result["ok"]}
+    for url, result in sorted(broken.items()):
+        print(f"BROKEN {url} ({result['status']})")
+        for source in result["sources"]:
+            print(f"    in {source}")
+    print(f"Checked {len(results)} links and assets: {len(broken)} broken.")
+    return len(broken)
+
+
+if __name__ == "__main__":
+    try:
+        report_links(check_links())
+    except Exception as e:
+        print(f"Error: {e}")
@@ -0,0 +1,85 @@
+import os
+from datetime import datetime
+from instrumentation import count
+
+# Locale written to the usual data file paths; other locales go to a subdirectory named after them
+DEFAULT_LOCALE = "en"
+
+# Abbreviated month names per locale; "en" matches strftime("%b") in the C locale
+MONTH_NAMES = {
+    "en": ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"],
+    "ar": ["يناير", "فبراير", "مارس", "أبريل", "مايو", "يونيو", "يوليو", "أغسطس", "سبتمبر", "أكتوبر", "نوفمبر",
+           "ديسمبر"],
+    "fr": ["janv.", "févr.", "mars", "avr.", "mai", "juin", "juil.", "août", "sept.", "oct.", "nov.", "déc."],
+    "de": ["Jan.", "Feb.", "März", "Apr.", "Mai", "Juni", "Juli", "Aug.", "Sept.", "Okt.", "Nov.", "Dez."],
+    "es": ["ene", "feb", "mar", "abr", "may", "jun", "jul", "ago", "sept", "oct", "nov", "dic"],
+}
+
+# Labels for dates that are not a month, per locale
+PRESENT_LABELS = {"en": "Present", "ar": "حتى الآن", "fr": "Aujourd'hui", "de": "Heute", "es": "Actualidad"}
+INVALID_LABELS = {"en": "Invalid date", "ar": "تاريخ غير صالح", "fr": "Date invalide", "de": "Ungültiges Datum",
+                  "es": "Fecha no válida"}
+
+# One formatter per locale, shared by every generator in the process
+_formatters = {}
+
+
+# Parse YYYY-MM into (year, month); returns "present" or None for other values
+def parse_month(date_str):
+    try:
+        date_obj = datetime.strptime(date_str, "%Y-%m")
+        return date_obj.year, date_obj.month
+    except (TypeError, ValueError):
+        if isinstance(date_str, str) and date_str.lower() == "present":
+            return "present"
+        return None
+
+
+# Formats parsed dates as MMM YYYY in one locale, remembering every label it has produced
+class DateFormatter:
+    def __init__(self, locale):
+        if locale not in MONTH_NAMES:
+            raise Exception(f"Unsupported locale '{locale}' (available: {', '.join(sorted(MONTH_NAMES))}).")
+        self.locale = locale
+        self.months = MONTH_NAMES[locale]
+        self.labels = {}
+
+    # Label of a date parsed by parse_month
+    def format(self, parsed):
+        if parsed in self.labels:
+            return self.labels[parsed]
+        count("locales.dates_formatted")
+        if parsed == "present":
+            label = PRESENT_LABELS[self.locale]
+        elif parsed is None:
+            label = INVALID_LABELS[self.locale]
+        else:
+            label = f"{self.months[parsed[1] - 1]} {parsed[0]}"
+        self.labels[parsed] = label
+        return label
+
+
+# Cached formatter for a locale; raises for locales without a month table
+def get_formatter(locale):
+    if locale not in _formatters:
+        _formatters[locale] = DateFormatter(locale)
+    return _formatters[locale]
+
+
+# Value of a field in a locale: a translation stored as "<field>_<locale>" if the entry has one,
+# otherwise the field itself
+def localized(entry, field, locale, default=None):
+    if locale != DEFAULT_LOCALE:
+        translated = f"{field}_{locale}"
+        if translated in entry:
+            return entry[translated]
+    return entry.get(field, default)
+
+
+# Output path for a locale: the path itself for the default locale, else <dir>/<locale>/<name>,
+# which Jekyll exposes as site.data.<locale>.<name>
+def locale_path(path, locale):
+    if locale == DEFAULT_LOCALE:
+        return path
+    directory, name = os.path.split(path)
+    return os.path.join(directory, locale, name)
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import re
+
+# Jekyll post file names: YYYY-MM-DD-slug.md
+POST_FILE_NAME = re.compile(r"^(\d{4}-\d{2}-\d{2})-(.+)\.(md|markdown|html)$")
+# Front matter block at the top of a post
+FRONT_MATTER = re.compile(r"\A---\s*\n(.*?)\n---\s*(?:\n|\Z)", re.S)
+# Permalink prefix for posts, matching `permalink: /blog/:title` in _config.yml
+POST_URL_PREFIX = "/blog/"
+
+
+# Split a document into (front matter dict, body)
+def split_front_matter(text):
+    import yaml
+    match = FRONT_MATTER.match(text)
+    if not match:
+        return {}, text
+    try:
+        front_matter = yaml.safe_load(match.group(1)) or {}
+    except yaml.YAMLError:
+        front_matter = {}
+    return front_matter, text[match.end():]
+
+
+# Normalize a front matter list field that may be a list, a string or empty
+def as_list(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        return value.split()
+    return [str(item) for item in value if item]
+
+
+# Parse one post file into the fields the generators need
+def parse_post(file_path, text):
+    match = POST_FILE_NAME.match(os.path.basename(file_path))
+    if not match:
+        return None
+    date, slug = match.group(1), match.group(2)
+    front_matter, body = split_front_matter(text)
+    categories = as_list(front_matter.get("categories")) or as_list(front_matter.get("category"))
+    return {
+        "file": os.path.basename(file_path),
+        "date": date,
+        "slug": slug,
+        "title": str(front_matter.get("title") or slug.replace("-", " ").title()),
+        "description": str(front_matter.get("description") or ""),
+        "tags": as_list(front_matter.get("tags")),
+        "categories": categories,
+        "url": front_matter.get("external_url") or POST_URL_PREFIX + slug,
+        "hash": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        "body": body,
+        # Jekyll leaves posts with `published: false` out of the site
+        "published": front_matter.get("published") is not False,
+    }
+
+
+# Load the post cache, starting fresh if it is missing or corrupt
+def load_post_cache(cache_file):
+    if not cache_file:
+        return {}
+    try:
+        with open(cache_file, 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+# Save the post cache
+def save_post_cache(cache_file, cache):
+    try:
+        with open(cache_file, 'w') as file:
+            json.dump(cache, file)
+    except PermissionError:
+        raise Exception(f"Permission denied: Unable to write to {cache_file}")
+
+
+# Read every published post, re-parsing only files whose size or mtime changed since the cached run.
+# Returns (posts sorted newest first, names of the files that were re-parsed).
+def read_posts(posts_dir, cache_file=None):
+    cache = load_post_cache(cache_file)
+    posts = []
+    changed = []
+    seen = set()
+
+    for name in sorted(os.listdir(posts_dir)):
+        file_path = os.path.join(posts_dir, name)
+        if not POST_FILE_NAME.match(name) or not os.path.isfile(file_path):
+            continue
+        seen.add(name)
+        stat = os.stat(file_path)
+        cached = cache.get(name)
+        # Records cached before the `published` field existed are parsed again
+        if (cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size
+                and "published" in cached["post"]):
+            if cached["post"]["published"]:
+                posts.append(cached["post"])
+            continue
+
+        with open(file_path, 'r', encoding="utf-8") as file:
+            post = parse_post(file_path, file.read())
+        cache[name] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "post": post}
+        if post["published"]:
+            posts.append(post)
+        changed.append(name)
+
+    removed = set(cache) - seen
+    for name in removed:
+        del cache[name]
+    if cache_file and (changed or removed):
+        save_post_cache(cache_file, cache)
+
+    posts.sort(key=lambda post: (post["date"], post["file"]), reverse=True)
+    return posts, changed + sorted(removed)
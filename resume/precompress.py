@@ -0,0 +1,228 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from instrumentation import count, stage, timed
+
+# Files that are minified before compression. JavaScript is only compressed: its strings,
+# template literals and regular expressions cannot be told apart without a full parser.
+MINIFY_EXTENSIONS = {".html", ".css", ".json"}
+# Files that are compressed (minified or not)
+COMPRESS_EXTENSIONS = MINIFY_EXTENSIONS | {".js", ".xml", ".svg", ".txt", ".map"}
+# Bumped when the minifiers change, so cached outputs of older minifiers are not restored
+MINIFIER_VERSION = 2
+# Suffixes of the precompressed siblings written next to each file
+COMPRESSED_SUFFIXES = (".gz", ".br")
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 256
+# Manifest file kept inside the cache directory
+MANIFEST_FILE = "manifest.json"
+
+# HTML blocks whose whitespace is significant or which hold other languages
+_HTML_RAW_BLOCK = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.S | re.I)
+# HTML comments, except conditional comments
+_HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)
+_WHITESPACE_RUN = re.compile(r"\s+")
+# CSS tokens: quoted strings, comments, whitespace runs, punctuation and everything else
+_CSS_TOKEN = re.compile(
+    r'"(?:\\.|[^"\\])*"' r"|'(?:\\.|[^'\\])*'" r"|/\*.*?\*/|\s+|[{};,>]|[^\"'/\s{};,>]+|.", re.S)
+# CSS punctuation that needs no whitespace around it
+_CSS_PUNCTUATION = {"{", "}", ";", ",", ">"}
+
+
+# Collapse whitespace in HTML outside of pre/textarea/script/style blocks
+def minify_html(text):
+    parts = _HTML_RAW_BLOCK.split(text)
+    minified = []
+    # split() yields text, block, tag name, text, block, tag name, ...
+    for index in range(0, len(parts), 3):
+        chunk = _HTML_COMMENT.sub("", parts[index])
+        minified.append(_WHITESPACE_RUN.sub(" ", chunk))
+        if index + 1 < len(parts):
+            minified.append(parts[index + 1])
+    return "".join(minified).strip()
+
+
+# Strip comments and redundant whitespace from CSS, leaving quoted strings untouched
+def minify_css(text):
+    output = []
+    separated = False
+    for token in _CSS_TOKEN.findall(text):
+        # Comments separate tokens like whitespace does
+        if token.isspace() or token.startswith("/*"):
+            separated = True
+            continue
+        if token == "}" and output and output[-1] == ";":
+            output.pop()
+        if separated and output and token not in _CSS_PUNCTUATION and output[-1] not in _CSS_PUNCTUATION:
+            output.append(" ")
+        separated = False
+        output.append(token)
+    return "".join(output)
+
+
+# Re-serialize JSON compactly; documents that do not parse are left alone
+def minify_json(text):
+    try:
+        return json.dumps(json.loads(text), separators=(",", ":"), ensure_ascii=False)
+    except json.JSONDecodeError:
+        return text
+
+
+MINIFIERS = {".html": minify_html, ".css": minify_css, ".json": minify_json}
+
+
+# Load the brotli module if it is installed
+def load_brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+# Hash file contents for the manifest
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# Remove compressed siblings left by an earlier run that this run did not produce,
+# so the server never sends a stale .gz/.br for a file that changed
+def remove_stale_siblings(file_path, sizes):
+    for suffix in COMPRESSED_SUFFIXES:
+        if suffix not in sizes and os.path.exists(file_path + suffix):
+            os.remove(file_path + suffix)
+
+
+# Minify and compress a single file (runs in a worker process).
+# `entry` is the manifest record from the previous run, if any.
+def process_file(file_path, entry, cache_dir, use_brotli):
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    current_hash = hash_bytes(data)
+    extension = os.path.splitext(file_path)[1].lower()
+    result = {"source_hash": current_hash, "original_bytes": len(data), "minifier": MINIFIER_VERSION,
+              "skipped": False}
+
+    # Unchanged since the last run: restore the cached outputs instead of recomputing them
+    if (entry and entry.get("minifier") == MINIFIER_VERSION
+            and current_hash in (entry["source_hash"], entry["output_hash"])):
+        cached = os.path.join(cache_dir, entry["output_hash"])
+        suffixes = [""] + [suffix for suffix in COMPRESSED_SUFFIXES if suffix in entry["sizes"]]
+        if all(os.path.exists(cached + suffix) for suffix in suffixes):
+            if current_hash != entry["output_hash"]:
+                shutil.copyfile(cached, file_path)
+            for suffix in suffixes[1:]:
+                if not os.path.exists(file_path + suffix):
+                    shutil.copyfile(cached + suffix, file_path + suffix)
+            remove_stale_siblings(file_path, entry["sizes"])
+            return dict(entry, skipped=True)
+
+    output = data
+    if extension in MINIFIERS:
+        try:
+            output = MINIFIERS[extension](data.decode("utf-8")).encode("utf-8")
+        except UnicodeDecodeError:
+            output = data
+    output_hash = hash_bytes(output)
+    cached = os.path.join(cache_dir, output_hash)
+
+    sizes = {"": len(output)}
+    compressed = {}
+    if len(output) >= MIN_COMPRESS_BYTES:
+        compressed[".gz"] = gzip.compress(output, compresslevel=9, mtime=0)
+        if use_brotli:
+            compressed[".br"] = load_brotli().compress(output, quality=11)
+
+    with open(file_path, 'wb') as file:
+        file.write(output)
+    with open(cached, 'wb') as file:
+        file.write(output)
+    for suffix, payload in compressed.items():
+        # Only keep a compressed sibling when it is actually smaller
+        if len(payload) >= len(output):
+            continue
+        sizes[suffix] = len(payload)
+        for path in (file_path + suffix, cached + suffix):
+            with open(path, 'wb') as file:
+                file.write(payload)
+    remove_stale_siblings(file_path, sizes)
+
+    result.update(output_hash=output_hash, sizes=sizes)
+    return result
+
+
+# Collect the files below the site directory that should be processed
+def find_site_files(site_dir):
+    files = []
+    for root, _, names in os.walk(site_dir):
+        for name in names:
+            if os.path.splitext(name)[1].lower() in COMPRESS_EXTENSIONS:
+                files.append(os.path.join(root, name))
+    return sorted(files)
+
+
+# Load the manifest of previously processed files
+def load_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE), 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+# Save the manifest of processed files
+def save_manifest(cache_dir, manifest):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE), 'w') as file:
+            json.dump(manifest, file, indent=4, sort_keys=True)
+    except PermissionError:
+        raise Exception("Permission denied: Unable to write the precompress manifest.")
+
+
+# Minify and precompress every text asset in the site directory.
+# Returns a summary with byte totals for the run.
+@timed("precompress.run")
+def precompress_site(site_dir, cache_dir, max_workers=None):
+    if not os.path.isdir(site_dir):
+        raise Exception(f"Site directory not found: {site_dir}")
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = load_manifest(cache_dir)
+    use_brotli = load_brotli() is not None
+    if not use_brotli:
+        print("brotli is not installed; only .gz files will be written.")
+
+    files = find_site_files(site_dir)
+    summary = {"files": len(files), "skipped": 0, "original_bytes": 0, "minified_bytes": 0,
+               "gzip_bytes": 0, "brotli_bytes": 0}
+
+    with stage("precompress.files"), ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for file_path in files:
+            key = os.path.relpath(file_path, site_dir)
+            futures[key] = executor.submit(process_file, file_path, manifest.get(key), cache_dir, use_brotli)
+        for key, future in futures.items():
+            result = future.result()
+            skipped = result.pop("skipped")
+            manifest[key] = result
+            sizes = result["sizes"]
+            summary["skipped"] += skipped
+            summary["original_bytes"] += result["original_bytes"]
+            summary["minified_bytes"] += sizes[""]
+            summary["gzip_bytes"] += sizes.get(".gz", sizes[""])
+            summary["brotli_bytes"] += sizes.get(".br", sizes.get(".gz", sizes[""]))
+
+    # Forget files that no longer exist in the site
+    for key in set(manifest) - set(futures):
+        del manifest[key]
+    save_manifest(cache_dir, manifest)
+
+    count("precompress.files", summary["files"])
+    count("precompress.skipped", summary["skipped"])
+    summary["bytes_saved_minify"] = summary["original_bytes"] - summary["minified_bytes"]
+    summary["bytes_saved_gzip"] = summary["original_bytes"] - summary["gzip_bytes"]
+    summary["bytes_saved_brotli"] = summary["original_bytes"] - summary["brotli_bytes"] if use_brotli else 0
+    return summary
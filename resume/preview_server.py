@@ -0,0 +1,244 @@
+import html
+import json
+import marshal
+import os
+from instrumentation import count, stage, timed
+from resume_server import RequestError, serve_requests
+from skills_generator import convert_skill_to_yaml
+from timeline_generator import TIMELINE_SECTIONS, convert_entry_to_yaml, load_resume
+
+# Defaults for the preview server
+HOST = "127.0.0.1"
+PORT = 4001
+# Milliseconds between the page's checks for a newer revision
+RELOAD_INTERVAL = 1000
+
+# Views the server renders, in navigation order
+VIEWS = ["timeline", "skills", "projects"]
+# Skill categories shown on the skills view, like the about page
+SKILL_GROUPS = [("Tech", "Programming Skills"), ("Other", "Other Skills")]
+
+PAGE_STYLE = """
+body { font-family: system-ui, sans-serif; max-width: 60rem; margin: 2rem auto; padding: 0 1rem; color: #212529; }
+nav a { margin-right: 1rem; }
+.timeline-dates, .project-tools { color: #6c757d; margin: 0.25rem 0; }
+.skill { margin: 0.5rem 0; }
+.progress { background: #e9ecef; border-radius: 0.25rem; height: 0.75rem; }
+.progress-bar { height: 100%; border-radius: 0.25rem; }
+.bg-primary { background: #007bff; } .bg-secondary { background: #6c757d; } .bg-success { background: #28a745; }
+.bg-danger { background: #dc3545; } .bg-warning { background: #ffc107; } .bg-info { background: #17a2b8; }
+.bg-light { background: #f8f9fa; } .bg-dark { background: #343a40; }
+.projects { display: grid; grid-template-columns: repeat(auto-fill, minmax(16rem, 1fr)); gap: 1rem; }
+.project { border: 1px solid #dee2e6; border-radius: 0.25rem; padding: 1rem; }
+.project img { max-width: 100%; }
+"""
+
+# Reloads the page when the server has rendered a newer revision
+RELOAD_SCRIPT = """
+const revision = "%s";
+setInterval(() => fetch("/revision").then((response) => response.json())
+  .then((data) => { if (data.revision !== revision) location.reload(); }).catch(() => {}), %d);
+"""
+
+
+# HTML for one timeline entry, from the same fields timeline_generator writes to _data/timeline.yml
+def render_timeline_entry(entry):
+    item = convert_entry_to_yaml(entry)
+    return (
+        '<li class="timeline-entry">\n'
+        f"  <h3>{html.escape(item['title'])}</h3>\n"
+        f'  <p class="timeline-dates">{html.escape(item["from"])} – {html.escape(item["to"])}</p>\n'
+        f"  <p>{html.escape(item['description'])}</p>\n"
+        "</li>\n"
+    )
+
+
+# HTML for one skill bar, from the same fields skills_generator writes to the skills data files
+def render_skill(skill):
+    item = convert_skill_to_yaml(skill)
+    percentage = html.escape(str(item["percentage"]))
+    return (
+        '<div class="skill">\n'
+        f"  <span>{html.escape(str(item['name']))}</span> <span>{percentage}%</span>\n"
+        f'  <div class="progress"><div class="progress-bar bg-{html.escape(item["color"])}" '
+        f'style="width: {percentage}%"></div></div>\n'
+        "</div>\n"
+    )
+
+
+# HTML for one project card, with the fields project_generator writes to _projects/
+def render_project(project):
+    name = html.escape(project.get("name", "Unnamed Project"))
+    url = project.get("external_url")
+    title = f'<a href="{html.escape(url)}">{name}</a>' if url else name
+    tools = ", ".join(str(tool).strip() for tool in project.get("tools", []) if str(tool).strip())
+    parts = ['<div class="project">\n']
+    if project.get("image"):
+        parts.append(f'  <img src="{html.escape(project["image"])}" alt="{name}">\n')
+    parts.append(f"  <h3>{title}</h3>\n")
+    parts.append(f"  <p>{html.escape(str(project.get('description', 'No description provided.')))}</p>\n")
+    if tools:
+        parts.append(f'  <p class="project-tools">{html.escape(tools)}</p>\n')
+    parts.append("</div>\n")
+    return "".join(parts)
+
+
+# Groups of each view as (heading, list element, renderer, entries)
+def view_groups(data, view):
+    sections = data.get("sections", [])
+    if view == "timeline":
+        entries = [entry for section in sections if section["title"] in TIMELINE_SECTIONS for entry in section["items"]]
+        return [("Timeline", "ul", render_timeline_entry, entries)]
+    if view == "skills":
+        skills = [skill for section in sections if section["title"] == "Skills" for skill in section["items"]]
+        return [
+            (heading, "div", render_skill,
+             [skill for skill in skills if skill.get("category", "Unknown").capitalize() == category])
+            for category, heading in SKILL_GROUPS
+        ]
+    projects = [project for section in sections if section["title"] == "Projects" for project in section["items"]]
+    return [("Projects", 'div class="projects"', render_project, projects)]
+
+
+# Renders the views from the in-memory resume. Entry fragments are cached by the entry's
+# content, so after resume.json changes only new or edited entries are rendered again and
+# each view is reassembled from cached fragments.
+class PreviewService:
+    def __init__(self, resume_file):
+        self.resume_file = resume_file
+        # (mtime_ns, size) of the resume the views were rendered from
+        self.signature = None
+        # (view, marshalled entry) -> HTML fragment
+        self.fragments = {}
+        # view -> HTML body
+        self.views = {}
+        # Bumped whenever a view changes, so open pages know to reload
+        self.revision = 0
+        # Differs between server runs, whose revisions both start from 1
+        self.instance = os.urandom(4).hex()
+        self.refresh()
+
+    # Reload the resume if the file changed and re-render what it affects; returns True on change
+    @timed("preview.refresh")
+    def refresh(self):
+        try:
+            stat = os.stat(self.resume_file)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+        if signature == self.signature and self.views:
+            return False
+        self.signature = signature
+        try:
+            data = load_resume(self.resume_file)
+        except Exception as e:
+            # Keep showing the last good version while the file is missing, half written or invalid
+            if not self.views:
+                raise
+            print(f"Preview not updated: {e}", flush=True)
+            return False
+
+        fragments = {}
+        try:
+            with stage("preview.render"):
+                views = {view: self.render_view(data, view, fragments) for view in VIEWS}
+        except Exception:
+            # Try again on the next request rather than serving the old views as current
+            self.signature = None
+            raise
+        changed = views != self.views
+        self.views = views
+        # Forget fragments of entries that no longer exist
+        self.fragments = fragments
+        if changed:
+            self.revision += 1
+        return changed
+
+    # Revision tag of the pages, unique across server runs; used as ETag and by the reload script
+    def tag(self):
+        return f"{self.instance}-{self.revision}"
+
+    # Body of one view, rendering only entries without a cached fragment
+    def render_view(self, data, view, fragments):
+        parts = []
+        for heading, element, render, entries in view_groups(data, view):
+            parts.append(f"<h2>{html.escape(heading)}</h2>\n<{element}>\n")
+            for entry in entries:
+                key = (view, marshal.dumps(entry))
+                fragment = fragments.get(key) or self.fragments.get(key)
+                if fragment is None:
+                    fragment = render(entry)
+                    count("preview.fragments_rendered")
+                else:
+                    count("preview.fragments_reused")
+                fragments[key] = fragment
+                parts.append(fragment)
+            parts.append(f"</{element.split()[0]}>\n")
+        return "".join(parts)
+
+    # Full HTML page around view bodies
+    def page(self, title, bodies):
+        links = " ".join(f'<a href="/{view}">{view.capitalize()}</a>' for view in VIEWS)
+        return (
+            '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+            f"<title>{html.escape(title)} · Preview</title>\n<style>{PAGE_STYLE}</style>\n</head>\n<body>\n"
+            f'<nav><a href="/">All</a> {links}</nav>\n'
+            + "".join(bodies)
+            + f"<script>{RELOAD_SCRIPT % (self.tag(), RELOAD_INTERVAL)}</script>\n</body>\n</html>\n"
+        )
+
+    # Answer one request: a page per view, / with every view, and /revision for reloading
+    def respond(self, method, target, headers, body):
+        from urllib.parse import urlsplit
+        if method != "GET":
+            raise RequestError(405, f"{method} is not allowed here.")
+        self.refresh()
+        path = urlsplit(target).path.strip("/")
+        if path == "revision":
+            content = json.dumps({"revision": self.tag()}).encode("utf-8")
+            return 200, {"Content-Type": "application/json", "Cache-Control": "no-store"}, content
+
+        if path in VIEWS:
+            views = [path]
+        elif path == "":
+            views = VIEWS
+        else:
+            raise RequestError(404, "Unknown path.")
+        # Pages only change with the revision, which they also embed
+        etag = f'"{self.tag()}"'
+        response_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if headers.get("if-none-match") == etag:
+            count("preview.not_modified")
+            return 304, response_headers, b""
+        count("preview.pages")
+        title = path.capitalize() or "Resume"
+        content = self.page(title, [self.views[view] for view in views]).encode("utf-8")
+        response_headers["Content-Type"] = "text/html; charset=utf-8"
+        return 200, response_headers, content
+
+
+# Serve previews until interrupted
+async def serve(resume_file, host=HOST, port=PORT):
+    import asyncio
+    import signal
+    service = PreviewService(resume_file)
+
+    async def serve_connection(reader, writer):
+        await serve_requests(reader, writer, service.respond)
+
+    server = await asyncio.start_server(serve_connection, host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Previewing {resume_file} on http://{address[0]}:{address[1]}", flush=True)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, stop.set)
+    async with server:
+        await stop.wait()
+
+
+# Run the preview server in a fresh event loop
+def run_preview(resume_file, host=HOST, port=PORT):
+    import asyncio
+    asyncio.run(serve(resume_file, host, port))
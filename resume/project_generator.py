@@ -1,49 +1,48 @@
-import json
-import yaml
-import curses
 import os
+from instrumentation import count, stage, timed
+from section_loader import load_resume_sections
 
 # Path to the JSON file
 RESUME_FILE = "resume/resume.json"
 PROJECTS_DIR = "_projects"
 
-# Ensure the projects directory exists
-os.makedirs(PROJECTS_DIR, exist_ok=True)
-
 # Convert a single project to Markdown format
-def convert_project_to_md(project):
+@timed("projects.convert_project_to_md")
+def convert_project_to_md(project, derivatives=None):
     md_content = f"""---
 name: {project.get('name', 'Unnamed Project')}
 tools: {project.get('tools', [])}
 image: {project.get('image', '')}
 description: {project.get('description', 'No description provided.')}
 external_url: {project.get('external_url', '')}
----"""
-    return md_content
+"""
+    # Resized copies of the project image, when they have been built
+    if derivatives:
+        md_content += "image_derivatives:\n"
+        for derivative in derivatives:
+            md_content += (f"  - {{path: {derivative['path']}, width: {derivative['width']}, "
+                           f"format: {derivative['format']}}}\n")
+    return md_content + "---"
+
+# File name of the Markdown page for a project
+def project_file_name(project):
+    return f"{project.get('name', 'Unnamed_Project').replace(' ', '_').lower()}.md"
 
 # Save a project to an individual Markdown file
-def save_project_md_file(project, output_dir):
-    file_name = f"{project.get('name', 'Unnamed_Project').replace(' ', '_').lower()}.md"
-    file_path = os.path.join(output_dir, file_name)
+@timed("projects.save_project_md_file")
+def save_project_md_file(project, output_dir, derivatives=None):
+    file_path = os.path.join(output_dir, project_file_name(project))
     try:
         with open(file_path, 'w') as file:
-            file.write(convert_project_to_md(project))
+            file.write(convert_project_to_md(project, derivatives))
+            count("bytes_written", file.tell())
         print(f"Project saved to {file_path}")
     except PermissionError:
         raise Exception(f"Permission denied: Unable to write to {file_path}")
 
-# Load JSON data
-def load_resume(file_path):
-    try:
-        with open(file_path, 'r') as file:
-            return json.load(file)
-    except FileNotFoundError:
-        raise Exception("Resume JSON file not found.")
-    except json.JSONDecodeError:
-        raise Exception("Invalid JSON format in the resume file.")
-
 # Curses-based project selection interface
 def curses_project_interface(stdscr, data):
+    import curses
     curses.curs_set(0)
     projects_section = next((section for section in data.get("sections", []) if section["title"] == "Projects"), None)
 
@@ -81,17 +80,44 @@ def curses_project_interface(stdscr, data):
 
     return selected_projects
 
-if __name__ == "__main__":
-    try:
-        # Load the resume data
-        resume_data = load_resume(RESUME_FILE)
-
+# Select every project, for non-interactive builds
+def select_all_projects(data):
+    return [
+        project
+        for section in data.get("sections", [])
+        if section["title"] == "Projects"
+        for project in section["items"]
+    ]
+
+# Export projects to Markdown files, interactively or all of them.
+# When site_root is given, resized image derivatives are built and linked too.
+def generate_projects(resume_file=RESUME_FILE, projects_dir=PROJECTS_DIR, interactive=True, site_root=None):
+    # Ensure the projects directory exists
+    os.makedirs(projects_dir, exist_ok=True)
+
+    # Load only the Projects section of the resume data
+    with stage("projects.load_resume"):
+        resume_data = load_resume_sections(resume_file, ["Projects"])
+
+    if interactive:
         # Use curses for project selection
+        import curses
         selected_projects = curses.wrapper(curses_project_interface, resume_data)
+    else:
+        selected_projects = select_all_projects(resume_data)
+
+    derivatives = {}
+    if site_root is not None:
+        from image_derivatives import build_project_derivatives
+        derivatives = build_project_derivatives(selected_projects, site_root)
 
-        # Save each selected project to a Markdown file
-        for project in selected_projects:
-            save_project_md_file(project, PROJECTS_DIR)
+    # Save each selected project to a Markdown file
+    for project in selected_projects:
+        save_project_md_file(project, projects_dir, derivatives.get(project.get("image", "")))
+    count("projects.entries", len(selected_projects))
 
+if __name__ == "__main__":
+    try:
+        generate_projects()
     except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
@@ -0,0 +1,239 @@
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+from compressed_io import read_json
+from instrumentation import count, stage, timed
+from posts import read_posts, split_front_matter
+from tag_index_generator import slugify, write_if_changed
+
+# Paths relative to the repository root
+POSTS_DIR = "_posts"
+PROJECTS_DIR = "_projects"
+RESUME_FILE = "resume/resume.json"
+OUTPUT_FILE = "_data/related.yml"
+CACHE_FILE = ".related-cache.json"
+POST_CACHE_FILE = ".post-index-cache.json"
+
+# Number of neighbours kept per document
+TOP_K = 3
+
+# Resume sections whose entries take part in the similarity graph
+ENTRY_SECTIONS = ["Education", "Work Experience", "Leadership Experience"]
+
+# Words carrying no topical signal
+STOP_WORDS = set("""
+a about after all also an and any are as at be because been but by can could did do does doing
+for from had has have having he her here his how i if in into is it its just me more most my no
+not of on one only or other our out over own same she should so some such than that the their
+them then there these they this those through to too under up very was we were what when where
+which while who why will with would you your
+""".split())
+
+_WORD = re.compile(r"[a-z][a-z0-9+#]+")
+_MARKUP = re.compile(r"```.*?```|`[^`]*`|<[^>]+>|\(https?://[^)]*\)|https?://\S+", re.S)
+
+
+# Split text into lowercase terms without markup, URLs or stop words
+def tokenize(text):
+    text = _MARKUP.sub(" ", text.lower())
+    return [word for word in _WORD.findall(text) if word not in STOP_WORDS]
+
+
+# Count the terms of a text
+def term_counts(text):
+    counts = {}
+    for term in tokenize(text):
+        counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+# Gather posts, projects and resume entries as {doc id: {kind, key, title, url, text}}
+def collect_documents(posts_dir, projects_dir, resume_file, post_cache_file=None):
+    documents = {}
+
+    posts, _ = read_posts(posts_dir, post_cache_file)
+    for post in posts:
+        documents[f"post:{post['slug']}"] = {
+            "kind": "posts", "key": post["slug"], "title": post["title"], "url": post["url"],
+            "text": " ".join([post["title"], post["description"], " ".join(post["tags"]), post["body"]]),
+        }
+
+    if os.path.isdir(projects_dir):
+        for name in sorted(os.listdir(projects_dir)):
+            if not name.endswith(".md"):
+                continue
+            with open(os.path.join(projects_dir, name), 'r', encoding="utf-8") as file:
+                front_matter, body = split_front_matter(file.read())
+            key = os.path.splitext(name)[0]
+            tools = front_matter.get("tools") or []
+            documents[f"project:{key}"] = {
+                "kind": "projects", "key": key,
+                "title": str(front_matter.get("name") or key),
+                "url": f"/projects/{key}",
+                "text": " ".join([str(front_matter.get("name") or ""), str(front_matter.get("description") or ""),
+                                  " ".join(str(tool) for tool in tools), body]),
+            }
+
+    try:
+        resume = read_json(resume_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        resume = {}
+    for section in resume.get("sections", []):
+        if section["title"] not in ENTRY_SECTIONS:
+            continue
+        for entry in section["items"]:
+            # Title and organization tell most entries apart; a number settles the rest
+            base = "-".join(slugify(part) for part in (entry.get("title", ""), entry.get("organization")) if part)
+            base = f"{slugify(section['title'])}/{base}"
+            key, number = base, 1
+            while f"entry:{key}" in documents:
+                number += 1
+                key = f"{base}-{number}"
+            documents[f"entry:{key}"] = {
+                "kind": "entries", "key": key, "title": entry.get("title", "Untitled Entry"), "url": None,
+                "text": " ".join([entry.get("title", ""), entry.get("organization", ""),
+                                  " ".join(entry.get("description", []))]),
+            }
+    return documents
+
+
+# Build L2-normalized TF-IDF rows and the inverted index (term -> [(doc id, weight)]).
+# This is the sparse-matrix form of X, so X·Xᵀ only touches documents that share terms.
+def build_tfidf(doc_counts):
+    document_frequency = {}
+    for counts in doc_counts.values():
+        for term in counts:
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+
+    total = len(doc_counts)
+    idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+    rows = {}
+    postings = {}
+    for doc_id, counts in doc_counts.items():
+        row = {term: (1 + math.log(tf)) * idf[term] for term, tf in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in row.values())) or 1.0
+        row = {term: weight / norm for term, weight in row.items()}
+        rows[doc_id] = row
+        for term, weight in row.items():
+            postings.setdefault(term, []).append((doc_id, weight))
+    return rows, postings
+
+
+# Compute the top-k cosine neighbours of one document through the inverted index
+def nearest_neighbours(doc_id, rows, postings, k):
+    scores = {}
+    for term, weight in rows[doc_id].items():
+        for other_id, other_weight in postings[term]:
+            if other_id != doc_id:
+                scores[other_id] = scores.get(other_id, 0.0) + weight * other_weight
+    return heapq.nlargest(k, ((round(score, 4), other_id) for other_id, score in scores.items() if score > 0))
+
+
+# Load the related-content cache, starting fresh if it is missing or corrupt
+def load_cache(cache_file):
+    try:
+        with open(cache_file, 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"documents": {}, "neighbours": {}}
+
+
+# Save the related-content cache
+def save_cache(cache_file, cache):
+    try:
+        with open(cache_file, 'w') as file:
+            json.dump(cache, file)
+    except PermissionError:
+        raise Exception(f"Permission denied: Unable to write to {cache_file}")
+
+
+# Work out which neighbour rows must be recomputed after documents changed
+def affected_documents(changed, removed, rows, neighbours):
+    affected = set(changed)
+    changed_terms = set()
+    for doc_id in changed:
+        changed_terms.update(rows[doc_id])
+    stale = set(changed) | set(removed)
+    for doc_id, row in rows.items():
+        if doc_id in affected or doc_id not in neighbours:
+            affected.add(doc_id)
+        elif any(other_id in stale for _, other_id in neighbours[doc_id]):
+            affected.add(doc_id)
+        elif changed_terms and not changed_terms.isdisjoint(row):
+            affected.add(doc_id)
+    return affected
+
+
+# Convert neighbour rows to the data file layout: {kind: {key: [related, ...]}}
+def convert_related_to_yaml(documents, neighbours):
+    import yaml
+    related = {}
+    for doc_id in sorted(neighbours):
+        document = documents[doc_id]
+        related.setdefault(document["kind"], {})[document["key"]] = [
+            {"title": documents[other_id]["title"], "url": documents[other_id]["url"],
+             "kind": documents[other_id]["kind"], "score": score}
+            for score, other_id in neighbours[doc_id]
+        ]
+    return yaml.dump(related, sort_keys=False, allow_unicode=True, default_flow_style=False)
+
+
+# Generate _data/related.yml, re-tokenizing and re-ranking only what changed
+@timed("related.generate")
+def generate_related(posts_dir=POSTS_DIR, projects_dir=PROJECTS_DIR, resume_file=RESUME_FILE,
+                     output_file=OUTPUT_FILE, cache_file=CACHE_FILE, post_cache_file=POST_CACHE_FILE, k=TOP_K):
+    cache = load_cache(cache_file)
+    if cache.get("k") != k:
+        cache["neighbours"] = {}
+    documents = collect_documents(posts_dir, projects_dir, resume_file, post_cache_file)
+
+    # Tokenize only documents whose text changed since the cached run
+    changed = []
+    doc_counts = {}
+    with stage("related.tokenize"):
+        for doc_id, document in documents.items():
+            text_hash = hashlib.sha256(document["text"].encode("utf-8")).hexdigest()
+            cached = cache["documents"].get(doc_id)
+            if cached and cached["hash"] == text_hash:
+                doc_counts[doc_id] = cached["counts"]
+            else:
+                doc_counts[doc_id] = term_counts(document["text"])
+                cache["documents"][doc_id] = {"hash": text_hash, "counts": doc_counts[doc_id]}
+                changed.append(doc_id)
+    removed = [doc_id for doc_id in cache["documents"] if doc_id not in documents]
+    for doc_id in removed:
+        del cache["documents"][doc_id]
+        cache["neighbours"].pop(doc_id, None)
+
+    with stage("related.tfidf"):
+        rows, postings = build_tfidf(doc_counts)
+
+    # Rows of untouched documents keep their cached neighbours
+    neighbours = {doc_id: [tuple(pair) for pair in pairs] for doc_id, pairs in cache["neighbours"].items()}
+    affected = affected_documents(changed, removed, rows, neighbours)
+    with stage("related.neighbours"):
+        for doc_id in affected:
+            neighbours[doc_id] = nearest_neighbours(doc_id, rows, postings, k)
+    count("related.documents", len(documents))
+    count("related.rows_recomputed", len(affected))
+
+    cache["neighbours"] = neighbours
+    cache["k"] = k
+    save_cache(cache_file, cache)
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    if write_if_changed(output_file, convert_related_to_yaml(documents, neighbours)):
+        print(f"Related content saved to {output_file} ({len(affected)} rows recomputed).")
+    else:
+        print("Related content is up to date.")
+
+
+if __name__ == "__main__":
+    try:
+        generate_related()
+    except Exception as e:
+        print(f"Error: {e}")
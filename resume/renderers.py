@@ -0,0 +1,348 @@
+import html
+import importlib
+import json
+import os
+import re
+from instrumentation import count, stage, timed
+from locales import DEFAULT_LOCALE, get_formatter
+from project_generator import convert_project_to_md, project_file_name
+from skills_generator import convert_skill_to_yaml
+from timeline_generator import TIMELINE_SECTIONS, convert_entry_to_yaml, parse_entry_dates
+
+# Registered renderer classes, keyed by format name
+RENDERERS = {}
+
+# Characters that must be escaped in LaTeX text
+LATEX_ESCAPES = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+# A translation table rather than a regex, which would be compiled on import
+LATEX_TABLE = str.maketrans(LATEX_ESCAPES)
+
+
+# Class decorator that registers a renderer under a format name
+def register_renderer(name):
+    def decorator(cls):
+        cls.name = name
+        RENDERERS[name] = cls
+        return cls
+    return decorator
+
+
+# Import modules that register extra renderers
+def load_plugins(module_names):
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            raise Exception(f"Unable to load renderer plugin '{module_name}': {e}")
+
+
+# Normalize an entry once so every renderer shares the same parsed fields
+def normalize_entry(entry):
+    description = entry.get("description", [])
+    bullets = [description] if isinstance(description, str) else list(description)
+    tools = [tool.strip() for tool in entry.get("tools", []) if tool.strip()]
+    normalized = {
+        "raw": entry,
+        "title": entry.get("title") or entry.get("name") or entry.get("language") or "Untitled",
+        # Parsed the same way as timeline_generator, so every format agrees on the dates
+        "start": None,
+        "end": None,
+        "dates": "",
+        "bullets": [bullet for bullet in bullets if bullet],
+        "tools": tools,
+    }
+
+    if "start_date" in entry or "end_date" in entry:
+        normalized["start"], normalized["end"] = parse_entry_dates(entry)
+        formatter = get_formatter(DEFAULT_LOCALE)
+        normalized["dates"] = f"{formatter.format(normalized['start'])} – {formatter.format(normalized['end'])}"
+
+    # Secondary details shown under the title by the document renderers
+    meta = [entry.get("organization"), entry.get("location"), normalized["dates"], entry.get("proficiency")]
+    if "percentage" in entry:
+        meta.append(f"{entry['percentage']}%")
+    if tools:
+        meta.append(", ".join(tools))
+    normalized["meta"] = [part for part in meta if part]
+    return normalized
+
+
+# Build the normalized model: a list of (section title, normalized entries)
+@timed("render.build_model")
+def build_model(data):
+    model = []
+    for section in data.get("sections", []):
+        entries = [normalize_entry(entry) for entry in section.get("items", [])]
+        count("render.entries", len(entries))
+        model.append((section["title"], entries))
+    return model
+
+
+# Format a parsed date as YYYY-MM for JSON Resume
+def iso_date(parsed):
+    if isinstance(parsed, tuple):
+        return f"{parsed[0]:04d}-{parsed[1]:02d}"
+    return None
+
+
+# Turn section titles into anchor-friendly identifiers
+def slugify(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+# Escape text for LaTeX
+def latex_escape(text):
+    return str(text).translate(LATEX_TABLE)
+
+
+# Base class for renderers; subclasses receive every entry in a single pass
+class Renderer:
+    name = None
+
+    def start_section(self, title):
+        pass
+
+    def render_entry(self, section_title, entry):
+        pass
+
+    def end_section(self, title):
+        pass
+
+    # Return the rendered files as {relative path: content}
+    def finish(self):
+        return {}
+
+
+# Jekyll data files and project pages, matching the generator scripts
+@register_renderer("jekyll")
+class JekyllRenderer(Renderer):
+    def __init__(self):
+        self.timeline = []
+        self.skills = {"Tech": [], "Other": []}
+        self.projects = {}
+
+    def render_entry(self, section_title, entry):
+        raw = entry["raw"]
+        if section_title in TIMELINE_SECTIONS:
+            self.timeline.append(convert_entry_to_yaml(raw, DEFAULT_LOCALE, (entry["start"], entry["end"])))
+        elif section_title == "Skills":
+            category = raw.get("category", "Unknown").capitalize()
+            if category in self.skills:
+                self.skills[category].append(convert_skill_to_yaml(raw))
+        elif section_title == "Projects":
+            self.projects[os.path.join("_projects", project_file_name(raw))] = convert_project_to_md(raw)
+
+    def finish(self):
+        import yaml
+
+        def dump(entries):
+            return yaml.dump(entries, sort_keys=False, allow_unicode=True, default_flow_style=False)
+
+        files = {
+            os.path.join("_data", "timeline.yml"): dump(self.timeline),
+            os.path.join("_data", "tech-skills.yml"): dump(self.skills["Tech"]),
+            os.path.join("_data", "other-skills.yml"): dump(self.skills["Other"]),
+        }
+        files.update(self.projects)
+        return files
+
+
+# JSON Resume (https://jsonresume.org/schema/) document
+@register_renderer("jsonresume")
+class JsonResumeRenderer(Renderer):
+    # Resume section → (JSON Resume key, name field)
+    SECTION_KEYS = {
+        "Work Experience": ("work", "name"),
+        "Leadership Experience": ("volunteer", "organization"),
+        "Volunteering Opportunities": ("volunteer", "organization"),
+        "Education": ("education", "institution"),
+    }
+
+    def __init__(self):
+        self.document = {}
+
+    def render_entry(self, section_title, entry):
+        raw = entry["raw"]
+        if section_title in self.SECTION_KEYS:
+            key, name_field = self.SECTION_KEYS[section_title]
+            item = {
+                name_field: raw.get("organization", ""),
+                "position" if key != "education" else "area": raw.get("title", ""),
+                "location": raw.get("location", ""),
+                "startDate": iso_date(entry["start"]),
+                "endDate": iso_date(entry["end"]),
+                "highlights" if key != "education" else "courses": entry["bullets"],
+            }
+            item = {field: value for field, value in item.items() if value not in (None, "", [])}
+        elif section_title == "Skills":
+            key = "skills"
+            item = {"name": raw.get("name", ""), "level": f"{raw.get('percentage', 0)}%",
+                    "keywords": [raw.get("category", "Unknown")]}
+        elif section_title == "Languages":
+            key = "languages"
+            item = {"language": raw.get("language", ""), "fluency": raw.get("proficiency", "")}
+        elif section_title == "Projects":
+            key = "projects"
+            item = {"name": raw.get("name", ""), "description": raw.get("description", ""),
+                    "url": raw.get("external_url", ""), "keywords": entry["tools"]}
+        elif section_title == "Awards":
+            key = "awards"
+            item = {"title": entry["title"], "summary": " ".join(entry["bullets"])}
+        elif section_title == "Certifications":
+            key = "certificates"
+            item = {"name": entry["title"]}
+        elif section_title == "Publications":
+            key = "publications"
+            item = {"name": entry["title"], "summary": " ".join(entry["bullets"])}
+        elif section_title == "Interests":
+            key = "interests"
+            item = {"name": entry["title"], "keywords": entry["bullets"]}
+        else:
+            return
+        self.document.setdefault(key, []).append(item)
+
+    def finish(self):
+        return {"resume.jsonresume.json": json.dumps(self.document, indent=4, ensure_ascii=False)}
+
+
+# Static HTML fragment
+@register_renderer("html")
+class HtmlRenderer(Renderer):
+    def __init__(self):
+        self.lines = []
+
+    def start_section(self, title):
+        self.lines.append(f'<section class="resume-section" id="{slugify(title)}">')
+        self.lines.append(f"  <h2>{html.escape(title)}</h2>")
+
+    def render_entry(self, section_title, entry):
+        self.lines.append('  <article class="resume-entry">')
+        title = html.escape(entry["title"])
+        url = entry["raw"].get("external_url")
+        if url:
+            title = f'<a href="{html.escape(url)}">{title}</a>'
+        self.lines.append(f"    <h3>{title}</h3>")
+        if entry["meta"]:
+            meta = " · ".join(html.escape(part) for part in entry["meta"])
+            self.lines.append(f'    <p class="resume-meta">{meta}</p>')
+        if entry["bullets"]:
+            self.lines.append("    <ul>")
+            self.lines.extend(f"      <li>{html.escape(bullet)}</li>" for bullet in entry["bullets"])
+            self.lines.append("    </ul>")
+        self.lines.append("  </article>")
+
+    def end_section(self, title):
+        self.lines.append("</section>")
+
+    def finish(self):
+        return {"resume.html": "\n".join(self.lines) + "\n"}
+
+
+# LaTeX body fragment, ready to \input into a document
+@register_renderer("latex")
+class LatexRenderer(Renderer):
+    def __init__(self):
+        self.lines = []
+
+    def start_section(self, title):
+        self.lines.append(f"\\section*{{{latex_escape(title)}}}")
+
+    def render_entry(self, section_title, entry):
+        line = f"\\textbf{{{latex_escape(entry['title'])}}}"
+        if entry["meta"]:
+            line += " \\hfill " + latex_escape(" | ".join(entry["meta"]))
+        self.lines.append(line + "\\\\")
+        if entry["bullets"]:
+            self.lines.append("\\begin{itemize}")
+            self.lines.extend(f"  \\item {latex_escape(bullet)}" for bullet in entry["bullets"])
+            self.lines.append("\\end{itemize}")
+
+    def end_section(self, title):
+        self.lines.append("")
+
+    def finish(self):
+        return {"resume.tex": "\n".join(self.lines)}
+
+
+# Plain text wrapped to a fixed width, ready for PDF typesetting
+@register_renderer("text")
+class TextRenderer(Renderer):
+    WIDTH = 80
+
+    def __init__(self):
+        self.lines = []
+
+    def start_section(self, title):
+        self.lines.extend([title.upper(), "=" * len(title)])
+
+    def render_entry(self, section_title, entry):
+        import textwrap
+        self.lines.append(entry["title"])
+        if entry["meta"]:
+            self.lines.extend(textwrap.wrap(" | ".join(entry["meta"]), self.WIDTH,
+                                            initial_indent="  ", subsequent_indent="  "))
+        for bullet in entry["bullets"]:
+            self.lines.extend(textwrap.wrap(bullet, self.WIDTH, initial_indent="  - ", subsequent_indent="    "))
+
+    def end_section(self, title):
+        self.lines.append("")
+
+    def finish(self):
+        return {"resume.txt": "\n".join(self.lines)}
+
+
+# Render every requested format in a single pass over the normalized model
+def render_all(data, formats=None):
+    formats = formats or list(RENDERERS)
+    unknown = [name for name in formats if name not in RENDERERS]
+    if unknown:
+        raise Exception(f"Unknown output format(s): {', '.join(unknown)}. Available: {', '.join(RENDERERS)}")
+
+    renderers = [RENDERERS[name]() for name in formats]
+    model = build_model(data)
+
+    with stage("render.walk"):
+        for title, entries in model:
+            if not entries:
+                continue
+            for renderer in renderers:
+                renderer.start_section(title)
+            for entry in entries:
+                for renderer in renderers:
+                    renderer.render_entry(title, entry)
+            for renderer in renderers:
+                renderer.end_section(title)
+
+    outputs = {}
+    for renderer in renderers:
+        with stage(f"render.{renderer.name}.finish"):
+            outputs[renderer.name] = renderer.finish()
+    return outputs
+
+
+# Write rendered files below an output directory
+@timed("render.write_outputs")
+def write_outputs(outputs, output_dir):
+    for files in outputs.values():
+        for relative_path, content in files.items():
+            file_path = os.path.join(output_dir, relative_path)
+            if os.path.dirname(file_path):
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            try:
+                with open(file_path, 'w') as file:
+                    file.write(content)
+                    count("bytes_written", file.tell())
+            except PermissionError:
+                raise Exception(f"Permission denied: Unable to write to {file_path}")
+            print(f"Rendered {file_path}")
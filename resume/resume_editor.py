@@ -1,6 +1,15 @@
 import json
-import curses
 import re
+from compressed_io import read_json, write_json
+from curses_input import input_form, read_line, read_lines
+from entry_browser import DisplayCache, browse_entries, entry_label, format_entry
+from edit_session import (
+    VERSION_KEY, EditHistory, apply_operation, describe_operation, document_version, insert_entry, locked,
+    remove_entry, replace_entry,
+)
+from instrumentation import count, timed
+from search_index import SearchIndex, locate
+from skill_rules import evaluate_rules, load_rules, rules_path
 
 # Path to the JSON file
 RESUME_FILE = "resume/resume.json"
@@ -21,60 +30,78 @@ SECTIONS = [
     "Extracurriculars",
 ]
 
-# Load JSON data
-def load_resume(file_path):
+# Add empty sections for any of SECTIONS missing from the data
+def add_missing_sections(data):
+    existing_titles = [section['title'] for section in data.get("sections", [])]
+    for section in SECTIONS:
+        if section not in existing_titles:
+            data.setdefault("sections", []).append({"title": section, "items": []})
+    return data
+
+# Load JSON data, through its snapshot unless use_snapshot is False
+@timed("editor.load_resume")
+def load_resume(file_path, use_snapshot=True):
+    from snapshot_cache import load_json_with_snapshot
     try:
-        with open(file_path, 'r') as file:
-            data = json.load(file)
-            existing_titles = [section['title'] for section in data.get("sections", [])]
-            for section in SECTIONS:
-                if section not in existing_titles:
-                    data.setdefault("sections", []).append({"title": section, "items": []})
-            return data
+        return add_missing_sections(load_json_with_snapshot(file_path) if use_snapshot else read_json(file_path))
     except FileNotFoundError:
         return {"sections": [{"title": section, "items": []} for section in SECTIONS]}
     except json.JSONDecodeError:
         return {"sections": [{"title": section, "items": []} for section in SECTIONS]}
 
 # Save JSON data
+@timed("editor.save_resume")
 def save_resume(file_path, data):
     try:
-        with open(file_path, 'w') as file:
-            json.dump(data, file, indent=4)
+        # Written compressed when the path ends in a compressed suffix such as .gz
+        count("bytes_written", write_json(file_path, data, indent=4))
     except PermissionError:
         raise Exception("Permission denied: Unable to write to the file.")
+    # Refresh the snapshot so the next load does not have to parse the JSON again
+    from snapshot_cache import write_snapshot
+    write_snapshot(file_path, data)
+
+# Save the operations made since base_version while holding the file lock.
+# If another editor saved in the meantime, the operations are replayed on its version and
+# the ones whose entry was changed or removed there are rejected.
+# Returns (saved data, rejected operations).
+@timed("editor.commit_operations")
+def commit_operations(file_path, data, base_version, operations):
+    with locked(file_path):
+        # Read the JSON itself: a snapshot that missed a concurrent save would make it look unchanged
+        current = load_resume(file_path, use_snapshot=False)
+        current_version = document_version(current)
+        if current_version == base_version:
+            merged, rejected = data, []
+        else:
+            count("editor.merges")
+            merged = current
+            rejected = [operation for operation in operations if not apply_operation(merged, operation)]
+        merged[VERSION_KEY] = current_version + 1
+        save_resume(file_path, merged)
+    count("editor.rejected_operations", len(rejected))
+    return merged, rejected
 
 # Input handler with date validation
 def get_input(stdscr, prompt, validate_date=False):
-    stdscr.addstr(prompt)
-    stdscr.refresh()
-    input_str = ""
+    input_str = read_line(stdscr, prompt)
+    while validate_date and not (re.match(r"^\d{4}-(0[1-9]|1[0-2])$", input_str) or input_str.lower() == "present"):
+        input_str = read_line(stdscr, "\nInvalid date format. Use YYYY-MM or 'Present'. Try again: ")
+    return input_str
+
+# Read description bullets until 'done'; a multi-line paste adds one bullet per line
+def get_bullets(stdscr):
+    bullets = []
+    stdscr.addstr("\nEnter bullet points for the description (type 'done' to finish):")
     while True:
-        char = stdscr.getch()
-        if char in (curses.KEY_ENTER, 10, 13):  # Enter key
-            if validate_date:
-                if re.match(r"^\d{4}-(0[1-9]|1[0-2])$", input_str) or input_str.lower() == "present":
-                    break
-                else:
-                    stdscr.addstr("\nInvalid date format. Use YYYY-MM or 'Present'. Try again: ")
-                    input_str = ""
-            else:
-                break
-        elif char == 127:  # Backspace key
-            if len(input_str) > 0:
-                input_str = input_str[:-1]
-                y, x = stdscr.getyx()
-                stdscr.move(y, x - 1)
-                stdscr.addstr(" ")
-                stdscr.move(y, x - 1)
-        elif 32 <= char <= 126:  # Printable characters
-            input_str += chr(char)
-            stdscr.addstr(chr(char))
-        stdscr.refresh()
-    return input_str.strip()
+        for point in read_lines(stdscr, "\n- ", multiline=True, separator="\n- "):
+            if point.lower() == "done":
+                return bullets
+            if point:
+                bullets.append(point)
 
 # Create an entry with validation
-def create_entry(stdscr, section_title):
+def create_entry(stdscr, section_title, rules=None):
     entry = {}
     if section_title in ["Education", "Work Experience", "Leadership Experience"]:
         entry["title"] = get_input(stdscr, "\nEnter the title (e.g., job title, degree): ")
@@ -82,13 +109,7 @@ def create_entry(stdscr, section_title):
         entry["location"] = get_input(stdscr, "\nEnter the location: ")
         entry["start_date"] = get_input(stdscr, "\nEnter the start date (YYYY-MM): ", validate_date=True)
         entry["end_date"] = get_input(stdscr, "\nEnter the end date (YYYY-MM or 'Present'): ", validate_date=True)
-        entry["description"] = []
-        stdscr.addstr("\nEnter bullet points for the description (type 'done' to finish):")
-        while True:
-            point = get_input(stdscr, "\n- ")
-            if point.lower() == "done":
-                break
-            entry["description"].append(point)
+        entry["description"] = get_bullets(stdscr)
     elif section_title == "Skills":
         entry["name"] = get_input(stdscr, "\nEnter the skill name: ")
         
@@ -101,9 +122,14 @@ def create_entry(stdscr, section_title):
             else:
                 stdscr.addstr("\nInvalid input. Please enter a number between 0 and 100.\n")
         
+        # Skill rules suggest a category from the name and percentage; Enter accepts it
+        suggested = next((new for _, field, _, new in evaluate_rules([entry], rules)
+                          if field == "category" and new.lower() in ["tech", "other"]), "")
+        hint = f" [{suggested}]" if suggested else ""
+
         # Add category with validation
         while True:
-            category = get_input(stdscr, "\nEnter the category (Tech/Other): ").strip().lower()
+            category = get_input(stdscr, f"\nEnter the category (Tech/Other){hint}: ").strip().lower() or suggested.lower()
             if category in ["tech", "other"]:
                 entry["category"] = category.capitalize()
                 break
@@ -120,24 +146,25 @@ def create_entry(stdscr, section_title):
         entry["external_url"] = get_input(stdscr, "\nEnter the external URL (if any): ")
     else:
         entry["title"] = get_input(stdscr, "\nEnter the title: ")
-        entry["description"] = []
-        stdscr.addstr("\nEnter bullet points for the description (type 'done' to finish):")
-        while True:
-            point = get_input(stdscr, "\n- ")
-            if point.lower() == "done":
-                break
-            entry["description"].append(point)
+        entry["description"] = get_bullets(stdscr)
     return entry
 
 # Modify an existing entry
-def modify_entry(data, section_index, entry_index, stdscr):
+def modify_entry(data, section_index, entry_index, stdscr, rules=None):
     try:
         section = data["sections"][section_index]
         entry = section["items"][entry_index]
-        stdscr.addstr(f"\nCurrent entry: {entry}")
-        updated_entry = create_entry(stdscr, section["title"])
-        section["items"][entry_index] = updated_entry
+        # Shown the way the entry browser shows it, clipped so long values cannot wrap the prompts away
+        width = max(stdscr.getmaxyx()[1] - 1, 10)
+        stdscr.addstr("\nCurrent entry:\n")
+        for line in format_entry(entry, width):
+            stdscr.addnstr(line, width)
+            stdscr.addstr("\n")
+        with input_form():
+            updated_entry = create_entry(stdscr, section["title"], rules)
+        operation = replace_entry(data, section["title"], entry_index, updated_entry)
         stdscr.addstr("\nEntry updated successfully.\n")
+        return operation
     except IndexError:
         stdscr.addstr("\nInvalid section or entry index.\n")
 
@@ -145,8 +172,9 @@ def modify_entry(data, section_index, entry_index, stdscr):
 def delete_entry(data, section_index, entry_index, stdscr):
     try:
         section = data["sections"][section_index]
-        removed_entry = section["items"].pop(entry_index)
-        stdscr.addstr(f"\nRemoved entry: {removed_entry}\n")
+        operation = remove_entry(data, section["title"], entry_index)
+        stdscr.addstr(f"\nRemoved entry: {operation['previous']}\n")
+        return operation
     except IndexError:
         stdscr.addstr("\nInvalid section or entry index.\n")
 
@@ -156,24 +184,57 @@ def list_sections(data, stdscr):
     for i, section in enumerate(data["sections"]):
         stdscr.addstr(f"  {i + 1}: {section['title']}\n")
 
-# Display entries in a section
-def list_entries(data, section_index, stdscr):
+# Page through the entries in a section, then leave a one-line summary for the next prompt.
+# With a prompt, returns the entry number typed in the browser.
+def list_entries(data, section_index, stdscr, cache=None, prompt=None):
     section = data["sections"][section_index]
-    stdscr.addstr(f"\nEntries in '{section['title']}':\n")
-    for i, item in enumerate(section["items"]):
-        stdscr.addstr(f"  {i + 1}: {item}\n")
+    typed = browse_entries(stdscr, section, cache or DisplayCache(), prompt)
+    stdscr.addstr(f"Entries in '{section['title']}': {len(section['items'])}\n")
+    return typed
 
 # Add entry to a section
-def add_entry(data, section_index, stdscr):
+def add_entry(data, section_index, stdscr, rules=None):
     section_title = data["sections"][section_index]["title"]
-    entry = create_entry(stdscr, section_title)
-    data["sections"][section_index]["items"].append(entry)
+    with input_form():
+        entry = create_entry(stdscr, section_title, rules)
+    operation = insert_entry(data, section_title, entry)
     stdscr.addstr(f"\nAdded entry to section '{section_title}'.\n")
+    return operation
+
+# Search every entry and optionally open one of the matches for modification
+def search_entries(data, index, stdscr, rules=None):
+    query = get_input(stdscr, "\nSearch for: ")
+    matches = [(section_title, entry) for _, section_title, entry in index.search(query)]
+    if not matches:
+        stdscr.addstr("\nNo matching entries.\n")
+        return None
+    stdscr.addstr("\nBest matches:\n")
+    for i, (section_title, entry) in enumerate(matches):
+        stdscr.addstr(f"  {i + 1}: [{section_title}] {entry_label(entry)}\n")
+    choice = get_input(stdscr, "Enter a match number to modify it, or press Enter to go back: ")
+    if not choice.isdigit() or not 1 <= int(choice) <= len(matches):
+        return None
+    position = locate(data, *matches[int(choice) - 1])
+    if position is None:
+        stdscr.addstr("\nThat entry is no longer in the resume.\n")
+        return None
+    return modify_entry(data, position[0], position[1], stdscr, rules)
 
 # Main interactive CLI
-def main(stdscr):
+def main(stdscr, resume_file=RESUME_FILE):
+    import curses
     curses.curs_set(1)
-    data = load_resume(RESUME_FILE)
+    # Let menus and listings scroll instead of failing on short terminals
+    stdscr.scrollok(True)
+    data = load_resume(resume_file)
+    # Version the edits are based on, and the operations not yet saved
+    base_version = document_version(data)
+    operations = []
+    history = EditHistory()
+    # Built once here, then kept current from the operations
+    index = SearchIndex(data)
+    display_cache = DisplayCache()
+    rules = load_rules(rules_path(resume_file))
 
     while True:
         stdscr.clear()
@@ -182,17 +243,22 @@ def main(stdscr):
         stdscr.addstr("2. List entries in a section\n")
         stdscr.addstr("3. Modify an entry\n")
         stdscr.addstr("4. Delete an entry\n")
-        stdscr.addstr("5. Exit\n")
+        stdscr.addstr("5. Undo the last change\n")
+        stdscr.addstr("6. Redo the last undone change\n")
+        stdscr.addstr("7. Search entries\n")
+        stdscr.addstr("8. Exit\n")
         stdscr.addstr("Choose an option: ")
         stdscr.refresh()
 
         choice = get_input(stdscr, "").strip()
+        operation = None
 
         if choice == "1":
             list_sections(data, stdscr)
             section_index = get_input(stdscr, "Enter the section number to add an entry: ")
             if section_index.isdigit():
-                add_entry(data, int(section_index) - 1, stdscr)
+                operation = add_entry(data, int(section_index) - 1, stdscr, rules)
+                history.record(operation)
             else:
                 stdscr.addstr("\nInvalid section number. Please enter a number.\n")
 
@@ -200,7 +266,7 @@ def main(stdscr):
             list_sections(data, stdscr)
             section_index = get_input(stdscr, "Enter the section number to list entries: ")
             if section_index.isdigit():
-                list_entries(data, int(section_index) - 1, stdscr)
+                list_entries(data, int(section_index) - 1, stdscr, display_cache)
             else:
                 stdscr.addstr("\nInvalid section number. Please enter a number.\n")
 
@@ -209,10 +275,11 @@ def main(stdscr):
             section_index = get_input(stdscr, "Enter the section number: ")
             if section_index.isdigit():
                 section_index = int(section_index) - 1
-                list_entries(data, section_index, stdscr)
-                entry_index = get_input(stdscr, "Enter the entry number to modify: ")
+                entry_index = list_entries(data, section_index, stdscr, display_cache,
+                                           "Enter the entry number to modify: ")
                 if entry_index.isdigit():
-                    modify_entry(data, section_index, int(entry_index) - 1, stdscr)
+                    operation = modify_entry(data, section_index, int(entry_index) - 1, stdscr, rules)
+                    history.record(operation)
                 else:
                     stdscr.addstr("\nInvalid entry number. Please enter a number.\n")
             else:
@@ -223,29 +290,66 @@ def main(stdscr):
             section_index = get_input(stdscr, "Enter the section number: ")
             if section_index.isdigit():
                 section_index = int(section_index) - 1
-                list_entries(data, section_index, stdscr)
-                entry_index = get_input(stdscr, "Enter the entry number to delete: ")
+                entry_index = list_entries(data, section_index, stdscr, display_cache,
+                                           "Enter the entry number to delete: ")
                 if entry_index.isdigit():
-                    delete_entry(data, section_index, int(entry_index) - 1, stdscr)
+                    operation = delete_entry(data, section_index, int(entry_index) - 1, stdscr)
+                    history.record(operation)
                 else:
                     stdscr.addstr("\nInvalid entry number. Please enter a number.\n")
             else:
                 stdscr.addstr("\nInvalid section number. Please enter a number.\n")
 
-        elif choice == "5":
+        elif choice in ("5", "6"):
+            # Undo and redo are edits of their own, saved and merged like the others
+            stack = history.undo_stack if choice == "5" else history.redo_stack
+            action = "undo" if choice == "5" else "redo"
+            if not stack:
+                stdscr.addstr(f"\nNothing to {action}.\n")
+            else:
+                operation = history.undo(data) if choice == "5" else history.redo(data)
+                if operation:
+                    stdscr.addstr(f"\nDone: {action} ({describe_operation(operation)}).\n")
+                else:
+                    stdscr.addstr(f"\nCannot {action}: the entry was changed by someone else.\n")
+
+        elif choice == "7":
+            operation = search_entries(data, index, stdscr, rules)
+            history.record(operation)
+
+        elif choice == "8":
             stdscr.addstr("\nExiting. Goodbye!\n")
             break
 
         else:
             stdscr.addstr("\nInvalid option. Please try again.\n")
 
-        # Save after every operation
-        try:
-            save_resume(RESUME_FILE, data)
-        except Exception as e:
-            stdscr.addstr(f"\nError saving data: {e}\n")
+        if operation:
+            operations.append(operation)
+            index.apply(operation)
+            display_cache.apply(operation)
+
+        # Save after every operation, merging with edits saved by other editors
+        if operations:
+            try:
+                saved, rejected = commit_operations(resume_file, data, base_version, operations)
+                if saved is not data:
+                    # Merged with someone else's save: index the merged document and forget
+                    # the display lines of the replaced one
+                    data = add_missing_sections(saved)
+                    index = SearchIndex(data)
+                    display_cache = DisplayCache()
+                base_version = document_version(data)
+                operations = []
+                for operation in rejected:
+                    stdscr.addstr(f"\nConflict: the {describe_operation(operation)} was not saved; "
+                                  "the entry was changed by someone else.\n")
+            except Exception as e:
+                stdscr.addstr(f"\nError saving data: {e}\n")
         stdscr.addstr("Press any key to continue...\n")
         stdscr.getch()
 
 if __name__ == "__main__":
+    import curses
+
     curses.wrapper(main)
\ No newline at end of file
@@ -0,0 +1,239 @@
+import json
+import marshal
+from edit_session import apply_operation, describe_operation, document_version, find_section, insert_entry, \
+    remove_entry, replace_entry
+from instrumentation import count
+
+# Defaults for the server mode
+HOST = "127.0.0.1"
+PORT = 8765
+# Seconds between writes of the accumulated edits to disk
+FLUSH_INTERVAL = 1.0
+# Largest request body accepted, in bytes
+MAX_BODY = 1 << 20
+
+# Reason phrases for the statuses the server sends
+REASONS = {
+    200: "OK", 201: "Created", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+# Raised by request handlers to answer with an error status
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# In-memory resume document served over HTTP; edits are applied at once and saved in batches
+class ResumeService:
+    def __init__(self, resume_file):
+        import asyncio
+        from resume_editor import load_resume
+        self.resume_file = resume_file
+        self.data = load_resume(resume_file)
+        self.base_version = document_version(self.data)
+        # Operations applied in memory but not yet saved
+        self.pending = []
+        self.rejected = 0
+        # Serializes flushes, so each one starts from the version the previous one saved
+        self.flush_lock = asyncio.Lock()
+
+    # Look up a section by its title from the URL
+    def section(self, title):
+        section = find_section(self.data, title)
+        if section is None:
+            raise RequestError(404, f"No section named '{title}'.")
+        return section
+
+    # Parse an entry index from the URL and check it exists in the section
+    def entry_index(self, section, value):
+        if not value.isdigit() or int(value) >= len(section["items"]):
+            raise RequestError(404, f"No entry {value} in '{section['title']}'.")
+        return int(value)
+
+    # Decode a request body holding one entry object
+    def entry_body(self, body):
+        try:
+            entry = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            raise RequestError(400, "Request body is not valid JSON.")
+        if not isinstance(entry, dict):
+            raise RequestError(400, "An entry must be a JSON object.")
+        return entry
+
+    # Route one request to the same operations the curses editor performs; returns (status, payload)
+    def handle(self, method, target, body):
+        from urllib.parse import unquote, urlsplit
+        parts = [unquote(part) for part in urlsplit(target).path.split("/") if part]
+        if parts == ["status"] and method == "GET":
+            return 200, {"version": self.base_version, "pending": len(self.pending), "rejected": self.rejected}
+        if parts == ["sections"] and method == "GET":
+            return 200, [{"title": section["title"], "entries": len(section["items"])}
+                         for section in self.data["sections"]]
+        if len(parts) not in (3, 4) or parts[0] != "sections" or parts[2] != "entries":
+            raise RequestError(404, "Unknown path.")
+
+        section = self.section(parts[1])
+        if len(parts) == 3:
+            if method == "GET":
+                return 200, section["items"]
+            if method == "POST":
+                self.pending.append(insert_entry(self.data, section["title"], self.entry_body(body)))
+                count("server.edits")
+                return 201, {"index": len(section["items"]) - 1}
+            raise RequestError(405, f"{method} is not allowed here.")
+
+        index = self.entry_index(section, parts[3])
+        if method == "GET":
+            return 200, section["items"][index]
+        if method == "PUT":
+            self.pending.append(replace_entry(self.data, section["title"], index, self.entry_body(body)))
+        elif method == "DELETE":
+            self.pending.append(remove_entry(self.data, section["title"], index))
+        else:
+            raise RequestError(405, f"{method} is not allowed here.")
+        count("server.edits")
+        return 200, {"index": index}
+
+    # Save the pending operations in a worker thread, merging with saves from other editors
+    async def flush(self):
+        async with self.flush_lock:
+            await self.flush_pending()
+
+    # Body of flush(); must run under flush_lock
+    async def flush_pending(self):
+        import asyncio
+        from resume_editor import add_missing_sections, commit_operations
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        # Requests keep editing self.data while the copy is written
+        data = marshal.loads(marshal.dumps(self.data))
+        try:
+            merged, rejected = await asyncio.to_thread(commit_operations, self.resume_file, data, self.base_version,
+                                                       batch)
+        except Exception:
+            # Nothing was saved: keep the batch, ahead of the edits made meanwhile, for the next flush
+            self.pending = batch + self.pending
+            raise
+        self.base_version = document_version(merged)
+        self.rejected += len(rejected)
+        for operation in rejected:
+            print(f"Conflict: the {describe_operation(operation)} was not saved.", flush=True)
+        if merged is not data:
+            # Another editor saved first: continue from the merged document plus the edits made meanwhile
+            kept = [operation for operation in self.pending if apply_operation(merged, operation)]
+            self.rejected += len(self.pending) - len(kept)
+            self.pending = kept
+            self.data = add_missing_sections(merged)
+        count("server.flushes")
+        count("server.operations_saved", len(batch))
+
+    # Flush on a fixed interval until cancelled
+    async def flush_periodically(self, interval):
+        import asyncio
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # Shielded so cancelling the loop never abandons a save halfway
+                await asyncio.shield(self.flush())
+            except Exception as e:
+                # The edits stay pending; keep flushing so they are saved once the problem is fixed
+                count("server.flush_errors")
+                print(f"Save failed, retrying in {interval}s: {e}", flush=True)
+
+    # Answer one request with JSON; returns (status, headers, content)
+    def respond(self, method, target, headers, body):
+        status, payload = self.handle(method, target, body)
+        return status, {"Content-Type": "application/json"}, json.dumps(payload).encode("utf-8")
+
+    # Serve HTTP/1.1 requests on one connection
+    async def serve_connection(self, reader, writer):
+        await serve_requests(reader, writer, self.respond)
+
+
+# Serve HTTP/1.1 requests on one connection, keeping it open between requests.
+# respond(method, target, headers, body) returns (status, response headers, content bytes)
+# and may raise RequestError; errors, and exceptions raised by respond as 500, are answered with a JSON body.
+async def serve_requests(reader, writer, respond):
+    import asyncio
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            keep_alive = headers.get("connection", "").lower() != "close"
+            try:
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    keep_alive = keep_alive and version == "HTTP/1.1"
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise RequestError(413, "Request body is too large.")
+                    body = await reader.readexactly(length) if length else b""
+                except ValueError:
+                    keep_alive = False
+                    raise RequestError(400, "Malformed request.")
+                status, response_headers, content = respond(method, target, headers, body)
+            except RequestError as e:
+                status, response_headers = e.status, {"Content-Type": "application/json"}
+                content = json.dumps({"error": str(e)}).encode("utf-8")
+            except (asyncio.IncompleteReadError, ConnectionError):
+                raise
+            except Exception as e:
+                # Answer instead of dropping the connection, and keep serving other requests
+                count("server.errors")
+                print(f"Error answering {method} {target}: {e}", flush=True)
+                status, response_headers = 500, {"Content-Type": "application/json"}
+                content = json.dumps({"error": "Internal server error."}).encode("utf-8")
+
+            head = [f"HTTP/1.1 {status} {REASONS[status]}"]
+            head.extend(f"{name}: {value}" for name, value in response_headers.items())
+            head.append(f"Content-Length: {len(content)}")
+            head.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + content)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+# Serve the resume until interrupted, then save what is still pending
+async def serve(resume_file, host=HOST, port=PORT, flush_interval=FLUSH_INTERVAL):
+    import asyncio
+    import signal
+    service = ResumeService(resume_file)
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Serving {resume_file} on http://{address[0]}:{address[1]}", flush=True)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, stop.set)
+    flusher = asyncio.create_task(service.flush_periodically(flush_interval))
+    async with server:
+        await stop.wait()
+    flusher.cancel()
+    await service.flush()
+    print(f"Saved {resume_file} at version {service.base_version}.", flush=True)
+
+
+# Run the server in a fresh event loop
+def run_server(resume_file, host=HOST, port=PORT, flush_interval=FLUSH_INTERVAL):
+    import asyncio
+    asyncio.run(serve(resume_file, host, port, flush_interval))
@@ -0,0 +1,101 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from instrumentation import count, timed
+
+# Words of any script; digits count too, so years and percentages can be searched
+_WORD = re.compile(r"\w+")
+
+
+# Every string in an entry, including strings nested in lists
+def entry_strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for field in value.values():
+            yield from entry_strings(field)
+    elif isinstance(value, list):
+        for item in value:
+            yield from entry_strings(item)
+
+
+# Lowercase words of an entry, found with a single regex pass over all of its text
+def entry_terms(entry):
+    return _WORD.findall("\n".join(entry_strings(entry)).lower())
+
+
+# Inverted index over every field of every entry: term -> {entry id: term frequency}.
+# Entries are keyed by identity; the editor never changes an entry in place, it swaps in a new one.
+class SearchIndex:
+    @timed("search.build")
+    def __init__(self, data):
+        self.postings = defaultdict(dict)
+        # entry id -> (section title, entry, {term: frequency})
+        self.entries = {}
+        for section in data.get("sections", []):
+            for entry in section["items"]:
+                self.add(section["title"], entry)
+        count("search.entries_indexed", len(self.entries))
+
+    # Index one entry
+    def add(self, section_title, entry):
+        frequencies = Counter(entry_terms(entry))
+        entry_id = id(entry)
+        self.entries[entry_id] = (section_title, entry, frequencies)
+        postings = self.postings
+        for term, frequency in frequencies.items():
+            postings[term][entry_id] = frequency
+
+    # Drop one entry from the index
+    def discard(self, entry):
+        indexed = self.entries.pop(id(entry), None)
+        if indexed is None:
+            return
+        for term in indexed[2]:
+            postings = self.postings[term]
+            del postings[id(entry)]
+            if not postings:
+                del self.postings[term]
+
+    # Update the index for an operation from edit_session, touching only the entries it changed
+    def apply(self, operation):
+        if operation["op"] in ("replace", "remove"):
+            self.discard(operation["previous"])
+        if operation["op"] in ("insert", "replace"):
+            self.add(operation["section"], operation["entry"])
+
+    # Rank entries for a query by summed tf-idf. Entries containing every query word come first;
+    # if there are none, entries containing any of them are ranked instead.
+    # Returns up to limit (score, section title, entry) tuples.
+    def search(self, query, limit=10):
+        terms = list(dict.fromkeys(_WORD.findall(query.lower())))
+        postings = [self.postings[term] for term in terms if term in self.postings]
+        if not postings:
+            return []
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:]) if len(postings) == len(terms) else set()
+        if not candidates:
+            candidates = set().union(*postings)
+
+        total = len(self.entries)
+        scores = []
+        for entry_id in candidates:
+            score = 0.0
+            for posting in postings:
+                frequency = posting.get(entry_id)
+                if frequency:
+                    score += (1 + math.log(frequency)) * math.log(1 + total / len(posting))
+            section_title, entry, _ = self.entries[entry_id]
+            scores.append((round(score, 4), section_title, entry))
+        return heapq.nlargest(limit, scores, key=lambda match: match[0])
+
+
+# Section and entry indices of an indexed entry in the document, found by identity
+def locate(data, section_title, entry):
+    for section_index, section in enumerate(data["sections"]):
+        if section["title"] == section_title:
+            for entry_index, item in enumerate(section["items"]):
+                if item is entry:
+                    return section_index, entry_index
+    return None
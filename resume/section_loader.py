@@ -0,0 +1,156 @@
+import json
+import mmap
+import re
+from compressed_io import codec_for, decompressed_file
+
+# Matches a complete JSON string, including escaped quotes
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+# Matches a run of strings and plain characters up to the next bracket
+_RUN = re.compile(rb'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.S)
+# Matches a scalar value (number, true, false, null)
+_SCALAR = re.compile(rb'[^,}\]\s]+')
+# Matches insignificant whitespace
+_WHITESPACE = re.compile(rb'\s*')
+
+
+# Skip whitespace and return the next position
+def _skip_whitespace(buf, pos):
+    return _WHITESPACE.match(buf, pos).end()
+
+
+# Expect a specific character at the current position and step over it
+def _expect(buf, pos, char):
+    pos = _skip_whitespace(buf, pos)
+    if buf[pos:pos + 1] != char:
+        raise ValueError(f"Expected {char!r} at offset {pos}")
+    return pos + 1
+
+
+# Read a JSON string starting at pos and return (value, end)
+def _read_string(buf, pos):
+    match = _STRING.match(buf, pos)
+    if not match:
+        raise ValueError(f"Expected a string at offset {pos}")
+    return json.loads(match.group()), match.end()
+
+
+# Return the end offset of the JSON value starting at pos without decoding it
+def _skip_value(buf, pos):
+    pos = _skip_whitespace(buf, pos)
+    first = buf[pos:pos + 1]
+    if first == b'"':
+        match = _STRING.match(buf, pos)
+        if not match:
+            raise ValueError(f"Unterminated string at offset {pos}")
+        return match.end()
+    if first not in (b'{', b'['):
+        match = _SCALAR.match(buf, pos)
+        if not match:
+            raise ValueError(f"Expected a value at offset {pos}")
+        return match.end()
+
+    # Jump from bracket to bracket; strings are consumed by the run so
+    # brackets inside them never affect the depth
+    depth = 0
+    while True:
+        pos = _RUN.match(buf, pos).end()
+        char = buf[pos:pos + 1]
+        pos += 1
+        if char in (b'{', b'['):
+            depth += 1
+        elif char in (b'}', b']'):
+            depth -= 1
+            if depth == 0:
+                return pos
+        else:
+            raise ValueError(f"Unterminated value at offset {pos - 1}")
+
+
+# Read an object member key and return (key, value_start)
+def _read_member_key(buf, pos):
+    key, pos = _read_string(buf, _skip_whitespace(buf, pos))
+    return key, _skip_whitespace(buf, _expect(buf, pos, b':'))
+
+
+# Step past the separator after a value; returns None at the closing bracket
+def _next_item(buf, pos, closing):
+    pos = _skip_whitespace(buf, pos)
+    separator = buf[pos:pos + 1]
+    if separator == closing:
+        return None
+    if separator != b',':
+        raise ValueError(f"Expected ',' or {closing!r} at offset {pos}")
+    return pos + 1
+
+
+# Return the position of the first member of the object at pos, or None if empty
+def _first_member(buf, pos):
+    pos = _skip_whitespace(buf, _expect(buf, pos, b'{'))
+    return None if buf[pos:pos + 1] == b'}' else pos
+
+
+# Iterate over the (key, value_start, value_end) triples of the object at pos
+def _iter_members(buf, pos):
+    pos = _first_member(buf, pos)
+    while pos is not None:
+        key, start = _read_member_key(buf, pos)
+        end = _skip_value(buf, start)
+        yield key, start, end
+        pos = _next_item(buf, end, b'}')
+
+
+# Iterate over the (value_start, value_end) pairs of the array at pos
+def _iter_elements(buf, pos):
+    pos = _skip_whitespace(buf, _expect(buf, pos, b'['))
+    if buf[pos:pos + 1] == b']':
+        return
+    while True:
+        pos = _skip_whitespace(buf, pos)
+        end = _skip_value(buf, pos)
+        yield pos, end
+        pos = _next_item(buf, end, b']')
+        if pos is None:
+            return
+
+
+# Find the title of a section object without decoding its items
+def _section_title(buf, start):
+    for key, value_start, value_end in _iter_members(buf, start):
+        if key == "title":
+            return json.loads(buf[value_start:value_end])
+    return None
+
+
+# Scan the document and decode only the sections whose title is requested
+def _scan_sections(buf, titles):
+    sections = []
+    pos = _first_member(buf, 0)
+    while pos is not None:
+        key, value_start = _read_member_key(buf, pos)
+        if key == "sections":
+            # Walk the sections array element by element so it is scanned only once
+            value_end = _expect(buf, value_start, b'[')
+            for start, end in _iter_elements(buf, value_start):
+                if _section_title(buf, start) in titles:
+                    sections.append(json.loads(buf[start:end]))
+                value_end = end
+            value_end = _expect(buf, value_end, b']')
+        else:
+            value_end = _skip_value(buf, value_start)
+        pos = _next_item(buf, value_end, b'}')
+    return sections
+
+
+# Load only the requested sections of a resume file, keeping the usual document shape
+def load_resume_sections(file_path, titles):
+    titles = set(titles)
+    try:
+        # Compressed files cannot be mapped; their decompressed copy is mapped and scanned instead
+        file = open(file_path, 'rb') if codec_for(file_path) is None else decompressed_file(file_path)
+        with file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return {"sections": _scan_sections(buf, titles)}
+    except FileNotFoundError:
+        raise Exception("Resume JSON file not found.")
+    except ValueError:
+        # Raised for malformed documents, including empty files that cannot be mapped
+        raise Exception("Invalid JSON format in the resume file.")
@@ -0,0 +1,175 @@
+import json
+import os
+import re
+from instrumentation import count, timed
+
+# Rules file looked up next to the resume it applies to
+RULES_FILE_NAME = "skill-rules.json"
+# Colors the skill bars of the theme understand
+VALID_COLORS = ["primary", "secondary", "success", "danger", "warning", "info", "light", "dark"]
+# Fields a rule may assign
+RULE_FIELDS = ("color", "category")
+# Fields a rule may match with a regular expression
+PATTERN_FIELDS = ("name", "category", "color")
+
+
+# Default rules file for a resume
+def rules_path(resume_file):
+    return os.path.join(os.path.dirname(resume_file), RULES_FILE_NAME)
+
+
+# Validate one rule and compile its patterns; `number` is its 1-based position for error messages
+def compile_rule(rule, number):
+    if not isinstance(rule, dict) or not isinstance(rule.get("set"), dict) or not rule["set"]:
+        raise Exception(f"Skill rule {number} needs a 'set' object with the fields to assign.")
+    when = rule.get("when") or {}
+    if not isinstance(when, dict):
+        raise Exception(f"Skill rule {number}: 'when' must be an object of conditions.")
+    compiled = {"band": None, "patterns": {}, "set": {}, "overwrite": bool(rule.get("overwrite", False))}
+
+    for field, condition in when.items():
+        if field == "percentage":
+            try:
+                low, high = (float(bound) for bound in condition)
+            except (TypeError, ValueError):
+                raise Exception(f"Skill rule {number}: 'percentage' must be a [min, max] band.")
+            compiled["band"] = (low, high)
+        elif field in PATTERN_FIELDS:
+            try:
+                compiled["patterns"][field] = re.compile(str(condition), re.IGNORECASE)
+            except re.error as e:
+                raise Exception(f"Skill rule {number}: invalid pattern for '{field}': {e}")
+        else:
+            raise Exception(f"Skill rule {number}: unknown condition '{field}'.")
+
+    for field, value in rule["set"].items():
+        if field not in RULE_FIELDS:
+            raise Exception(f"Skill rule {number}: cannot assign '{field}' (only {', '.join(RULE_FIELDS)}).")
+        if not isinstance(value, str) or not value.strip():
+            raise Exception(f"Skill rule {number}: '{field}' must be set to a non-empty string.")
+        if field == "color" and value not in VALID_COLORS:
+            raise Exception(f"Skill rule {number}: invalid color '{value}' (options: {', '.join(VALID_COLORS)}).")
+        compiled["set"][field] = value
+    return compiled
+
+
+# Load and validate the rules of a file; a missing file means there are no rules
+def load_rules(rules_file):
+    try:
+        with open(rules_file, 'r', encoding="utf-8") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return []
+    except json.JSONDecodeError:
+        raise Exception(f"Invalid JSON format in the skill rules file {rules_file}.")
+    rules = data.get("rules", []) if isinstance(data, dict) else data
+    return [compile_rule(rule, number) for number, rule in enumerate(rules, 1)]
+
+
+# Numeric percentage of a skill; values that are not numbers fall outside every band
+def skill_percentage(skill):
+    try:
+        return float(skill.get("percentage", 0))
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+# A text field of every skill as codes into its distinct values, so a pattern is tried
+# once per distinct value instead of once per skill
+def encode_column(skills, field):
+    values = {}
+    codes = [values.setdefault(str(skill.get(field) or ""), len(values)) for skill in skills]
+    return codes, list(values)
+
+
+# Index of the rule that assigns each field of each skill (-1 for none), computed with NumPy
+# boolean masks over whole columns. Returns {field: [rule index per skill]}.
+def match_rules_numpy(numpy, skills, rules):
+    size = len(skills)
+    percentages = numpy.array([skill_percentage(skill) for skill in skills], dtype=float)
+    columns = {}
+    missing = {field: numpy.array([not skill.get(field) for skill in skills], dtype=bool) for field in RULE_FIELDS}
+    winners = {field: numpy.full(size, -1) for field in RULE_FIELDS}
+
+    for index, rule in enumerate(rules):
+        mask = numpy.ones(size, dtype=bool)
+        if rule["band"]:
+            mask &= (percentages >= rule["band"][0]) & (percentages <= rule["band"][1])
+        for field, pattern in rule["patterns"].items():
+            if field not in columns:
+                codes, values = encode_column(skills, field)
+                columns[field] = (numpy.array(codes, dtype=numpy.intp), values)
+            codes, values = columns[field]
+            mask &= numpy.array([bool(pattern.search(value)) for value in values], dtype=bool)[codes]
+        for field in rule["set"]:
+            # The first matching rule assigns a field; later rules only fill what is left
+            eligible = mask & (winners[field] < 0)
+            if not rule["overwrite"]:
+                eligible &= missing[field]
+            winners[field][eligible] = index
+    return {field: winner.tolist() for field, winner in winners.items()}
+
+
+# Same as match_rules_numpy, for when NumPy is not installed
+def match_rules_python(skills, rules):
+    size = len(skills)
+    percentages = [skill_percentage(skill) for skill in skills]
+    columns = {}
+    missing = {field: [not skill.get(field) for skill in skills] for field in RULE_FIELDS}
+    winners = {field: [-1] * size for field in RULE_FIELDS}
+
+    for index, rule in enumerate(rules):
+        mask = [True] * size
+        if rule["band"]:
+            low, high = rule["band"]
+            mask = [low <= percentage <= high for percentage in percentages]
+        for field, pattern in rule["patterns"].items():
+            if field not in columns:
+                columns[field] = encode_column(skills, field)
+            codes, values = columns[field]
+            hits = [bool(pattern.search(value)) for value in values]
+            mask = [matched and hits[code] for matched, code in zip(mask, codes)]
+        for field in rule["set"]:
+            winner = winners[field]
+            for position in range(size):
+                if mask[position] and winner[position] < 0 and (rule["overwrite"] or missing[field][position]):
+                    winner[position] = index
+    return winners
+
+
+# Evaluate the rules over every skill in one pass and return the changes they make, without
+# applying them: a list of (skill index, field, old value, new value) ordered by skill
+@timed("skill_rules.evaluate")
+def evaluate_rules(skills, rules):
+    if not rules or not skills:
+        return []
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    winners = match_rules_numpy(numpy, skills, rules) if numpy else match_rules_python(skills, rules)
+
+    changes = []
+    for field, winner in winners.items():
+        for position, index in enumerate(winner):
+            if index >= 0:
+                old = skills[position].get(field)
+                new = rules[index]["set"][field]
+                if old != new:
+                    changes.append((position, field, old, new))
+    changes.sort(key=lambda change: change[0])
+    count("skill_rules.skills", len(skills))
+    count("skill_rules.changes", len(changes))
+    return changes
+
+
+# Apply evaluated changes to the skills in place
+def apply_changes(skills, changes):
+    for position, field, _, new in changes:
+        skills[position][field] = new
+
+
+# One-line description of a change for previews
+def describe_change(skills, change):
+    position, field, old, new = change
+    return f"{skills[position].get('name', 'Unnamed Skill')}: {field} {old or '(none)'} -> {new}"
@@ -1,68 +1,66 @@
-import json
-import yaml
-import curses
+import os
+from curses_input import read_line
+from instrumentation import count, stage, timed
+from locales import DEFAULT_LOCALE, get_formatter, locale_path, localized
+from section_loader import load_resume_sections
+from skill_rules import VALID_COLORS, apply_changes, describe_change, evaluate_rules, load_rules, rules_path
 
 # Path to the JSON file
 RESUME_FILE = "resume/resume.json"
+TECH_OUTPUT_FILE = "_data/tech-skills.yml"
+OTHER_OUTPUT_FILE = "_data/other-skills.yml"
 
-# Convert a single skill entry to YAML format
-def convert_skill_to_yaml(skill):
+# Convert a single skill entry to YAML format, in one locale
+@timed("skills.convert_skill_to_yaml")
+def convert_skill_to_yaml(skill, locale=DEFAULT_LOCALE):
     return {
-        "name": skill.get("name", "Unknown Skill"),
+        "name": localized(skill, "name", locale, "Unknown Skill"),
         "percentage": skill.get("percentage", 0),
         "color": skill.get("color", "primary"),  # Default color is 'primary'
-        "category": skill.get("category", "Unknown"),
+        "category": localized(skill, "category", locale, "Unknown"),
     }
 
-# Convert specific skill entries to a YAML-compliant flat list
-def convert_skills_to_yaml(entries):
-    yaml_entries = []
+# Convert skill entries for several locales in one pass; returns {locale: YAML text}
+@timed("skills.convert_skills_per_locale")
+def convert_skills_per_locale(entries, locales):
+    yaml_entries = {locale: [] for locale in locales}
     for skill in entries:
-        yaml_entries.append(convert_skill_to_yaml(skill))
-    return yaml.dump(yaml_entries, sort_keys=False, allow_unicode=True, default_flow_style=False)
+        for locale in locales:
+            yaml_entries[locale].append(convert_skill_to_yaml(skill, locale))
+    count("skills.entries", len(entries) * len(locales))
+    import yaml
+    with stage("skills.yaml_dump"):
+        return {
+            locale: yaml.dump(converted, sort_keys=False, allow_unicode=True, default_flow_style=False)
+            for locale, converted in yaml_entries.items()
+        }
 
-# Load JSON data
-def load_resume(file_path):
-    try:
-        with open(file_path, 'r') as file:
-            return json.load(file)
-    except FileNotFoundError:
-        raise Exception("Resume JSON file not found.")
-    except json.JSONDecodeError:
-        raise Exception("Invalid JSON format in the resume file.")
+# Convert specific skill entries to a YAML-compliant flat list
+@timed("skills.convert_skills_to_yaml")
+def convert_skills_to_yaml(entries, locale=DEFAULT_LOCALE):
+    return convert_skills_per_locale(entries, [locale])[locale]
 
 # Save YAML to file
+@timed("skills.save_yaml_file")
 def save_yaml_file(yaml_content, output_file):
     try:
         with open(output_file, 'w') as file:
             file.write(yaml_content)
+            count("bytes_written", file.tell())
     except PermissionError:
         raise Exception("Permission denied: Unable to write to the file.")
 
 # Input handler for curses
 def get_input(stdscr, prompt):
-    stdscr.addstr(prompt)
-    stdscr.refresh()
-    input_str = ""
-    while True:
-        char = stdscr.getch()
-        if char in (curses.KEY_ENTER, 10, 13):  # Enter key
-            break
-        elif char == 127:  # Backspace key
-            if len(input_str) > 0:
-                input_str = input_str[:-1]
-                y, x = stdscr.getyx()
-                stdscr.move(y, x - 1)
-                stdscr.addstr(" ")
-                stdscr.move(y, x - 1)
-        elif 32 <= char <= 126:  # Printable characters
-            input_str += chr(char)
-            stdscr.addstr(chr(char))
-        stdscr.refresh()
-    return input_str.strip()
+    return read_line(stdscr, prompt)
+
+# Skills of a category, in resume order
+def skills_in_category(skills_section, category):
+    return [skill for skill in skills_section["items"] if skill.get("category", "Unknown").lower() == category.lower()]
 
 # Curses-based selection of skills to convert
-def curses_interface(stdscr, data, category):
+def curses_interface(stdscr, data, category, rules=None):
+    import curses
     curses.curs_set(0)
     skills_section = next((section for section in data.get("sections", []) if section["title"] == "Skills"), None)
 
@@ -72,11 +70,12 @@ def curses_interface(stdscr, data, category):
     selected_skills = []
     skill_idx = 0
 
-    filtered_skills = [skill for skill in skills_section["items"] if skill.get("category", "Unknown").lower() == category.lower()]
+    filtered_skills = skills_in_category(skills_section, category)
 
     if not filtered_skills:
         raise Exception(f"No skills found in the '{category}' category.")
 
+    rules_hint = "'r' to preview skill rules, " if rules else ""
     while True:
         stdscr.clear()
         stdscr.addstr(f"Select the {category} skills you want to include in the YAML file:\n")
@@ -86,7 +85,8 @@ def curses_interface(stdscr, data, category):
             else:
                 stdscr.addstr(f"  {skill.get('name', 'Unnamed Skill')} ({skill.get('percentage', 0)}%) - Color: {skill.get('color', 'primary')}")
 
-        stdscr.addstr("\nPress ENTER to toggle selection, 'c' to assign/edit color, ARROW KEYS to navigate, 'q' to quit.")
+        stdscr.addstr(f"\nPress ENTER to toggle selection, 'c' to assign/edit color, {rules_hint}"
+                      "ARROW KEYS to navigate, 'q' to quit.")
 
         key = stdscr.getch()
 
@@ -103,45 +103,147 @@ def curses_interface(stdscr, data, category):
         elif key == ord('c'):
             skill = filtered_skills[skill_idx]
             assign_color_to_skill(stdscr, skill)
+        elif key == ord('r') and rules:
+            if preview_rules(stdscr, skills_section["items"], rules):
+                # Rules may have moved skills to another category
+                filtered_skills = skills_in_category(skills_section, category)
+                selected_skills = [skill for skill in selected_skills if skill in filtered_skills]
+                if not filtered_skills:
+                    break
+                skill_idx = min(skill_idx, len(filtered_skills) - 1)
         elif key == ord('q'):
             break
 
     return selected_skills
 
+# Show the changes the rules would make to every skill and apply them on confirmation;
+# returns True if they were applied
+def preview_rules(stdscr, skills, rules):
+    changes = evaluate_rules(skills, rules)
+    stdscr.clear()
+    if not changes:
+        stdscr.addstr("The skill rules change nothing. Press any key to go back.")
+        stdscr.getch()
+        return False
+
+    height, width = stdscr.getmaxyx()
+    shown = max(height - 3, 1)
+    stdscr.addnstr(0, 0, f"The skill rules would make {len(changes)} changes:", width - 1)
+    lines = [describe_change(skills, change) for change in changes[:shown]]
+    if len(changes) > shown:
+        lines[-1] = f"... and {len(changes) - shown + 1} more"
+    for row, line in enumerate(lines, 1):
+        stdscr.addnstr(row, 0, f"  {line}", width - 1)
+    stdscr.addnstr(min(len(lines) + 1, height - 1), 0, "Apply them? (y/n)", width - 1)
+    if stdscr.getch() in (ord('y'), ord('Y')):
+        apply_changes(skills, changes)
+        return True
+    return False
+
 # Function to prompt color selection during entry creation in curses
 def assign_color_to_skill(stdscr, skill):
-    valid_colors = ["primary", "secondary", "success", "danger", "warning", "info", "light", "dark"]
     stdscr.clear()
-    stdscr.addstr(f"Assign a color to the skill '{skill['name']}' (options: {', '.join(valid_colors)}):\n")
+    stdscr.addstr(f"Assign a color to the skill '{skill['name']}' (options: {', '.join(VALID_COLORS)}):\n")
     stdscr.refresh()
 
     while True:
         color = get_input(stdscr, "Enter color: ").strip().lower()
-        if color in valid_colors:
+        if color in VALID_COLORS:
             skill["color"] = color
             break
         else:
-            stdscr.addstr(f"\nInvalid color. Please choose from: {', '.join(valid_colors)}\n")
-
-if __name__ == "__main__":
-    tech_output_file = "_data/tech-skills.yml"
-    other_output_file = "_data/other-skills.yml"
+            stdscr.addstr(f"\nInvalid color. Please choose from: {', '.join(VALID_COLORS)}\n")
 
+# Skills already in a generated file, as {name: (position, color)}. resume.json holds neither
+# the colors nor the order chosen in the curses interface; they are only stored in these files.
+def load_existing_skills(output_file):
+    import yaml
     try:
-        # Load the resume data
-        resume_data = load_resume(RESUME_FILE)
-
-        # Use curses for Tech skills
-        tech_skills = curses.wrapper(curses_interface, resume_data, "Tech")
-        tech_yaml_content = convert_skills_to_yaml(tech_skills)
-        save_yaml_file(tech_yaml_content, tech_output_file)
-        print(f"Tech skills YAML file has been successfully saved to {tech_output_file}.")
-
-        # Use curses for Non-Tech skills
-        other_skills = curses.wrapper(curses_interface, resume_data, "Other")
-        other_yaml_content = convert_skills_to_yaml(other_skills)
-        save_yaml_file(other_yaml_content, other_output_file)
-        print(f"Other skills YAML file has been successfully saved to {other_output_file}.")
+        with open(output_file, 'r', encoding="utf-8") as file:
+            entries = yaml.safe_load(file)
+    except (FileNotFoundError, yaml.YAMLError):
+        return {}
+    existing = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if isinstance(entry, dict):
+            existing.setdefault(str(entry.get("name")), (len(existing), entry.get("color")))
+    return existing
+
+# Give skills without a color the one they have in a generated file
+def keep_existing_colors(skills, existing):
+    for skill in skills:
+        color = existing.get(str(skill.get("name")), (None, None))[1]
+        if not skill.get("color") and color in VALID_COLORS:
+            skill["color"] = color
+            count("skills.colors_kept")
+
+# Skills in the order of a generated file; new skills follow the existing ones in resume order
+def in_existing_order(skills, existing):
+    return sorted(skills, key=lambda skill: existing.get(str(skill.get("name")), (len(existing), None))[0])
+
+# Select every skill of a category, for non-interactive builds
+def select_all_skills(data, category):
+    return [
+        skill
+        for section in data.get("sections", [])
+        if section["title"] == "Skills"
+        for skill in section["items"]
+        if skill.get("category", "Unknown").lower() == category.lower()
+    ]
+
+# Save the YAML of every locale, the default locale to output_file and the others next to it
+# in a directory named after the locale
+def save_locale_files(contents, output_file, label):
+    for locale, yaml_content in contents.items():
+        locale_file = locale_path(output_file, locale)
+        if locale != DEFAULT_LOCALE:
+            os.makedirs(os.path.dirname(locale_file) or ".", exist_ok=True)
+        save_yaml_file(yaml_content, locale_file)
+        print(f"{label} YAML file has been successfully saved to {locale_file}.")
+
+# Generate the Tech and Other skills YAML files, interactively or from every skill,
+# for every locale from the same selection. Skill rules (by default skill-rules.json next to
+# the resume) can be previewed and applied from the selection screens, and are applied
+# directly when not interactive.
+def generate_skills(resume_file=RESUME_FILE, tech_output_file=TECH_OUTPUT_FILE,
+                    other_output_file=OTHER_OUTPUT_FILE, interactive=True, locales=None, rules_file=None):
+    locales = list(dict.fromkeys(locales or [DEFAULT_LOCALE]))
+    # Fail on an unsupported locale before loading anything
+    for locale in locales:
+        get_formatter(locale)
+
+    # Load only the Skills section of the resume data
+    with stage("skills.load_resume"):
+        resume_data = load_resume_sections(resume_file, ["Skills"])
+
+    if rules_file and not os.path.isfile(rules_file):
+        raise Exception(f"Skill rules file not found: {rules_file}")
+    rules = load_rules(rules_file or rules_path(resume_file))
+
+    if interactive:
+        import curses
+        # Use curses for Tech skills, then for Non-Tech skills
+        tech_skills = curses.wrapper(curses_interface, resume_data, "Tech", rules)
+        other_skills = curses.wrapper(curses_interface, resume_data, "Other", rules)
+    else:
+        skills = [skill for section in resume_data.get("sections", []) if section["title"] == "Skills"
+                  for skill in section["items"]]
+        tech_existing = load_existing_skills(tech_output_file)
+        other_existing = load_existing_skills(other_output_file)
+        # Colors picked earlier in the curses interface win over rules that only fill missing fields
+        keep_existing_colors(skills, {**other_existing, **tech_existing})
+        if rules:
+            changes = evaluate_rules(skills, rules)
+            apply_changes(skills, changes)
+            print(f"Skill rules made {len(changes)} changes to {len(skills)} skills.")
+        tech_skills = in_existing_order(select_all_skills(resume_data, "Tech"), tech_existing)
+        other_skills = in_existing_order(select_all_skills(resume_data, "Other"), other_existing)
+
+    save_locale_files(convert_skills_per_locale(tech_skills, locales), tech_output_file, "Tech skills")
+    save_locale_files(convert_skills_per_locale(other_skills, locales), other_output_file, "Other skills")
 
+if __name__ == "__main__":
+    try:
+        generate_skills()
     except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+import time
+from compressed_io import codec_for, read_json
+from instrumentation import count, stage
+
+# Snapshot files live next to the JSON file with this suffix
+SNAPSHOT_SUFFIX = ".snapshot"
+# File signature, tied to the marshal format and Python version that wrote it
+MAGIC = b"RSNAP" + bytes([marshal.version, sys.version_info[0], sys.version_info[1]])
+# Header after the signature: source mtime_ns, source size, source SHA-256
+HEADER = struct.Struct("<qq32s")
+PAYLOAD_OFFSET = len(MAGIC) + HEADER.size
+# Coarsest file timestamp granularity expected (FAT has 2 s). A file rewritten within this long
+# of its recorded mtime may keep the same mtime and size, so such snapshots are verified by hash.
+MTIME_GRANULARITY_NS = 2_000_000_000
+
+
+# Path of the snapshot belonging to a JSON file
+def snapshot_path(file_path):
+    return file_path + SNAPSHOT_SUFFIX
+
+
+# SHA-256 of a file's contents
+def hash_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+# Write a snapshot of already-parsed data for the JSON file. `stat` and `digest` must
+# describe the bytes `data` was parsed from; when omitted they are read from disk.
+# Snapshots are only a cache, so failures to write one are ignored.
+def write_snapshot(file_path, data, digest=None, stat=None):
+    try:
+        stat = stat or os.stat(file_path)
+        digest = digest or hash_file(file_path)
+        payload = marshal.dumps(data)
+        temp_path = snapshot_path(file_path) + ".tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(MAGIC)
+            file.write(HEADER.pack(stat.st_mtime_ns, stat.st_size, digest))
+            file.write(payload)
+        os.replace(temp_path, snapshot_path(file_path))
+        count("snapshot.written")
+    except (OSError, ValueError):
+        pass
+
+
+# Read a snapshot if it is valid for the JSON file; returns None when it must be rebuilt.
+# A matching (mtime, size) is trusted only once the snapshot was written more than
+# MTIME_GRANULARITY_NS after that mtime; until then the content hash is compared as well.
+def read_snapshot(file_path, stat):
+    try:
+        with open(snapshot_path(file_path), 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if buf[:len(MAGIC)] != MAGIC:
+                    return None
+                mtime_ns, size, digest = HEADER.unpack_from(buf, len(MAGIC))
+                touched = (mtime_ns, size) != (stat.st_mtime_ns, stat.st_size)
+                racy = os.fstat(file.fileno()).st_mtime_ns - mtime_ns < MTIME_GRANULARITY_NS
+                if touched or racy:
+                    # Possibly changed or possibly unchanged: compare content hashes
+                    if size != stat.st_size or digest != hash_file(file_path):
+                        return None
+                    count("snapshot.verified")
+                with memoryview(buf) as view:
+                    data = marshal.loads(view[PAYLOAD_OFFSET:])
+    except (OSError, ValueError, EOFError, TypeError, struct.error):
+        return None
+
+    # Rewrite the header once a fresh snapshot would no longer be racy, so later loads skip the hash
+    if (touched or racy) and time.time_ns() - stat.st_mtime_ns >= MTIME_GRANULARITY_NS:
+        write_snapshot(file_path, data, digest, stat)
+    return data
+
+
+# Load a JSON file through its binary snapshot, rebuilding the snapshot when it is stale.
+# Plain and compressed (see compressed_io) files are supported.
+# Raises FileNotFoundError and json.JSONDecodeError like json.load would.
+def load_json_with_snapshot(file_path):
+    stat = os.stat(file_path)
+    with stage("snapshot.read"):
+        data = read_snapshot(file_path, stat)
+    if data is not None:
+        count("snapshot.hits")
+        return data
+
+    count("snapshot.misses")
+    if codec_for(file_path) is not None:
+        # The hash covers the compressed bytes
+        with stage("snapshot.parse_json"):
+            data = read_json(file_path)
+        with stage("snapshot.write"):
+            write_snapshot(file_path, data, stat=stat)
+        return data
+
+    with stage("snapshot.parse_json"):
+        with open(file_path, 'rb') as file:
+            raw = file.read()
+        data = json.loads(raw)
+    with stage("snapshot.write"):
+        write_snapshot(file_path, data, hashlib.sha256(raw).digest(), stat)
+    return data
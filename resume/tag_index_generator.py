@@ -0,0 +1,77 @@
+import os
+import re
+from instrumentation import count, timed
+from posts import read_posts
+
+# Paths relative to the repository root
+POSTS_DIR = "_posts"
+TAGS_FILE = "_data/tags.yml"
+CATEGORIES_FILE = "_data/categories.yml"
+CACHE_FILE = ".post-index-cache.json"
+
+
+# Turn a tag name into the anchor id used on the tags page
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+# Group posts by a list field ("tags" or "categories").
+# Returns a list of {name, slug, count, posts} sorted by name; posts stay newest first.
+def build_index(posts, field):
+    groups = {}
+    for post in posts:
+        for name in post[field]:
+            groups.setdefault(name, []).append({
+                "title": post["title"],
+                "url": post["url"],
+                "date": post["date"],
+            })
+    return [
+        {"name": name, "slug": slugify(name), "count": len(group), "posts": group}
+        for name, group in sorted(groups.items(), key=lambda item: item[0].lower())
+    ]
+
+
+# Dump an index to YAML
+def convert_index_to_yaml(index):
+    import yaml
+    return yaml.dump(index, sort_keys=False, allow_unicode=True, default_flow_style=False)
+
+
+# Write a file only when its content changed, so Jekyll sees no spurious updates
+def write_if_changed(output_file, content):
+    try:
+        with open(output_file, 'r') as file:
+            if file.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    try:
+        with open(output_file, 'w') as file:
+            file.write(content)
+            count("bytes_written", file.tell())
+    except PermissionError:
+        raise Exception(f"Permission denied: Unable to write to {output_file}")
+    return True
+
+
+# Generate the tag and category data files from the posts
+@timed("tags.generate")
+def generate_tag_indexes(posts_dir=POSTS_DIR, tags_file=TAGS_FILE, categories_file=CATEGORIES_FILE,
+                         cache_file=CACHE_FILE):
+    posts, changed = read_posts(posts_dir, cache_file)
+    count("tags.posts_parsed", len(changed))
+
+    for field, output_file in (("tags", tags_file), ("categories", categories_file)):
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        if write_if_changed(output_file, convert_index_to_yaml(build_index(posts, field))):
+            print(f"{field.capitalize()} index saved to {output_file}.")
+        else:
+            print(f"{field.capitalize()} index is up to date.")
+
+
+if __name__ == "__main__":
+    try:
+        generate_tag_indexes()
+    except Exception as e:
+        print(f"Error: {e}")
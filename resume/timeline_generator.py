@@ -1,76 +1,103 @@
+import heapq
 import json
-import yaml
-import curses
-from datetime import datetime
+import os
+from instrumentation import count, stage, timed
+from locales import DEFAULT_LOCALE, get_formatter, locale_path, localized, parse_month
 
 # Path to the JSON file
 RESUME_FILE = "resume/resume.json"
+OUTPUT_FILE = "_data/timeline.yml"
+SHARD_DIR = "_data/timeline_shards"
+SHARD_INDEX_FILE = "index.yml"
+
+# Sections that make up the timeline
+TIMELINE_SECTIONS = ["Work Experience", "Leadership Experience", "Education"]
 
 # To convert YYYY-MM to MMM YYYY
+@timed("timeline.convert_date_format")
 def convert_date_format(date_str):
-    try:
-        # Parse the date string
-        date_obj = datetime.strptime(date_str, "%Y-%m")
-        # Format the date to MMM YYYY
-        return date_obj.strftime("%b %Y")
-    except ValueError:
-        # Handle 'Present' or invalid dates
-        if date_str.lower() == "present":
-            return "Present"
-        return "Invalid date"
-
-# Convert a single entry to YAML format for timeline sections
-def convert_entry_to_yaml(entry):
+    # 'Present' or invalid dates get their own labels
+    return get_formatter(DEFAULT_LOCALE).format(parse_month(date_str))
+
+# Start and end dates of an entry, parsed once and shared by every locale
+def parse_entry_dates(entry):
+    return parse_month(entry.get("start_date", "Unknown Start Date")), parse_month(entry.get("end_date", []))
+
+# Convert a single entry to YAML format for timeline sections, in one locale
+@timed("timeline.convert_entry_to_yaml")
+def convert_entry_to_yaml(entry, locale=DEFAULT_LOCALE, dates=None):
+    start, end = dates or parse_entry_dates(entry)
+    formatter = get_formatter(locale)
     # Start with the base description
-    end_date_org_location = convert_date_format(entry.get("end_date", []))
+    end_date_org_location = formatter.format(end)
 
     # Add unsupported fields to the description
     for field in ["organization", "location"]:
         if field in entry:
-            end_date_org_location += f" | {entry[field]}"
+            end_date_org_location += f" | {localized(entry, field, locale)}"
 
     # Return the structured output
     return {
-        "title": entry.get("title", "Unknown Title"),
-        "from": convert_date_format(entry.get("start_date", "Unknown Start Date")),
+        "title": localized(entry, "title", locale, "Unknown Title"),
+        "from": formatter.format(start),
         "to": end_date_org_location,
-        "description": ", ".join(entry.get("description", "N/A")),
+        "description": ", ".join(localized(entry, "description", locale, "N/A")),
     }
 
-# Convert specific entries to a YAML-compliant flat list
-def convert_entries_to_yaml(entries):
-    yaml_entries = []
+# Convert entries for several locales in one pass: each entry's dates are parsed once
+# and formatted with the cached formatter of every locale. Returns {locale: [converted entries]}.
+@timed("timeline.convert_entries_per_locale")
+def convert_entries_per_locale(entries, locales):
+    converted = {locale: [] for locale in locales}
     for entry in entries:
-        yaml_entries.append(convert_entry_to_yaml(entry))
-    return yaml.dump(yaml_entries, sort_keys=False, allow_unicode=True, default_flow_style=False)
+        dates = parse_entry_dates(entry)
+        for locale in locales:
+            converted[locale].append(convert_entry_to_yaml(entry, locale, dates))
+    count("timeline.entries", len(entries) * len(locales))
+    return converted
+
+# Dump converted entries to YAML
+def dump_yaml(yaml_entries):
+    # PyYAML is imported on first use so importing this module stays cheap
+    import yaml
+    with stage("timeline.yaml_dump"):
+        return yaml.dump(yaml_entries, sort_keys=False, allow_unicode=True, default_flow_style=False)
+
+# Convert specific entries to a YAML-compliant flat list
+@timed("timeline.convert_entries_to_yaml")
+def convert_entries_to_yaml(entries, locale=DEFAULT_LOCALE):
+    return dump_yaml(convert_entries_per_locale(entries, [locale])[locale])
 
 # Load JSON data
+@timed("timeline.load_resume")
 def load_resume(file_path):
+    from snapshot_cache import load_json_with_snapshot
     try:
-        with open(file_path, 'r') as file:
-            return json.load(file)
+        return load_json_with_snapshot(file_path)
     except FileNotFoundError:
         raise Exception("Resume JSON file not found.")
     except json.JSONDecodeError:
         raise Exception("Invalid JSON format in the resume file.")
 
 # Save YAML to file
+@timed("timeline.save_yaml_file")
 def save_yaml_file(yaml_content, output_file):
     try:
         with open(output_file, 'w') as file:
             file.write(yaml_content)
+            count("bytes_written", file.tell())
     except PermissionError:
         raise Exception("Permission denied: Unable to write to the file.")
 
 # Curses-based selection of sections and entries to convert
 def curses_interface(stdscr, data):
+    import curses
     curses.curs_set(0)
 
-    # Get the sections in `data` that match `timeline_sections`
-    timeline_sections = ["Work Experience", "Leadership Experience", "Education"]
+    # Get the sections in `data` that match `TIMELINE_SECTIONS`
     matching_sections = [
         section for section in data.get("sections", [])
-        if section["title"] in timeline_sections
+        if section["title"] in TIMELINE_SECTIONS
     ]
 
     selected_entries = []
@@ -131,22 +158,129 @@ def curses_interface(stdscr, data):
 
     return selected_entries
 
-if __name__ == "__main__":
-    output_file = "_data/timeline.yml"
+# Select every entry of the timeline sections, for non-interactive builds
+def select_all_entries(data):
+    return [
+        entry
+        for section in data.get("sections", [])
+        if section["title"] in TIMELINE_SECTIONS
+        for entry in section["items"]
+    ]
+
+# Sort key for an entry: its start date as (year, month); undated entries sort last
+def entry_date_key(entry):
+    try:
+        year, month = entry.get("start_date", "").split("-")
+        return int(year), int(month)
+    except (AttributeError, ValueError):
+        return (0, 0)
 
+# Merge the selected entries of every timeline section into one newest-first stream
+# of (date key, section title, entry), using precomputed keys and a heap merge
+def merge_timeline_entries(data, selected_entries):
+    selected_ids = {id(entry) for entry in selected_entries}
+    runs = []
+    for section in data.get("sections", []):
+        if section["title"] not in TIMELINE_SECTIONS:
+            continue
+        keyed = [
+            (entry_date_key(entry), section["title"], entry)
+            for entry in section["items"]
+            if id(entry) in selected_ids
+        ]
+        keyed.sort(key=lambda item: item[0], reverse=True)
+        runs.append(keyed)
+    return heapq.merge(*runs, key=lambda item: item[0], reverse=True)
+
+# Write YAML only when it differs from what is on disk; returns True if written
+def save_yaml_file_if_changed(yaml_content, output_file):
     try:
-        # Load the resume data
-        resume_data = load_resume(RESUME_FILE)
+        with open(output_file, 'r') as file:
+            if file.read() == yaml_content:
+                return False
+    except FileNotFoundError:
+        pass
+    save_yaml_file(yaml_content, output_file)
+    return True
+
+# Write one data file per section and start year, plus an index of the shards.
+# Unchanged shards are left untouched and shards that no longer exist are removed.
+# Entries are grouped and their dates parsed once; each locale gets its own shard directory.
+@timed("timeline.save_shards")
+def save_timeline_shards(data, selected_entries, shard_dir=SHARD_DIR, locales=(DEFAULT_LOCALE,)):
+    import yaml
+
+    shards = {}
+    for (year, _), section_title, entry in merge_timeline_entries(data, selected_entries):
+        section_slug = section_title.lower().replace(" ", "-")
+        shard = (section_slug, str(year) if year else "undated")
+        shards.setdefault(shard, []).append((entry, parse_entry_dates(entry)))
+
+    written = 0
+    for locale in locales:
+        locale_dir = locale_path(shard_dir, locale)
+        index = []
+        expected_files = {os.path.join(locale_dir, SHARD_INDEX_FILE)}
+        for (section_slug, year), entries in shards.items():
+            file_path = os.path.join(locale_dir, section_slug, f"{year}.yml")
+            expected_files.add(file_path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            converted = [convert_entry_to_yaml(entry, locale, dates) for entry, dates in entries]
+            content = yaml.dump(converted, sort_keys=False, allow_unicode=True, default_flow_style=False)
+            written += save_yaml_file_if_changed(content, file_path)
+            index.append({"section": section_slug, "year": year, "count": len(entries)})
+        count("timeline.entries", sum(item["count"] for item in index))
+
+        os.makedirs(locale_dir, exist_ok=True)
+        index_content = yaml.dump(index, sort_keys=False, allow_unicode=True, default_flow_style=False)
+        written += save_yaml_file_if_changed(index_content, os.path.join(locale_dir, SHARD_INDEX_FILE))
 
+        for root, _, names in os.walk(locale_dir):
+            for name in names:
+                file_path = os.path.join(root, name)
+                if name.endswith(".yml") and file_path not in expected_files:
+                    os.remove(file_path)
+    return written
+
+# Generate the timeline YAML file, interactively or from every entry.
+# With sharded=True, per-section/per-year files are written to shard_dir instead.
+# Every locale is produced from the same loaded and selected entries; locales other than
+# the default are written to a subdirectory named after the locale (e.g. _data/fr/timeline.yml).
+def generate_timeline(resume_file=RESUME_FILE, output_file=OUTPUT_FILE, interactive=True,
+                      sharded=False, shard_dir=SHARD_DIR, locales=None):
+    locales = list(dict.fromkeys(locales or [DEFAULT_LOCALE]))
+    # Fail on an unsupported locale before loading anything
+    for locale in locales:
+        get_formatter(locale)
+
+    # Load the resume data
+    resume_data = load_resume(resume_file)
+
+    if interactive:
         # Use curses for user interface
+        import curses
         selected_entries = curses.wrapper(curses_interface, resume_data)
+    else:
+        selected_entries = select_all_entries(resume_data)
 
-        # Convert the selected entries to YAML
-        yaml_content = convert_entries_to_yaml(selected_entries)
+    if sharded:
+        written = save_timeline_shards(resume_data, selected_entries, shard_dir, locales)
+        print(f"Timeline shards saved to {shard_dir} ({written} files updated).")
+        return
 
+    # Convert the selected entries to YAML for every locale at once
+    converted = convert_entries_per_locale(selected_entries, locales)
+
+    for locale in locales:
         # Save to YAML file
-        save_yaml_file(yaml_content, output_file)
-        print(f"YAML file has been successfully saved to {output_file}.")
+        locale_file = locale_path(output_file, locale)
+        if locale != DEFAULT_LOCALE:
+            os.makedirs(os.path.dirname(locale_file) or ".", exist_ok=True)
+        save_yaml_file(dump_yaml(converted[locale]), locale_file)
+        print(f"YAML file has been successfully saved to {locale_file}.")
 
+if __name__ == "__main__":
+    try:
+        generate_timeline()
     except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
@@ -0,0 +1,98 @@
+import json
+
+from edit_session import EditHistory, apply_operation, document_version, insert_entry, remove_entry, replace_entry
+from resume_editor import commit_operations, load_resume, save_resume
+
+
+def entry(title):
+    return {"title": title, "organization": "Org", "start_date": "2020-01", "end_date": "Present"}
+
+
+def make_resume(tmp_path, name="resume.json"):
+    file_path = str(tmp_path / name)
+    data = {"sections": [{"title": "Work Experience", "items": [entry("A"), entry("B"), entry("C")]}]}
+    save_resume(file_path, data)
+    return file_path
+
+
+def titles(data, section_title="Work Experience"):
+    return [item["title"] for section in data["sections"] if section["title"] == section_title
+            for item in section["items"]]
+
+
+def test_apply_operation_merges_non_overlapping_edits():
+    base = {"sections": [{"title": "Work Experience", "items": [entry("A"), entry("B"), entry("C")]}]}
+    ours = json.loads(json.dumps(base))
+    theirs = json.loads(json.dumps(base))
+    operation = replace_entry(ours, "Work Experience", 2, entry("C2"))
+    remove_entry(theirs, "Work Experience", 0)
+
+    # The entry moved from index 2 to 1 on the other side, and is still found there
+    assert apply_operation(theirs, operation)
+    assert titles(theirs) == ["B", "C2"]
+
+
+def test_commit_operations_merges_non_overlapping_edits(tmp_path):
+    file_path = make_resume(tmp_path)
+    first = load_resume(file_path, use_snapshot=False)
+    second = load_resume(file_path, use_snapshot=False)
+    base_version = document_version(first)
+
+    saved, rejected = commit_operations(file_path, first, base_version,
+                                        [insert_entry(first, "Work Experience", entry("D"))])
+    assert rejected == []
+    saved, rejected = commit_operations(file_path, second, base_version,
+                                        [replace_entry(second, "Work Experience", 0, entry("A2"))])
+
+    assert rejected == []
+    assert titles(saved) == ["A2", "B", "C", "D"]
+    assert document_version(saved) == base_version + 2
+    with open(file_path) as file:
+        assert titles(json.load(file)) == ["A2", "B", "C", "D"]
+
+
+def test_commit_operations_rejects_conflicting_edits(tmp_path):
+    file_path = make_resume(tmp_path)
+    first = load_resume(file_path, use_snapshot=False)
+    second = load_resume(file_path, use_snapshot=False)
+    base_version = document_version(first)
+
+    commit_operations(file_path, first, base_version, [replace_entry(first, "Work Experience", 1, entry("B1"))])
+    edit = replace_entry(second, "Work Experience", 1, entry("B2"))
+    removal = remove_entry(second, "Work Experience", 0)
+    saved, rejected = commit_operations(file_path, second, base_version, [edit, removal])
+
+    # The edit of B lost to the earlier save; the unrelated removal of A still went through
+    assert rejected == [edit]
+    assert titles(saved) == ["B1", "C"]
+
+
+def test_history_undo_redo_round_trip():
+    data = {"sections": [{"title": "Work Experience", "items": [entry("A")]}]}
+    history = EditHistory()
+    history.record(insert_entry(data, "Work Experience", entry("B")))
+    history.record(replace_entry(data, "Work Experience", 0, entry("A2")))
+    history.record(remove_entry(data, "Work Experience", 1))
+    assert titles(data) == ["A2"]
+
+    for expected in (["A2", "B"], ["A", "B"], ["A"]):
+        assert history.undo(data) is not None
+        assert titles(data) == expected
+    assert history.undo(data) is None
+
+    for expected in (["A", "B"], ["A2", "B"], ["A2"]):
+        assert history.redo(data) is not None
+        assert titles(data) == expected
+    assert history.redo(data) is None
+
+
+def test_history_keeps_an_undo_that_conflicts():
+    data = {"sections": [{"title": "Work Experience", "items": [entry("A")]}]}
+    history = EditHistory()
+    history.record(replace_entry(data, "Work Experience", 0, entry("A2")))
+    # Another editor changed the entry after our edit
+    data["sections"][0]["items"][0] = entry("A3")
+
+    assert history.undo(data) is None
+    assert titles(data) == ["A3"]
+    assert len(history.undo_stack) == 1 and history.redo_stack == []
@@ -0,0 +1,18 @@
+import pytest
+
+from precompress import minify_css
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("a {\n  color: red;\n  margin: 0 auto;\n}\n", "a{color: red;margin: 0 auto}"),
+    ("ul  li > a , p { }", "ul li>a,p{}"),
+    # Whitespace and punctuation inside strings are kept as they are
+    ('a::after { content: "x  ;  } { , " ; }', 'a::after{content: "x  ;  } { , "}'),
+    ("q { quotes: '\"' '\\'  }' ; }", "q{quotes: '\"' '\\'  }'}"),
+    # A comment opener inside a string is not a comment
+    ("a { content: '/* not a comment */' }", "a{content: '/* not a comment */'}"),
+    # Comments are dropped but still separate the tokens around them
+    ("/* header { } */ a/**/b { margin:0/* x */auto }", "a b{margin:0 auto}"),
+])
+def test_minify_css(text, expected):
+    assert minify_css(text) == expected
@@ -0,0 +1,62 @@
+import gzip
+import json
+
+import pytest
+
+from section_loader import load_resume_sections
+
+# Documents the scanner must read exactly like json.load: escapes, nesting, unicode,
+# braces inside strings, whitespace, and sections it has to skip over
+EDGE_CASES = [
+    {"sections": []},
+    {"sections": [{"title": "Skills", "items": []}]},
+    {"name": "x", "sections": [{"items": [{"name": "Python"}], "title": "Skills"}], "version": 3},
+    {"sections": [
+        {"title": "Projects", "items": [{"name": "a \"quoted\" } ] { [ name", "tools": ["C\\", "é中"]}]},
+        {"title": "Skills", "items": [{"name": "😀", "percentage": 90.5, "extra": None,
+                                       "nested": {"deep": [[], {}, [1, -2e3, True, False]]}}]},
+        {"title": "Education", "items": [{"title": "Line\nbreak\ttab \\/ slash"}]},
+    ]},
+]
+
+
+def expected_sections(data, titles):
+    return {"sections": [section for section in data["sections"] if section["title"] in titles]}
+
+
+@pytest.mark.parametrize("data", EDGE_CASES)
+@pytest.mark.parametrize("indent", [None, 4])
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_matches_json_load(tmp_path, data, indent, ensure_ascii):
+    file_path = tmp_path / "resume.json"
+    file_path.write_text(json.dumps(data, indent=indent, ensure_ascii=ensure_ascii), encoding="utf-8")
+    with open(file_path, encoding="utf-8") as file:
+        loaded = json.load(file)
+
+    for titles in (["Skills"], ["Projects", "Education"], []):
+        assert load_resume_sections(str(file_path), titles) == expected_sections(loaded, titles)
+
+
+@pytest.mark.parametrize("data", EDGE_CASES)
+def test_matches_json_load_for_gzip(tmp_path, data):
+    file_path = tmp_path / "resume.json.gz"
+    with gzip.open(file_path, "wt", encoding="utf-8") as file:
+        json.dump(data, file, indent=4, ensure_ascii=False)
+    with gzip.open(file_path, "rt", encoding="utf-8") as file:
+        loaded = json.load(file)
+
+    assert load_resume_sections(str(file_path), ["Skills", "Projects"]) == expected_sections(
+        loaded, ["Skills", "Projects"])
+
+
+@pytest.mark.parametrize("text", ["", "{", '{"sections": [}', '{"sections": [{"title": "Skills", "items": [1,]}]}'])
+def test_rejects_invalid_json(tmp_path, text):
+    file_path = tmp_path / "resume.json"
+    file_path.write_text(text)
+    with pytest.raises(Exception, match="Invalid JSON format"):
+        load_resume_sections(str(file_path), ["Skills"])
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(Exception, match="not found"):
+        load_resume_sections(str(tmp_path / "missing.json"), ["Skills"])